@@ -0,0 +1,102 @@
+import importlib
+import importlib.util
+import os
+import sys
+
+# rent+price_scatter_plot.py is not a valid module name; it is loaded from its path under this one
+SCATTER_MODULE = 'rent_price_scatter_plot'
+SCATTER_FILE = 'rent+price_scatter_plot.py'
+
+# Public name -> defining module. Nothing is imported until a name is first used, so
+# `import analysis` is instant, data functions pull in pandas (plus scipy.special for
+# statistics), and matplotlib, scipy.stats and folium load only inside the renderers.
+EXPORTS = {
+    # Data
+    'DATA_PATH': 'data_loader',
+    'load_housing_data': 'data_loader',
+    'read_housing_csv': 'data_loader',
+    'clean_housing_data': 'data_loader',
+    'stream_borough_metrics': 'streaming_ingest',
+    'aggregate_chunks': 'streaming_ingest',
+    'OnlineBoroughStats': 'online_stats',
+    'compact_frame': 'compact_data',
+    'expand_frame': 'compact_data',
+    'memory_report': 'compact_data',
+    'HousingPanel': 'panel',
+    'gross_yield': 'panel',
+    'generate_housing_data': 'synthetic_data',
+    'load_boundaries': 'geometry_store',
+    'BoroughLocator': 'borough_locator',
+    'locate_listings': 'borough_locator',
+    # Statistics and rankings
+    'pairwise_stats': 'stats_engine',
+    'regression_row': 'stats_engine',
+    'ols_from_moments': 'stats_engine',
+    'confidence_band': 'stats_engine',
+    'significance_stars': 'stats_engine',
+    'regression_fit': SCATTER_MODULE,
+    'online_regression': SCATTER_MODULE,
+    'OnlineRegression': 'online_stats',
+    'segment_regressions': 'segment_regression',
+    'BinnedSample': 'binned_kde',
+    'segment': 'segmentation',
+    'Segmentation': 'segmentation',
+    'trend_line': 'price_elasticity_graph',
+    'rank_extremes': 'yield_ranking_barchart',
+    'tail_bands': 'yield_ranking_barchart',
+    'optimize_portfolio': 'optimizer',
+    'sample_candidates': 'optimizer',
+    'MetricsIndex': 'query_service',
+    # Renderers
+    'PLOTS': 'price_elasticity_graph',
+    'render_plot': 'price_elasticity_graph',
+    'render_batch': 'price_elasticity_graph',
+    'plot_rent_price_regression': SCATTER_MODULE,
+    'save_regression': SCATTER_MODULE,
+    'plot_yield_distribution': 'distribution_Gross_Rental_Yield_histogram',
+    'save_distribution': 'distribution_Gross_Rental_Yield_histogram',
+    'plot_full_ranking': 'yield_ranking_barchart',
+    'plot_top_bottom': 'yield_ranking_barchart',
+    'save_ranking': 'yield_ranking_barchart',
+    'render_pages': 'yield_ranking_barchart',
+    'plot_segment_grid': 'segment_regression',
+    'build_heat_map': 'heat_map_chart',
+    'save_heat_map': 'heat_map_chart',
+    'build_metric_map': 'metric_map',
+    'save_metric_map': 'metric_map',
+    'ProjectedBoundaries': 'static_choropleth',
+    'render_choropleths': 'static_choropleth',
+    'run_graph': 'report',
+}
+
+__all__ = sorted(EXPORTS) + ['scatter_module']
+
+
+def scatter_module():
+    """rent+price_scatter_plot.py as a module, loaded once per process"""
+    module = sys.modules.get(SCATTER_MODULE)
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), SCATTER_FILE)
+        spec = importlib.util.spec_from_file_location(SCATTER_MODULE, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[SCATTER_MODULE] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[SCATTER_MODULE]
+            raise
+    return module
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'analysis' has no attribute {name!r}")
+    source = scatter_module() if module == SCATTER_MODULE else importlib.import_module(module)
+    value = getattr(source, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS))
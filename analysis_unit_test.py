@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from scipy import stats
+import analysis
+from artifact_cache import DISABLE_ENV
+from data_loader import load_housing_data
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that only renderers may import
+HEAVY_MODULES = ['matplotlib', 'scipy.stats', 'folium', 'branca', 'requests']
+
+
+def heavy_imports(code):
+    """Heavy modules loaded after running ``code`` in a fresh interpreter"""
+    probe = f'{code}\nimport sys\nprint(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', probe], cwd=HERE, capture_output=True, text=True, check=True)
+    return [name for name in output.stdout.strip().split(',') if name]
+
+
+class TestAnalysisLibrary(unittest.TestCase):
+    """Unit tests for the lazily imported library layer"""
+
+    def test_modules_import_without_plotting_dependencies(self):
+        """Test that importing any script loads no plotting, mapping or scipy.stats code"""
+        modules = ['analysis', 'report', 'optimizer', 'query_service', 'stats_engine', 'price_elasticity_graph',
+                   'yield_ranking_barchart', 'distribution_Gross_Rental_Yield_histogram', 'heat_map_chart',
+                   'static_choropleth', 'metric_map', 'segment_regression']
+        self.assertEqual(heavy_imports('\n'.join(f'import {m}' for m in modules)), [])
+
+    def test_data_functions_stay_light(self):
+        """Test that loading, statistics and rankings run without the renderers' dependencies"""
+        code = ('import analysis\n'
+                'df = analysis.load_housing_data()\n'
+                'analysis.regression_fit(df)\n'
+                'analysis.trend_line(df, "Average Monthly Rent (£)", "Average Price (£)")\n'
+                'analysis.rank_extremes(df, 5)\n'
+                'analysis.HousingPanel')
+        self.assertEqual(heavy_imports(code), [])
+
+    def test_renderer_loads_matplotlib_on_use(self):
+        """Test that a renderer brings in matplotlib only when called"""
+        code = ('import os\n'
+                'os.environ["MPLBACKEND"] = "Agg"\n'
+                'import analysis\n'
+                'analysis.plot_full_ranking(analysis.load_housing_data())')
+        self.assertIn('matplotlib', heavy_imports(code))
+
+    def test_regression_fit_matches_scipy(self):
+        """Test the facade's regression against scipy.stats.linregress"""
+        df = load_housing_data()
+        fit = analysis.regression_fit(df)
+        reference = stats.linregress(df['Average Monthly Rent (£)'], df['Average Price (£)'])
+        np.testing.assert_allclose([fit['slope'], fit['intercept'], fit['pearson_r'], fit['slope_se']],
+                                   [reference.slope, reference.intercept, reference.rvalue, reference.stderr])
+
+    def test_online_fit_drives_the_plot(self):
+        """Test that the streaming fit equals the batch fit and can be drawn and summarised"""
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        df = load_housing_data()
+        online = analysis.online_regression(df).fit()
+        batch = analysis.regression_fit(df)
+        for key in ('slope', 'intercept', 'pearson_r', 'r_squared', 'slope_se'):
+            self.assertAlmostEqual(online[key], batch[key], delta=1e-6 * max(1, abs(batch[key])), msg=key)
+        fig = analysis.plot_rent_price_regression(df, online)
+        plt.close(fig)
+
+    def test_saved_regression_keyed_by_fit(self):
+        """Test that saving the same rows with another fit redraws instead of serving the cached chart"""
+        import matplotlib
+        matplotlib.use('Agg')
+        df = load_housing_data()
+        windowed = analysis.online_regression(df, window=10).fit()
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.dict(os.environ):
+            os.environ.pop(DISABLE_ENV, None)
+            os.chdir(tmpdir)
+            try:
+                self.assertFalse(analysis.save_regression(df, 'chart.png', dpi=30))
+                self.assertTrue(analysis.save_regression(df, 'chart.png', dpi=30))
+                self.assertFalse(analysis.save_regression(df, 'chart.png', dpi=30, fit=windowed))
+                self.assertTrue(analysis.save_regression(df, 'chart.png', dpi=30, fit=windowed))
+            finally:
+                os.chdir(cwd)
+
+    def test_scatter_module_loaded_once(self):
+        """Test that the scatter script is executed once and shared"""
+        self.assertIs(analysis.scatter_module(), analysis.scatter_module())
+        self.assertIs(analysis.save_regression, analysis.scatter_module().save_regression)
+
+    def test_unknown_name(self):
+        """Test that unknown attributes raise AttributeError and every export resolves"""
+        with self.assertRaises(AttributeError):
+            analysis.not_a_function
+        self.assertIn('load_housing_data', dir(analysis))
+        for name in analysis.EXPORTS:
+            self.assertTrue(hasattr(analysis, name), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+from instrumentation import stage
+
+# Rendered artifacts, one directory per content key
+CACHE_DIR = '.artifact_cache'
+
+# Set HRO_NO_ARTIFACT_CACHE=1 to force every artifact to rebuild
+DISABLE_ENV = 'HRO_NO_ARTIFACT_CACHE'
+
+
+def frame_digest(df, columns=None):
+    """Hash the values, names and dtypes of the columns an artifact reads"""
+    if columns is not None:
+        df = df[list(columns)]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def code_version(*paths):
+    """Hash the source files that produce an artifact"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as handle:
+            digest.update(os.path.basename(path).encode('utf-8'))
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def artifact_key(df=None, columns=None, params=None, code=()):
+    """Content key from input columns, rendering parameters and code version"""
+    digest = hashlib.sha256()
+    if df is not None:
+        digest.update(frame_digest(df, columns).encode('utf-8'))
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(code_version(*code).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cached_render(output_path, render, df=None, columns=None, params=None, code=(),
+                  cache_dir=CACHE_DIR):
+    """Produce ``output_path`` with ``render(path)``, or restore it from the cache
+
+    Returns True when the artifact was served from cache. On a miss the
+    rendered file is copied into ``cache_dir/<key>/`` so the next run with
+    the same inputs, parameters and code skips rendering entirely.
+    """
+    name = os.path.basename(output_path)
+    if os.environ.get(DISABLE_ENV):
+        with stage(f'render:{name}'):
+            render(output_path)
+        return False
+
+    key = artifact_key(df, columns, params, code)
+    entry = os.path.join(cache_dir, key)
+    cached = os.path.join(entry, os.path.basename(output_path))
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if os.path.isfile(cached):
+        with stage(f'cache_hit:{name}'):
+            shutil.copyfile(cached, output_path)
+        return True
+
+    with stage(f'render:{name}'):
+        render(output_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=cache_dir)
+        shutil.copyfile(output_path, os.path.join(staging, os.path.basename(output_path)))
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # Same key published concurrently; the contents are equivalent
+            shutil.rmtree(staging, ignore_errors=True)
+    except OSError:
+        # A read-only cache never blocks producing the artifact itself
+        pass
+    return False
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from artifact_cache import artifact_key, cached_render
+
+
+class TestArtifactCache(unittest.TestCase):
+    """Unit tests for the content-addressed figure cache"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmpdir, 'cache')
+        self.code = os.path.join(self.tmpdir, 'plot.py')
+        with open(self.code, 'w') as handle:
+            handle.write('# v1\n')
+        self.df = pd.DataFrame({'Boroughs': ['Camden', 'Hackney'],
+                                'Gross Yield (%)': [3.1, 4.2],
+                                'Average Price (£)': [800000.0, 600000.0]})
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _render(self, path):
+        self.calls += 1
+        with open(path, 'w') as handle:
+            handle.write(f'render {self.calls}')
+
+    def _cached(self, df, params=None):
+        output = os.path.join(self.tmpdir, 'out', 'figure.png')
+        hit = cached_render(output, self._render, df, ['Boroughs', 'Gross Yield (%)'],
+                            params=params or {'dpi': 300}, code=[self.code], cache_dir=self.cache_dir)
+        return hit, output
+
+    def test_unchanged_inputs_are_served_from_cache(self):
+        """Test that a second run copies the stored artifact without rendering"""
+        self.assertFalse(self._cached(self.df)[0])
+        os.remove(os.path.join(self.tmpdir, 'out', 'figure.png'))
+        hit, output = self._cached(self.df)
+        self.assertTrue(hit)
+        self.assertEqual(self.calls, 1)
+        with open(output) as handle:
+            self.assertEqual(handle.read(), 'render 1')
+
+    def test_unused_column_does_not_invalidate(self):
+        """Test that only the declared input columns contribute to the key"""
+        self._cached(self.df)
+        changed = self.df.assign(**{'Average Price (£)': [1.0, 2.0]})
+        self.assertTrue(self._cached(changed)[0])
+
+    def test_inputs_parameters_and_code_invalidate(self):
+        """Test that data, parameter and source changes each force a rebuild"""
+        self._cached(self.df)
+        self.assertFalse(self._cached(self.df.assign(**{'Gross Yield (%)': [3.1, 4.3]}))[0])
+        self.assertFalse(self._cached(self.df, params={'dpi': 150})[0])
+        with open(self.code, 'w') as handle:
+            handle.write('# v2\n')
+        self.assertFalse(self._cached(self.df)[0])
+        self.assertEqual(self.calls, 4)
+
+    def test_key_ignores_row_index(self):
+        """Test that reindexing identical values keeps the same key"""
+        reindexed = self.df.set_axis([10, 11])
+        self.assertEqual(artifact_key(self.df, ['Gross Yield (%)'], code=[self.code]),
+                         artifact_key(reindexed, ['Gross Yield (%)'], code=[self.code]))
+
+
+if __name__ == '__main__':
+    unittest.main()
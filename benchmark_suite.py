@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Benchmarks render off-screen
+import matplotlib.pyplot as plt
+from scipy import stats
+from scipy.stats import gaussian_kde
+
+from data_loader import load_housing_data, read_housing_csv
+from instrumentation import profile_run, stage
+from synthetic_data import write_synthetic_csv
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+# Benchmarks whose cost is super-linear or dominated by drawing get a row cap;
+# larger sizes are recorded as skipped rather than left to run for hours
+ROW_LIMITS = {
+    'stats.gaussian_kde': 100_000,
+    'render.price_elasticity': 100_000,
+    'render.rent_price_scatter': 100_000,
+    'render.yield_ranking_full': 2_000,
+    'render.heat_map': 100_000,
+}
+
+# Modules whose cold import time is measured, each in a fresh interpreter
+STARTUP_MODULES = [
+    'analysis', 'data_loader', 'stats_engine', 'query_service', 'optimizer', 'report',
+    'price_elasticity_graph', 'yield_ranking_barchart', 'distribution_Gross_Rental_Yield_histogram',
+    'heat_map_chart', 'matplotlib.pyplot', 'scipy.stats', 'folium',
+]
+
+
+def _time(func, repeats):
+    """Best-of-``repeats`` wall time of ``func()`` in seconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _render(build):
+    """Build a figure and rasterise it at the appendix resolution"""
+    fig = build()
+    fig.savefig(os.devnull, format='png', dpi=300)
+    plt.close(fig)
+
+
+def import_seconds(module):
+    """Time to import ``module`` in a fresh interpreter, excluding interpreter start-up"""
+    code = f'import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def startup_benchmarks(modules=STARTUP_MODULES, repeats=3):
+    """Cold import time of each module, best of ``repeats`` fresh interpreters"""
+    return [{'benchmark': f'startup.{module}', 'rows': None, 'repeats': repeats,
+             'seconds': min(import_seconds(module) for _ in range(repeats))} for module in modules]
+
+
+def load_benchmarks(csv_path, snapshot_dir):
+    """Load and cleaning benchmarks for one synthetic CSV"""
+    def snapshot_cold():
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        load_housing_data(csv_path, snapshot_dir=snapshot_dir)
+
+    return {
+        'load.read_csv_and_clean': lambda: read_housing_csv(csv_path),
+        'load.snapshot_cold': snapshot_cold,
+        'load.snapshot_warm': lambda: load_housing_data(csv_path, snapshot_dir=snapshot_dir),
+    }
+
+
+def stats_benchmarks(df):
+    """Statistics used by the scripts, on one cleaned frame"""
+    from binned_kde import BinnedSample
+    from stats_engine import pairwise_stats
+
+    rent = df['Average Monthly Rent (£)'].to_numpy(dtype=float)
+    price = df['Average Price (£)'].to_numpy(dtype=float)
+    yields = df['Gross Yield (%)'].to_numpy(dtype=float)
+    grid = np.linspace(yields.min() * 0.95, yields.max() * 1.05, 200)
+
+    def quadrants():
+        median_rent = np.median(rent)
+        median_sales = df['Average Sales Volume '].median()
+        high_rent = rent > median_rent
+        high_sales = df['Average Sales Volume '].to_numpy() > median_sales
+        return np.bincount(high_rent * 2 + high_sales, minlength=4)
+
+    return {
+        'stats.polyfit': lambda: np.polyfit(rent, price, 1),
+        'stats.linregress': lambda: stats.linregress(rent, price),
+        'stats.pairwise_engine': lambda: pairwise_stats(df),
+        'stats.gaussian_kde': lambda: gaussian_kde(yields)(grid),
+        'stats.binned_kde': lambda: BinnedSample(yields, bins=12).kde(),
+        'stats.medians_quadrants': quadrants,
+    }
+
+
+def render_benchmarks(df):
+    """Figure rendering for every importable chart builder"""
+    import analysis
+    import price_elasticity_graph
+    from distribution_Gross_Rental_Yield_histogram import plot_yield_distribution
+    from yield_ranking_barchart import plot_full_ranking, plot_top_bottom
+
+    def elasticity():
+        for plot_func, _ in price_elasticity_graph.PLOTS.values():
+            _render(lambda: plot_func(df))
+
+    benchmarks = {
+        'render.price_elasticity': elasticity,
+        'render.rent_price_scatter': lambda: _render(lambda: analysis.plot_rent_price_regression(df)),
+        'render.yield_distribution': lambda: _render(lambda: plot_yield_distribution(df)),
+        'render.yield_ranking_full': lambda: _render(lambda: plot_full_ranking(df)),
+        'render.yield_ranking_top_k': lambda: _render(lambda: plot_top_bottom(df, 15)),
+    }
+
+    # The heat map needs the boundary store; it is benchmarked only when already seeded
+    from geometry_store import load_boundaries
+    from heat_map_chart import MAX_GEOMETRY_BYTES, ZOOM_START, build_heat_map
+    try:
+        london_geo = load_boundaries(zoom=ZOOM_START, max_bytes=MAX_GEOMETRY_BYTES, offline=True)
+    except FileNotFoundError:
+        return benchmarks
+
+    def heat_map():
+        with tempfile.TemporaryDirectory() as workdir:
+            build_heat_map(df, london_geo).save(os.path.join(workdir, 'heat_map.html'))
+
+    benchmarks['render.heat_map'] = heat_map
+    return benchmarks
+
+
+def run_suite(sizes=DEFAULT_SIZES, groups=('startup', 'load', 'stats', 'render'), repeats=3, seed=0):
+    """Run every benchmark at every size and return a list of result records
+
+    Start-up benchmarks do not depend on the data and run once, with ``rows`` set to None.
+    """
+    results = []
+    if 'startup' in groups:
+        for record in startup_benchmarks(repeats=repeats):
+            results.append(record)
+            print(f"{record['benchmark']:<32} {'':>17}  {record['seconds']:.4f}s")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in sizes:
+            csv_path = os.path.join(workdir, f'synthetic_{n_rows}.csv')
+            snapshot_dir = os.path.join(workdir, f'snapshots_{n_rows}')
+            with stage('generate', rows=n_rows):
+                write_synthetic_csv(csv_path, n_rows, seed)
+            df = load_housing_data(csv_path, snapshot_dir=snapshot_dir)
+
+            benchmarks = {}
+            if 'load' in groups:
+                benchmarks.update(load_benchmarks(csv_path, snapshot_dir))
+            if 'stats' in groups:
+                benchmarks.update(stats_benchmarks(df))
+            if 'render' in groups:
+                benchmarks.update(render_benchmarks(df))
+
+            for name, func in benchmarks.items():
+                record = {'benchmark': name, 'rows': n_rows}
+                limit = ROW_LIMITS.get(name)
+                if limit is not None and n_rows > limit:
+                    record.update(seconds=None, skipped=f'above row limit {limit:,}')
+                else:
+                    runs = 1 if name.startswith('render.') else repeats
+                    with stage(name, rows=n_rows):
+                        record.update(seconds=_time(func, runs), repeats=runs)
+                results.append(record)
+                timing = 'skipped' if record['seconds'] is None else f"{record['seconds']:.4f}s"
+                print(f'{name:<32} {n_rows:>12,} rows  {timing}')
+            os.remove(csv_path)
+    return results
+
+
+def environment():
+    """Versions and host details stored alongside the timings"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Benchmark loading, statistics and rendering at scale')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='synthetic row counts to test (10^3 to 10^7)')
+    parser.add_argument('--groups', nargs='+', default=['startup', 'load', 'stats', 'render'],
+                        choices=['startup', 'load', 'stats', 'render'])
+    parser.add_argument('--repeats', type=int, default=3, help='best-of repeats for non-render benchmarks')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help='JSON results file')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.groups, args.repeats)
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump({'environment': environment(), 'results': results}, handle, indent=2)
+    print(f"Results written to '{args.output}'")
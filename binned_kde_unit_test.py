@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from scipy.stats import gaussian_kde
+from binned_kde import BinnedSample
+
+
+class TestBinnedKDE(unittest.TestCase):
+    """Unit tests for the shared-binning FFT kernel density estimate"""
+
+    @classmethod
+    def setUpClass(cls):
+        """A skewed sample of property-level yields"""
+        rng = np.random.default_rng(5)
+        cls.values = rng.lognormal(mean=1.3, sigma=0.25, size=50000)
+        cls.binned = BinnedSample(cls.values, bins=12,
+                                  lower=cls.values.min() * 0.95, upper=cls.values.max() * 1.05)
+
+    def test_histogram_matches_numpy(self):
+        """Test that regrouped fine counts equal np.histogram"""
+        counts, edges = self.binned.histogram()
+        expected_counts, expected_edges = np.histogram(self.values, bins=12)
+        np.testing.assert_allclose(edges, expected_edges)
+        np.testing.assert_array_equal(counts, expected_counts)
+
+    def test_histogram_matches_numpy_on_bin_edges(self):
+        """Test rounded values that land exactly on bin edges, constant data and empty input"""
+        rng = np.random.default_rng(6)
+        for bins in (7, 10, 12, 20):
+            for _ in range(50):
+                values = np.round(rng.uniform(2.86, 6.86, 300), 2)
+                counts, edges = BinnedSample(values, bins=bins).histogram()
+                expected_counts, expected_edges = np.histogram(values, bins=bins)
+                np.testing.assert_array_equal(counts, expected_counts)
+                np.testing.assert_allclose(edges, expected_edges)
+        counts, edges = BinnedSample([4.0, 4.0, 4.0], bins=5).histogram()
+        np.testing.assert_array_equal(counts, np.histogram([4.0, 4.0, 4.0], bins=5)[0])
+        np.testing.assert_allclose(edges, np.histogram([4.0, 4.0, 4.0], bins=5)[1])
+        with self.assertRaisesRegex(ValueError, 'No finite values'):
+            BinnedSample([np.nan])
+
+    def test_kde_matches_gaussian_kde(self):
+        """Test the binned estimate against scipy's exact KDE"""
+        x_vals, density = self.binned.kde('scott')
+        exact = gaussian_kde(self.values)(x_vals)
+        self.assertLess(np.max(np.abs(density - exact)), 0.01 * exact.max())
+
+    def test_kde_integrates_to_one(self):
+        """Test that the density covers the padded grid"""
+        x_vals, density = self.binned.kde('silverman')
+        self.assertAlmostEqual(density.sum() * self.binned.width, 1.0, places=2)
+        self.assertLessEqual(x_vals[0], self.values.min() * 0.95 + self.binned.width)
+
+    def test_bandwidth_methods(self):
+        """Test named rules, scalar factors and the error for an unknown method name"""
+        self.assertAlmostEqual(self.binned.bandwidth(0.5), 0.5 * self.binned.std)
+        self.assertLess(self.binned.bandwidth('silverman'), self.binned.bandwidth('scott'))
+        for method in ('Scott', 'auto', None):
+            with self.assertRaisesRegex(ValueError, 'Unknown bandwidth method'):
+                self.binned.bandwidth(method)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
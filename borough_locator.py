@@ -0,0 +1,248 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from geometry_store import load_boundaries
+from instrumentation import profile_run, traced
+from streaming_ingest import AMOUNT_COL, BOROUGH_COL, DATE_COL, DEFAULT_CHUNKSIZE, TYPE_COL, BoroughAccumulator
+
+# Coordinate columns expected in listing extracts
+LON_COL = 'Longitude'
+LAT_COL = 'Latitude'
+
+# Grid cells along each axis of the boundary bounding box
+GRID_CELLS = 256
+
+# Boundary-cell points tested per vectorised batch, to bound temporary memory
+LOCATE_BATCH = 250_000
+
+
+def name_property(collection):
+    """Feature property holding the borough name, matching the heat map's choice"""
+    if not collection['features']:
+        return 'name'
+    properties = collection['features'][0]['properties']
+    for key in ('name', 'NAME'):
+        if key in properties:
+            return key
+    return next(iter(properties))
+
+
+def feature_edges(collection):
+    """Every ring edge as rows of (x0, y0, x1, y1, feature index)
+
+    Holes and the parts of multipolygons are just more rings of the same
+    feature, so the even-odd rule over all of a feature's edges handles them.
+    """
+    parts = []
+    for i, feature in enumerate(collection['features']):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            continue
+        for polygon in polygons:
+            for ring in polygon:
+                points = np.asarray(ring, dtype=float)[:, :2]
+                if len(points) < 3:
+                    continue
+                if not np.array_equal(points[0], points[-1]):
+                    points = np.vstack([points, points[:1]])
+                parts.append(np.column_stack([points[:-1], points[1:], np.full(len(points) - 1, i)]))
+    if not parts:
+        return np.empty((0, 5))
+    return np.vstack(parts)
+
+
+def _csr(keys, values, size):
+    """Group ``values`` by integer ``keys`` into (offsets, values sorted by key)"""
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=size), out=offsets[1:])
+    return offsets, values[order]
+
+
+def _expand(offsets, groups):
+    """Positions into a CSR value array for every member of each group, plus the group index"""
+    start = offsets[groups]
+    count = offsets[groups + 1] - start
+    owner = np.repeat(np.arange(len(groups)), count)
+    within = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    return np.repeat(start, count) + within, owner
+
+
+def _segments_cross(px, py, qx, qy, ax, ay, bx, by):
+    """Whether segments PQ and AB cross, with a half-open rule at shared vertices"""
+    side_p = (bx - ax) * (py - ay) - (by - ay) * (px - ax) > 0
+    side_q = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax) > 0
+    side_a = (qx - px) * (ay - py) - (qy - py) * (ax - px) > 0
+    side_b = (qx - px) * (by - py) - (qy - py) * (bx - px) > 0
+    return (side_p != side_q) & (side_a != side_b)
+
+
+class BoroughLocator:
+    """Bulk point-in-polygon assignment over a uniform grid index
+
+    The boundaries' bounding box is split into ``cells x cells`` cells and
+    every edge is registered with the cells its bounding box overlaps. The
+    borough containing each cell centre is found once by scanline ray
+    casting, row by row. A point in a cell no edge touches simply takes the
+    cell's borough. A point in a boundary cell starts from the centre's
+    borough, then flips membership for every cell edge crossed by the
+    segment from the point to the centre. That segment stays inside the
+    cell, so only the handful of edges in that cell are tested, however
+    detailed the boundaries are. Boroughs are assumed not to overlap.
+    """
+
+    def __init__(self, collection, name_key=None, cells=GRID_CELLS):
+        name_key = name_key or name_property(collection)
+        self.names = np.array([f['properties'].get(name_key) for f in collection['features']], dtype=object)
+        edges = feature_edges(collection)
+        if not len(edges):
+            raise ValueError('No polygon edges in the boundary collection')
+        self.x0, self.y0, self.x1, self.y1 = edges[:, :4].T
+        self.edge_feature = edges[:, 4].astype(np.int64)
+
+        self.cells = cells
+        self.xmin = min(self.x0.min(), self.x1.min())
+        self.ymin = min(self.y0.min(), self.y1.min())
+        # Pad so points on the far edge still fall in the last cell
+        self.width = (max(self.x0.max(), self.x1.max()) - self.xmin) * (1 + 1e-9) / cells or 1.0
+        self.height = (max(self.y0.max(), self.y1.max()) - self.ymin) * (1 + 1e-9) / cells or 1.0
+
+        # Edge -> cell incidence from each edge's bounding box (a superset of the cells it crosses)
+        col0 = self._column(np.minimum(self.x0, self.x1))
+        col1 = self._column(np.maximum(self.x0, self.x1))
+        row0 = self._row(np.minimum(self.y0, self.y1))
+        row1 = self._row(np.maximum(self.y0, self.y1))
+        ncols, nrows = col1 - col0 + 1, row1 - row0 + 1
+        edge = np.repeat(np.arange(len(edges)), ncols * nrows)
+        within = np.arange(len(edge)) - np.repeat(np.cumsum(ncols * nrows) - ncols * nrows, ncols * nrows)
+        cell = (row0[edge] + within // ncols[edge]) * cells + col0[edge] + within % ncols[edge]
+        self.cell_offsets, self.cell_edges = _csr(cell, edge, cells * cells)
+        self.boundary = np.diff(self.cell_offsets) > 0
+
+        row_edge = np.repeat(np.arange(len(edges)), nrows)
+        row = row0[row_edge] + np.arange(len(row_edge)) - np.repeat(np.cumsum(nrows) - nrows, nrows)
+        self.centre_label = self._centre_labels(*_csr(row, row_edge, cells))
+
+    def _column(self, x):
+        return np.clip(np.floor((x - self.xmin) / self.width).astype(np.int64), 0, self.cells - 1)
+
+    def _row(self, y):
+        return np.clip(np.floor((y - self.ymin) / self.height).astype(np.int64), 0, self.cells - 1)
+
+    def _centre_labels(self, row_offsets, row_edges):
+        """Feature containing each cell centre (-1 for none), by one horizontal ray per grid row"""
+        labels = np.full(self.cells * self.cells, -1, dtype=np.int64)
+        centres_x = self.xmin + (np.arange(self.cells) + 0.5) * self.width
+        for row in range(self.cells):
+            edge = row_edges[row_offsets[row]:row_offsets[row + 1]]
+            yc = self.ymin + (row + 0.5) * self.height
+            y0, y1 = self.y0[edge], self.y1[edge]
+            edge = edge[(y0 > yc) != (y1 > yc)]
+            if not len(edge):
+                continue
+            y0, y1 = self.y0[edge], self.y1[edge]
+            x_cross = self.x0[edge] + (yc - y0) * (self.x1[edge] - self.x0[edge]) / (y1 - y0)
+            features, local = np.unique(self.edge_feature[edge], return_inverse=True)
+            onehot = np.zeros((len(edge), len(features)), dtype=np.int64)
+            onehot[np.arange(len(edge)), local] = 1
+            crossings = (x_cross[None, :] > centres_x[:, None]).astype(np.int64) @ onehot
+            odd = crossings % 2 == 1
+            inside = odd.any(axis=1)
+            labels[row * self.cells + np.flatnonzero(inside)] = features[odd[inside].argmax(axis=1)]
+        return labels
+
+    @traced('locate')
+    def locate(self, lon, lat, batch=LOCATE_BATCH):
+        """Feature index for every point, -1 where no borough contains it"""
+        x = np.asarray(lon, dtype=float)
+        y = np.asarray(lat, dtype=float)
+        labels = np.full(len(x), -1, dtype=np.int64)
+        col = np.floor((x - self.xmin) / self.width)
+        row = np.floor((y - self.ymin) / self.height)
+        on_grid = (col >= 0) & (col < self.cells) & (row >= 0) & (row < self.cells)
+        points = np.flatnonzero(on_grid)
+        cell = row[points].astype(np.int64) * self.cells + col[points].astype(np.int64)
+
+        interior = ~self.boundary[cell]
+        labels[points[interior]] = self.centre_label[cell[interior]]
+        points, cell = points[~interior], cell[~interior]
+        for start in range(0, len(points), batch):
+            stop = start + batch
+            self._locate_boundary(x, y, points[start:stop], cell[start:stop], labels)
+        return labels
+
+    def _locate_boundary(self, x, y, points, cell, labels):
+        """Resolve points in boundary cells from the cell centre's label and edge parity"""
+        n_features = len(self.names)
+        position, owner = _expand(self.cell_offsets, cell)
+        edge = self.cell_edges[position]
+        owner_cell = cell[owner]
+        crosses = _segments_cross(x[points[owner]], y[points[owner]],
+                                  self.xmin + (owner_cell % self.cells + 0.5) * self.width,
+                                  self.ymin + (owner_cell // self.cells + 0.5) * self.height,
+                                  self.x0[edge], self.y0[edge], self.x1[edge], self.y1[edge])
+        keys, counts = np.unique(owner[crosses] * n_features + self.edge_feature[edge[crosses]], return_counts=True)
+        flipped = keys[counts % 2 == 1]
+
+        centre = self.centre_label[cell]
+        has_centre = np.flatnonzero(centre >= 0)
+        # Inside = centre membership XOR an odd number of crossings
+        keys, counts = np.unique(np.concatenate([flipped, has_centre * n_features + centre[has_centre]]),
+                                 return_counts=True)
+        inside = keys[counts == 1]
+        labels[points[inside // n_features]] = inside % n_features
+
+    def assign(self, lon, lat):
+        """Borough name for every point, None outside every borough"""
+        labels = self.locate(lon, lat)
+        names = np.empty(len(labels), dtype=object)
+        found = labels >= 0
+        names[found] = self.names[labels[found]]
+        return names
+
+
+def locate_listings(path, locator=None, chunksize=DEFAULT_CHUNKSIZE, lon_col=LON_COL, lat_col=LAT_COL,
+                    type_col=TYPE_COL, amount_col=AMOUNT_COL, date_col=DATE_COL):
+    """Assign geocoded rent and sale listings to boroughs and aggregate them, chunk by chunk
+
+    Listings carry coordinates plus the Type/Amount/Date columns read by
+    streaming_ingest; the result has the cleaned CSV's columns, ready for
+    the heat map. Returns (metrics, number of listings outside every borough).
+    """
+    if locator is None:
+        locator = BoroughLocator(load_boundaries(tolerance=0.0))
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in (lon_col, lat_col, type_col, amount_col, date_col) if c in header]
+    accumulator = BoroughAccumulator()
+    unmatched = 0
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, thousands=',', dtype={type_col: str}):
+        chunk[BOROUGH_COL] = locator.assign(chunk[lon_col].to_numpy(), chunk[lat_col].to_numpy())
+        unmatched += int(chunk[BOROUGH_COL].isna().sum())
+        accumulator.update(chunk, type_col=type_col, amount_col=amount_col, date_col=date_col)
+    return accumulator.result(), unmatched
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Assign geocoded listings to boroughs and aggregate them')
+    parser.add_argument('source', help=f'CSV of listings with {LON_COL}, {LAT_COL}, {TYPE_COL}, {AMOUNT_COL} '
+                                       f'and optionally {DATE_COL}')
+    parser.add_argument('-o', '--output', required=True, help='where to write the aggregated borough table')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows read per chunk')
+    parser.add_argument('--cells', type=int, default=GRID_CELLS, help='grid cells along each axis')
+    parser.add_argument('--heat-map', default=None, help='also render the choropleth of the result to this HTML file')
+    args = parser.parse_args()
+
+    locator = BoroughLocator(load_boundaries(tolerance=0.0), cells=args.cells)
+    metrics, unmatched = locate_listings(args.source, locator, args.chunksize)
+    metrics.to_csv(args.output, index=False)
+    print(f"Wrote {len(metrics)} boroughs to '{args.output}' ({unmatched:,} listings outside every borough)")
+    if args.heat_map:
+        from heat_map_chart import save_heat_map
+        save_heat_map(metrics, args.heat_map)
+        print(f"Heat map saved as '{args.heat_map}'")
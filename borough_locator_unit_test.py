@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from borough_locator import BoroughLocator, feature_edges, locate_listings
+
+
+def _partition(k=6, seed=0):
+    """A k x k jittered quad partition with a hole filled by an island, plus a multipolygon"""
+    rng = np.random.default_rng(seed)
+    xs, ys = np.meshgrid(np.linspace(-0.5, 0.3, k + 1), np.linspace(51.3, 51.7, k + 1))
+    xs[1:-1, 1:-1] += rng.uniform(-0.03, 0.03, (k - 1, k - 1))
+    ys[1:-1, 1:-1] += rng.uniform(-0.015, 0.015, (k - 1, k - 1))
+    features = []
+    for i in range(k):
+        for j in range(k):
+            ring = [[xs[i, j], ys[i, j]], [xs[i, j + 1], ys[i, j + 1]], [xs[i + 1, j + 1], ys[i + 1, j + 1]],
+                    [xs[i + 1, j], ys[i + 1, j]], [xs[i, j], ys[i, j]]]
+            features.append({'type': 'Feature', 'properties': {'name': f'B{i}{j}'},
+                             'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    # Cut a hole in one quad and fill it with an island borough
+    centre = np.mean(features[7]['geometry']['coordinates'][0][:4], axis=0)
+    hole = [[centre[0] - 0.01, centre[1] - 0.005], [centre[0] + 0.01, centre[1] - 0.005],
+            [centre[0] + 0.01, centre[1] + 0.005], [centre[0] - 0.01, centre[1] + 0.005]]
+    hole.append(hole[0])
+    features[7]['geometry']['coordinates'].append(hole[::-1])
+    features.append({'type': 'Feature', 'properties': {'name': 'Island'},
+                     'geometry': {'type': 'Polygon', 'coordinates': [hole]}})
+    # Merge two non-adjacent quads into one multipolygon borough
+    merged = features.pop(2 * k + 4)
+    target = features[0]
+    target['geometry'] = {'type': 'MultiPolygon',
+                          'coordinates': [target['geometry']['coordinates'], merged['geometry']['coordinates']]}
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _naive(collection, x, y):
+    """Polygon-by-polygon even-odd ray casting over every edge"""
+    edges = feature_edges(collection)
+    labels = np.full(len(x), -1)
+    for f in range(len(collection['features'])):
+        x0, y0, x1, y1 = edges[edges[:, 4] == f, :4].T
+        straddle = (y0[None, :] > y[:, None]) != (y1[None, :] > y[:, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x0 + (y[:, None] - y0) * (x1 - x0) / (y1 - y0)
+        inside = (straddle & (x_cross > x[:, None])).sum(axis=1) % 2 == 1
+        labels[inside] = f
+    return labels
+
+
+class TestBoroughLocator(unittest.TestCase):
+    """Unit tests for grid-indexed point-in-polygon assignment"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.collection = _partition()
+        rng = np.random.default_rng(1)
+        cls.x = rng.uniform(-0.55, 0.35, 40000)
+        cls.y = rng.uniform(51.25, 51.75, 40000)
+
+    def test_matches_naive_ray_casting(self):
+        """Test every point against the brute-force reference, at several grid resolutions"""
+        expected = _naive(self.collection, self.x, self.y)
+        for cells in (1, 8, 64):
+            labels = BoroughLocator(self.collection, cells=cells).locate(self.x, self.y)
+            np.testing.assert_array_equal(labels, expected)
+
+    def test_holes_islands_and_multipolygons(self):
+        """Test points in the island, in the holed quad and in both parts of the multipolygon"""
+        locator = BoroughLocator(self.collection, cells=32)
+        names = list(locator.names)
+        island = self.collection['features'][-1]['geometry']['coordinates'][0]
+        cx, cy = np.mean(island[:4], axis=0)
+        ring = np.array(self.collection['features'][7]['geometry']['coordinates'][0][:4])
+        corner = ring[0] + 0.2 * (ring.mean(axis=0) - ring[0])
+        parts = self.collection['features'][0]['geometry']['coordinates']
+        first, second = (np.mean(np.array(p[0][:4]), axis=0) for p in parts)
+        result = locator.assign([cx, corner[0], first[0], second[0], 10.0], [cy, corner[1], first[1], second[1], 0.0])
+        self.assertEqual(list(result), ['Island', names[7], names[0], names[0], None])
+
+    def test_listing_aggregation(self):
+        """Test that geocoded listings aggregate into the cleaned CSV layout"""
+        locator = BoroughLocator(self.collection, cells=16)
+        labels = locator.assign(self.x[:2000], self.y[:2000])
+        listings = pd.DataFrame({'Longitude': self.x[:2000], 'Latitude': self.y[:2000],
+                                 'Type': np.where(np.arange(2000) % 2, 'rent', 'sale'),
+                                 'Amount (£)': np.where(np.arange(2000) % 2, 1500.0, 500000.0),
+                                 'Date': '2018-01-15'})
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'listings.csv')
+            listings.to_csv(path, index=False)
+            metrics, unmatched = locate_listings(path, locator, chunksize=700)
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        self.assertEqual(unmatched, int(pd.isna(labels).sum()))
+        self.assertEqual(set(metrics['Boroughs']), set(labels[~pd.isna(labels)]))
+        total = metrics['Counts of Rents'].sum() + metrics['Average Sales Volume '].sum()
+        self.assertEqual(total, 2000 - unmatched)
+        np.testing.assert_allclose(metrics['Gross Yield (%)'].dropna(), 1500 * 12 / 500000 * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from data_loader import DATA_PATH, load_housing_data
+from instrumentation import profile_run, stage
+
+# Money columns stored as integer pence under a "(p)" name
+MONEY_COLUMNS = ['Average Monthly Rent (£)', 'Average Yearly Rent (£)', 'Average Price (£)']
+
+# Count columns stored as integers when every value is whole
+COUNT_COLUMNS = ['Counts of Rents', 'Average Sales Volume ']
+
+# Label columns stored as categorical codes when values repeat
+CATEGORY_COLUMNS = ['Boroughs', 'Period', 'Property Type']
+
+# Labels become categorical when distinct values are at most this share of rows
+CATEGORY_MAX_SHARE = 0.5
+
+# Other floats narrow to float32 only if every value keeps this many decimal places
+FLOAT32_DECIMALS = 6
+
+
+def pence_column(column):
+    """Compact name of a money column: 'Average Price (£)' -> 'Average Price (p)'"""
+    return column.replace('(£)', '(p)')
+
+
+def _integers(values):
+    """Smallest integer dtype holding ``values``; nullable when any are missing"""
+    if values.isna().any():
+        narrow = pd.to_numeric(values.dropna(), downcast='integer')
+        return values.astype(narrow.dtype.name.capitalize())
+    return pd.to_numeric(values.astype(np.int64), downcast='integer')
+
+
+def _is_whole(values):
+    valid = values.dropna().to_numpy(dtype=float)
+    return bool(np.all(np.isfinite(valid)) and np.all(valid == np.round(valid)))
+
+
+def compact_frame(df, float_decimals=FLOAT32_DECIMALS):
+    """Memory-lean copy of a borough table or panel
+
+    - labels ('Boroughs', 'Period', 'Property Type' and any other text) become categoricals
+      when they repeat, as they do across the periods of a panel
+    - money columns become integer pence, rounded to the nearest penny, renamed to "(p)"
+    - whole-valued counts become the narrowest integer type (nullable if values are missing)
+    - remaining floats become float32 where every value survives to ``float_decimals`` places
+
+    expand_frame() converts back to the layout the plotting code reads.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS or not pd.api.types.is_numeric_dtype(values):
+            repeats = values.nunique(dropna=False) <= CATEGORY_MAX_SHARE * max(len(values), 1)
+            columns[col] = values.astype('category') if repeats else values
+        elif col in MONEY_COLUMNS:
+            columns[pence_column(col)] = _integers(np.round(values.astype(float) * 100))
+        elif pd.api.types.is_integer_dtype(values) or (col in COUNT_COLUMNS and _is_whole(values)):
+            columns[col] = _integers(values)
+        elif pd.api.types.is_float_dtype(values):
+            narrow = values.astype(np.float32)
+            wide = values.to_numpy(dtype=float)
+            error = np.abs(narrow.to_numpy(dtype=float) - wide)
+            ok = np.isnan(wide) | (error <= 0.5 * 10.0 ** -float_decimals)
+            columns[col] = narrow if ok.all() else values
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def expand_frame(compact):
+    """Plotting view of a compact frame: £ floats under the original names, plain text labels
+
+    Whole-pound money and whole counts without gaps come back as int64, as
+    load_housing_data() returns them; everything else as float64.
+    """
+    columns = {}
+    for col in compact.columns:
+        values = compact[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            columns[col] = values.astype(str)
+            continue
+        if col.endswith('(p)'):
+            col, values = col.replace('(p)', '(£)'), values.astype(float) / 100
+        if pd.api.types.is_numeric_dtype(values):
+            if not values.isna().any() and _is_whole(values):
+                values = values.astype(np.int64)
+            else:
+                values = values.astype(np.float64)
+        columns[col] = values
+    return pd.DataFrame(columns, index=compact.index)
+
+
+def memory_report(df, compact=None):
+    """Deep memory use per column, before and after compaction, with a total row"""
+    if compact is None:
+        compact = compact_frame(df)
+    renamed = {pence_column(col): col for col in df.columns if col in MONEY_COLUMNS}
+    after = compact.rename(columns=renamed)
+    before_bytes = df.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': before_bytes,
+        'compact dtype': after.dtypes.astype(str),
+        'compact bytes': after_bytes,
+    })
+    report.loc['Total'] = ['', before_bytes.sum(), '', after_bytes.sum()]
+    report['saving (%)'] = (1 - report['compact bytes'] / report['bytes']) * 100
+    return report
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Report memory saved by the compact data model')
+    parser.add_argument('source', nargs='?', default=DATA_PATH, help='borough metrics CSV')
+    parser.add_argument('--periods', type=int, default=1,
+                        help='repeat the table as this many periods, to size a multi-year panel')
+    args = parser.parse_args()
+
+    df = load_housing_data(args.source)
+    if args.periods > 1:
+        df = pd.concat([df.assign(Period=str(2018 - i)) for i in range(args.periods)], ignore_index=True)
+    with stage('memory_report', rows=len(df)):
+        report = memory_report(df)
+    with pd.option_context('display.width', 120, 'display.max_columns', 10):
+        print(report.round(1))
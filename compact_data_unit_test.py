@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from compact_data import compact_frame, expand_frame, memory_report
+from data_loader import load_housing_data
+
+
+class TestCompactData(unittest.TestCase):
+    """Unit tests for the compact in-memory data model"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_housing_data()
+        cls.panel = pd.concat([cls.df.assign(Period=str(2018 - i)) for i in range(10)], ignore_index=True)
+
+    def test_compact_dtypes(self):
+        """Test categorical labels, integer pence and counts, and float32 yields"""
+        compact = compact_frame(self.panel)
+        self.assertIsInstance(compact['Boroughs'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(compact['Period'].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_integer_dtype(compact['Average Price (p)']))
+        self.assertEqual(compact['Average Price (p)'].iloc[0], round(self.panel['Average Price (£)'].iloc[0] * 100))
+        self.assertTrue(pd.api.types.is_integer_dtype(compact['Counts of Rents']))
+        self.assertEqual(compact['Gross Yield (%)'].dtype, np.float32)
+
+    def test_round_trip_values(self):
+        """Test that the plotting view reproduces the loader's values and column names"""
+        view = expand_frame(compact_frame(self.df))
+        self.assertEqual(list(view.columns), list(self.df.columns))
+        pd.testing.assert_frame_equal(view, self.df, check_dtype=False, rtol=1e-6)
+        self.assertTrue(all(pd.api.types.is_numeric_dtype(view[c]) for c in view.columns if c != 'Boroughs'))
+
+    def test_missing_values_and_precision(self):
+        """Test nullable integers for gaps and float64 kept where float32 would lose precision"""
+        df = pd.DataFrame({'Boroughs': ['A', 'B', 'C'],
+                           'Average Price (£)': [250000.0, np.nan, 410000.5],
+                           'Average Sales Volume ': [12.0, np.nan, 7.0],
+                           'Ratio': [123456789.25, 2.0, 3.0]})
+        compact = compact_frame(df)
+        self.assertEqual(str(compact['Average Price (p)'].dtype), 'Int32')
+        self.assertTrue(compact['Average Sales Volume '].isna().iloc[1])
+        self.assertEqual(compact['Ratio'].dtype, np.float64)
+        view = expand_frame(compact)
+        self.assertEqual(view['Average Price (£)'].iloc[2], 410000.5)
+        self.assertTrue(np.isnan(view['Average Price (£)'].iloc[1]))
+
+    def test_memory_report_and_plotting(self):
+        """Test that a ten-period panel shrinks substantially and the view still plots"""
+        report = memory_report(self.panel)
+        self.assertLess(report.loc['Total', 'compact bytes'], 0.5 * report.loc['Total', 'bytes'])
+        from price_elasticity_graph import plot_rent_vs_sales
+        view = expand_frame(compact_frame(self.panel))
+        fig = plot_rent_vs_sales(view[view['Period'] == '2018'].reset_index(drop=True))
+        plt.close(fig)
+
+
+if __name__ == '__main__':
+    unittest.main()
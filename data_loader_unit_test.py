@@ -0,0 +1,54 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from data_loader import DATA_PATH, load_housing_data, read_housing_csv, snapshot_path
+
+
+class TestDataLoader(unittest.TestCase):
+    """Unit tests for the cached housing data loader"""
+
+    def setUp(self):
+        """Work on a private copy of the CSV and snapshot directory"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmpdir, 'housing.csv')
+        self.snapshot_dir = os.path.join(self.tmpdir, 'snapshots')
+        shutil.copyfile(DATA_PATH, self.csv_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_cleaned_columns_are_float(self):
+        """Test that comma-formatted columns are parsed to floats"""
+        df = read_housing_csv(self.csv_path)
+        self.assertEqual(df['Average Price (£)'].dtype, np.float64)
+        self.assertEqual(df['Counts of Rents'].dtype, np.float64)
+        self.assertEqual(df.loc[df['Boroughs'] == 'Barnet', 'Counts of Rents'].iloc[0], 2810.0)
+
+    def test_snapshot_matches_direct_parse(self):
+        """Test that a memory-mapped snapshot round-trips the parsed frame"""
+        first = load_housing_data(self.csv_path, snapshot_dir=self.snapshot_dir)
+        self.assertTrue(os.path.isdir(snapshot_path(self.csv_path, self.snapshot_dir)))
+        second = load_housing_data(self.csv_path, snapshot_dir=self.snapshot_dir)
+        pd.testing.assert_frame_equal(first, second)
+        base = second['Average Price (£)'].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap, "Snapshot column should be memory-mapped")
+
+    def test_snapshot_keyed_by_content(self):
+        """Test that editing the CSV produces a fresh snapshot"""
+        load_housing_data(self.csv_path, snapshot_dir=self.snapshot_dir)
+        old_target = snapshot_path(self.csv_path, self.snapshot_dir)
+        with open(self.csv_path, 'a', encoding='utf-8') as handle:
+            handle.write('Testshire,1000,"1,000",12000,"250,000",10,4.80\n')
+        df = load_housing_data(self.csv_path, snapshot_dir=self.snapshot_dir)
+        self.assertNotEqual(old_target, snapshot_path(self.csv_path, self.snapshot_dir))
+        self.assertEqual(len(df), 34)
+        self.assertEqual(df['Average Price (£)'].iloc[-1], 250000.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,325 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+from instrumentation import profile_run, stage, traced
+
+# Upstream source of the London borough boundaries
+GEOJSON_URL = 'https://raw.githubusercontent.com/radoi90/housequest-data/master/london_boroughs.geojson'
+
+# On-disk store: the raw download, simplified variants and a checksum manifest
+STORE_DIR = os.path.join('data', 'geometry')
+RAW_FILENAME = 'london_boroughs.geojson'
+MANIFEST_FILENAME = 'manifest.json'
+
+# Douglas-Peucker tolerances in degrees; 0 keeps full resolution
+TOLERANCES = [0.0, 0.0001, 0.0005, 0.001, 0.005]
+
+# Coordinate precision written to the simplified files (5 decimals is roughly 1 m)
+COORD_DECIMALS = 5
+
+# Bumped when simplification changes, so stores built by older code rebuild their levels
+SIMPLIFY_VERSION = 2
+
+
+def _sha256(data):
+    """Return the SHA-256 hex digest of a bytes payload"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _simplify_line(points, tolerance):
+    """Douglas-Peucker simplification of one coordinate array"""
+    n = len(points)
+    if tolerance <= 0 or n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[start + 1:end]
+        a, b = points[start], points[end]
+        direction = b - a
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            # Perpendicular distance of every interior point to the chord, in one pass
+            distances = np.abs(direction[0] * (segment[:, 1] - a[1])
+                               - direction[1] * (segment[:, 0] - a[0])) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def _junctions(ids, ring_of, nxt, prv):
+    """Mask of vertices where the set of rings passing through changes
+
+    Every ring through a vertex also contains it, so the sets on either
+    side match exactly when their sizes do: a vertex is a junction when
+    fewer rings use one of its edges than pass through the vertex.
+    """
+    def distinct_rings(keys):
+        pairs = np.unique(np.column_stack([keys, ring_of]), axis=0)
+        return np.bincount(pairs[:, 0], minlength=keys.max() + 1)[keys]
+
+    edges = np.sort(np.column_stack([ids, ids[nxt]]), axis=1)
+    _, edge_ids = np.unique(edges, axis=0, return_inverse=True)
+    edge_rings = distinct_rings(edge_ids.ravel())
+    vertex_rings = distinct_rings(ids)
+    return (vertex_rings != edge_rings) | (vertex_rings != edge_rings[prv])
+
+
+def _simplify_rings(rings, tolerance):
+    """Simplify closed rings together so borders shared between them stay shared
+
+    Rings are cut into arcs at junctions and every distinct arc is
+    simplified once, in one canonical direction, so neighbouring boroughs
+    keep the same vertices along a common border and no slivers open
+    between them. A ring that would collapse below four points is kept as is.
+    """
+    originals = [np.round(np.asarray(ring, dtype=float)[:, :2], COORD_DECIMALS).tolist() for ring in rings]
+    rings = [np.asarray(ring, dtype=float)[:, :2] for ring in rings]
+    rings = [ring[:-1] if len(ring) > 1 and (ring[0] == ring[-1]).all() else ring for ring in rings]
+    # Rings too short to simplify pass through untouched
+    kept = [k for k, ring in enumerate(rings) if len(ring) >= 3]
+    if tolerance <= 0 or not kept:
+        return originals
+    rings = [rings[k] for k in kept]
+    sizes = np.array([len(ring) for ring in rings])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    points = np.concatenate(rings)
+    _, ids = np.unique(np.round(points, 9), axis=0, return_inverse=True)
+    ids = ids.ravel()
+    ring_of = np.repeat(np.arange(len(rings)), sizes)
+    position = np.arange(len(points)) - offsets[ring_of]
+    nxt = offsets[ring_of] + (position + 1) % sizes[ring_of]
+    prv = offsets[ring_of] + (position - 1) % sizes[ring_of]
+    junction = _junctions(ids, ring_of, nxt, prv)
+
+    arcs = {}
+    result = []
+    for ring, start, size in zip(rings, offsets, sizes):
+        ring_ids = ids[start:start + size]
+        cuts = np.flatnonzero(junction[start:start + size])
+        if not len(cuts):
+            # A ring shared whole (an enclave and its hole) starts at its lowest vertex on both sides
+            cuts = [int(np.argmin(ring_ids))]
+        order = np.roll(np.arange(size), -cuts[0])
+        bounds = list(np.sort((np.asarray(cuts) - cuts[0]) % size)) + [size]
+        pieces = []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            span = np.append(order[a:b], order[b % size])
+            arc_ids = ring_ids[span]
+            differ = np.flatnonzero(arc_ids != arc_ids[::-1])
+            backward = bool(len(differ)) and arc_ids[::-1][differ[0]] < arc_ids[differ[0]]
+            if backward:
+                span = span[::-1]
+            key = ring_ids[span].tobytes()
+            if key not in arcs:
+                arcs[key] = _simplify_line(ring[span], tolerance)
+            arc = arcs[key][::-1] if backward else arcs[key]
+            pieces.append(arc if not pieces else arc[1:])
+        simplified = np.concatenate(pieces)
+        if len(simplified) < 4:
+            simplified = np.vstack([ring, ring[:1]])
+        result.append(np.round(simplified, COORD_DECIMALS).tolist())
+    for k, ring in zip(kept, result):
+        originals[k] = ring
+    return originals
+
+
+def _geometry_rings(geometry):
+    """Every ring of a Polygon/MultiPolygon geometry, in coordinate order"""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return list(geometry['coordinates'])
+    if geometry['type'] == 'MultiPolygon':
+        return [ring for polygon in geometry['coordinates'] for ring in polygon]
+    return []
+
+
+def _rebuild_geometry(geometry, rings):
+    """Copy of ``geometry`` taking its rings, in order, from the iterator ``rings``"""
+    if geometry is None:
+        return None
+    if geometry['type'] == 'Polygon':
+        coordinates = [next(rings) for _ in geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        coordinates = [[next(rings) for _ in polygon] for polygon in geometry['coordinates']]
+    else:
+        return geometry
+    return {'type': geometry['type'], 'coordinates': coordinates}
+
+
+def simplify_geometry(geometry, tolerance):
+    """Return a copy of a Polygon/MultiPolygon geometry simplified to ``tolerance``"""
+    return _rebuild_geometry(geometry, iter(_simplify_rings(_geometry_rings(geometry), tolerance)))
+
+
+def simplify_collection(collection, tolerance):
+    """Return a FeatureCollection with every geometry simplified, shared borders once for both sides"""
+    geometries = [feature.get('geometry') for feature in collection['features']]
+    rings = iter(_simplify_rings([ring for geometry in geometries for ring in _geometry_rings(geometry)],
+                                 tolerance))
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'properties': feature.get('properties', {}),
+                'geometry': _rebuild_geometry(geometry, rings),
+            }
+            for feature, geometry in zip(collection['features'], geometries)
+        ],
+    }
+
+
+def _level_filename(tolerance):
+    """File name of the simplified variant at ``tolerance``"""
+    return f'london_boroughs_tol{tolerance:g}.geojson'
+
+
+def _read_manifest(store_dir):
+    """Return the store manifest, or None if the store has not been seeded"""
+    path = os.path.join(store_dir, MANIFEST_FILENAME)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def _read_verified(path, expected_sha):
+    """Read a file, returning None if it is missing or fails its checksum"""
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as handle:
+        payload = handle.read()
+    if _sha256(payload) != expected_sha:
+        return None
+    return payload
+
+
+def build_store(raw_payload, store_dir=STORE_DIR, source=GEOJSON_URL, tolerances=TOLERANCES):
+    """Write the raw boundaries and every simplified level, then the manifest"""
+    os.makedirs(store_dir, exist_ok=True)
+    collection = json.loads(raw_payload)
+    with open(os.path.join(store_dir, RAW_FILENAME), 'wb') as handle:
+        handle.write(raw_payload)
+
+    levels = {}
+    for tolerance in sorted(tolerances):
+        payload = json.dumps(simplify_collection(collection, tolerance),
+                             separators=(',', ':')).encode('utf-8')
+        filename = _level_filename(tolerance)
+        with open(os.path.join(store_dir, filename), 'wb') as handle:
+            handle.write(payload)
+        levels[f'{tolerance:g}'] = {'file': filename, 'sha256': _sha256(payload), 'bytes': len(payload)}
+
+    manifest = {'source': source, 'sha256': _sha256(raw_payload), 'simplify': SIMPLIFY_VERSION,
+                'levels': levels}
+    manifest_path = os.path.join(store_dir, MANIFEST_FILENAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+
+def seed_store(source=GEOJSON_URL, store_dir=STORE_DIR):
+    """Populate the store from a local GeoJSON file or a URL"""
+    if os.path.isfile(source):
+        with open(source, 'rb') as handle:
+            payload = handle.read()
+    else:
+        from urllib.request import urlopen
+        with stage('download_geometry') as download:
+            # HTTP errors raise urllib.error.HTTPError
+            with urlopen(source, timeout=60) as response:
+                payload = response.read()
+            download.rows = len(payload)
+    return build_store(payload, store_dir, source=source)
+
+
+def _ensure_store(store_dir, offline):
+    """Return a manifest whose raw file verifies, seeding the store if needed"""
+    manifest = _read_manifest(store_dir)
+    if manifest is not None:
+        raw = _read_verified(os.path.join(store_dir, RAW_FILENAME), manifest['sha256'])
+        if raw is not None:
+            if manifest.get('simplify') != SIMPLIFY_VERSION:
+                return build_store(raw, store_dir, source=manifest['source'])
+            return manifest
+    if offline:
+        raise FileNotFoundError(
+            f"No verified boundary data in '{store_dir}'; run 'python geometry_store.py --seed' first")
+    source = manifest['source'] if manifest else GEOJSON_URL
+    return seed_store(source, store_dir)
+
+
+def choose_tolerance(manifest, zoom=None, max_bytes=None):
+    """Pick the simplification level for a zoom level and payload budget
+
+    The coarsest level whose tolerance stays under half a screen pixel at
+    ``zoom`` is preferred; if it exceeds ``max_bytes``, coarser levels are
+    tried until one fits (or the coarsest is returned).
+    """
+    levels = sorted(manifest['levels'].items(), key=lambda item: float(item[0]))
+    candidates = levels
+    if zoom is not None:
+        # Degrees of longitude covered by one 256px-tile pixel at this zoom
+        half_pixel = 360.0 / (256 * 2 ** zoom) / 2
+        fitting = [level for level in levels if float(level[0]) <= half_pixel]
+        candidates = levels[len(fitting) - 1:] if fitting else levels
+    if max_bytes is not None:
+        for key, level in candidates:
+            if level['bytes'] <= max_bytes:
+                return float(key)
+        return float(candidates[-1][0])
+    return float(candidates[0][0])
+
+
+@traced('load_boundaries')
+def load_boundaries(tolerance=None, zoom=None, max_bytes=None, store_dir=STORE_DIR, offline=False):
+    """Return the borough FeatureCollection from the local store
+
+    Only the first call (or a failed checksum) touches the network, unless
+    ``offline`` is set. ``tolerance`` picks a level directly; otherwise one
+    is chosen from ``zoom`` and ``max_bytes``.
+    """
+    manifest = _ensure_store(store_dir, offline)
+    if tolerance is None:
+        tolerance = choose_tolerance(manifest, zoom, max_bytes)
+    level = manifest['levels'].get(f'{tolerance:g}')
+    if level is None:
+        raise KeyError(f'No simplified level for tolerance {tolerance:g}; '
+                       f'available: {sorted(manifest["levels"])}')
+    payload = _read_verified(os.path.join(store_dir, level['file']), level['sha256'])
+    if payload is None:
+        # Derived file is corrupt or missing; rebuild every level from the verified raw file
+        with open(os.path.join(store_dir, RAW_FILENAME), 'rb') as handle:
+            manifest = build_store(handle.read(), store_dir, source=manifest['source'])
+        level = manifest['levels'][f'{tolerance:g}']
+        with open(os.path.join(store_dir, level['file']), 'rb') as handle:
+            payload = handle.read()
+    return json.loads(payload)
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Local store of London borough boundaries')
+    parser.add_argument('--seed', nargs='?', const=GEOJSON_URL, metavar='SOURCE',
+                        help='download (or copy from a local file) and rebuild the store')
+    args = parser.parse_args()
+
+    manifest = seed_store(args.seed) if args.seed else _ensure_store(STORE_DIR, offline=True)
+    for key, level in sorted(manifest['levels'].items(), key=lambda item: float(item[0])):
+        print(f"tolerance {key:>7}: {level['bytes']:>10,} bytes  {level['file']}")
@@ -0,0 +1,112 @@
+import unittest
+import json
+import os
+import tempfile
+import numpy as np
+from pathlib import Path
+from geometry_store import (build_store, choose_tolerance, load_boundaries, seed_store, simplify_collection,
+                            simplify_geometry)
+
+
+def _circle_feature(name, cx, cy, radius=0.05, n=2000):
+    """A finely sampled circular borough"""
+    theta = np.linspace(0, 2 * np.pi, n)
+    ring = np.column_stack([cx + radius * np.cos(theta), cy + radius * np.sin(theta)])
+    ring[-1] = ring[0]
+    return {'type': 'Feature', 'properties': {'name': name},
+            'geometry': {'type': 'Polygon', 'coordinates': [ring.tolist()]}}
+
+
+def _neighbours():
+    """Two boroughs either side of a finely sampled wiggly border, and a round enclave inside the right one"""
+    y = np.linspace(0, 1, 800)
+    border = np.column_stack([0.02 * np.sin(40 * y) + 0.01 * np.sin(7 * y), y]).tolist()
+    left = [[-1.0, 0.0]] + border + [[-1.0, 1.0], [-1.0, 0.0]]
+    right = [[1.0, 1.0]] + border[::-1] + [[1.0, 0.0], [1.0, 1.0]]
+    enclave = _circle_feature('Enclave', 0.5, 0.5, radius=0.2)['geometry']['coordinates'][0]
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'name': 'Left'},
+         'geometry': {'type': 'Polygon', 'coordinates': [left]}},
+        {'type': 'Feature', 'properties': {'name': 'Right'},
+         'geometry': {'type': 'Polygon', 'coordinates': [right, enclave[::-1]]}},
+        {'type': 'Feature', 'properties': {'name': 'Enclave'},
+         'geometry': {'type': 'Polygon', 'coordinates': [enclave]}},
+    ]}
+
+
+class TestGeometryStore(unittest.TestCase):
+    """Unit tests for the offline boundary store"""
+
+    def setUp(self):
+        """Seed a store from a synthetic FeatureCollection"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_dir = self.tmpdir.name
+        collection = {'type': 'FeatureCollection',
+                      'features': [_circle_feature('Camden', -0.15, 51.55),
+                                   _circle_feature('Hackney', -0.05, 51.55)]}
+        self.manifest = build_store(json.dumps(collection).encode('utf-8'), self.store_dir, source='test')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_simplification_reduces_vertices(self):
+        """Test that coarser tolerances keep fewer vertices but a closed ring"""
+        geometry = _circle_feature('x', 0, 0)['geometry']
+        coarse = simplify_geometry(geometry, 0.005)['coordinates'][0]
+        self.assertLess(len(coarse), 100)
+        self.assertGreaterEqual(len(coarse), 4)
+        self.assertEqual(coarse[0], coarse[-1])
+
+    def test_adjacent_borders_coincide(self):
+        """Test that neighbours keep identical vertices along shared borders at every tolerance"""
+        collection = _neighbours()
+        for tolerance in (0.0001, 0.001, 0.005):
+            left, right, enclave = [f['geometry']['coordinates'] for f in
+                                    simplify_collection(collection, tolerance)['features']]
+            left_border = {tuple(p) for p in left[0] if p[0] != -1.0}
+            right_border = {tuple(p) for p in right[0] if p[0] != 1.0}
+            self.assertEqual(left_border, right_border, tolerance)
+            self.assertLess(len(left_border), 800)
+            self.assertIn((0.0, 0.0), left_border)
+            self.assertEqual(right[1], enclave[0][::-1], tolerance)
+            self.assertLess(len(enclave[0]), 2000)
+
+    def test_levels_shrink_with_tolerance(self):
+        """Test that payload size decreases as tolerance grows"""
+        sizes = [level['bytes'] for _, level in
+                 sorted(self.manifest['levels'].items(), key=lambda item: float(item[0]))]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+    def test_choose_tolerance_respects_zoom_and_budget(self):
+        """Test resolution selection by zoom level and payload budget"""
+        self.assertEqual(choose_tolerance(self.manifest, zoom=18), 0.0)
+        self.assertGreater(choose_tolerance(self.manifest, zoom=8), 0.0)
+        smallest = min(level['bytes'] for level in self.manifest['levels'].values())
+        self.assertEqual(choose_tolerance(self.manifest, zoom=18, max_bytes=smallest), 0.005)
+
+    def test_offline_load_and_corruption_recovery(self):
+        """Test that a corrupted level is rebuilt from the verified raw file"""
+        level = self.manifest['levels']['0.001']
+        with open(os.path.join(self.store_dir, level['file']), 'w') as handle:
+            handle.write('corrupt')
+        collection = load_boundaries(tolerance=0.001, store_dir=self.store_dir, offline=True)
+        self.assertEqual([f['properties']['name'] for f in collection['features']], ['Camden', 'Hackney'])
+
+    def test_seed_from_url(self):
+        """Test seeding through a URL, here a file:// one so no network is needed"""
+        raw = os.path.join(self.store_dir, 'london_boroughs.geojson')
+        with tempfile.TemporaryDirectory() as seeded:
+            manifest = seed_store(Path(raw).as_uri(), seeded)
+            self.assertEqual(manifest['sha256'], self.manifest['sha256'])
+            collection = load_boundaries(tolerance=0.0, store_dir=seeded, offline=True)
+        self.assertEqual(len(collection['features']), 2)
+
+    def test_offline_without_store_raises(self):
+        """Test that offline mode never falls back to the network"""
+        with tempfile.TemporaryDirectory() as empty:
+            with self.assertRaises(FileNotFoundError):
+                load_boundaries(store_dir=empty, offline=True)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
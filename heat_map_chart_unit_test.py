@@ -0,0 +1,53 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from heat_map_chart import borough_property, build_heat_map
+from metric_map_unit_test import collection
+
+
+class TestHeatMap(unittest.TestCase):
+    """Unit tests for the gross yield heat map"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.geo = collection(3)
+        self.df = pd.DataFrame({'Boroughs': ['Borough 0', 'Borough 1'],
+                                'Gross Yield (%)': [3.25, 4.75],
+                                'Average Monthly Rent (£)': [1500, 1800],
+                                'Average Price (£)': [550000.0, 460000.0]})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _page(self, df):
+        path = os.path.join(self.tmpdir, 'map.html')
+        build_heat_map(df, self.geo).save(path)
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_boundaries_left_untouched(self):
+        """Test that building a map adds no tooltip fields to the caller's features"""
+        original = copy.deepcopy(self.geo)
+        self._page(self.df)
+        self.assertEqual(self.geo, original)
+
+    def test_values_do_not_leak_between_maps(self):
+        """Test that a borough missing from a later frame shows n/a, not the previous frame's value"""
+        self.assertIn('4.75%', self._page(self.df))
+        page = self._page(self.df[self.df['Boroughs'] == 'Borough 0'])
+        self.assertIn('3.25%', page)
+        self.assertNotIn('4.75%', page)
+
+    def test_borough_property(self):
+        """Test the name key lookup for name, NAME and other property layouts"""
+        self.assertEqual(borough_property(self.geo), 'name')
+        self.assertEqual(borough_property({'features': [{'properties': {'NAME': 'x'}}]}), 'NAME')
+        self.assertEqual(borough_property({'features': [{'properties': {'lad': 'x'}}]}), 'lad')
+        self.assertEqual(borough_property({'features': []}), 'name')
+
+
+if __name__ == '__main__':
+    unittest.main()
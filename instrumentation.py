@@ -0,0 +1,194 @@
+import argparse
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Path of the stage trace; ".csv" writes CSV, anything else JSON Lines. Unset disables tracing.
+TRACE_ENV = 'HRO_TRACE'
+
+# Set to 0 to skip tracemalloc peak-memory tracking (it slows allocation-heavy stages)
+TRACE_MEMORY_ENV = 'HRO_TRACE_MEMORY'
+
+# Path of a cProfile dump for the whole run (readable by snakeviz, flameprof, gprof2dot)
+PROFILE_ENV = 'HRO_PROFILE'
+
+TRACE_FIELDS = ['timestamp', 'pid', 'script', 'stage', 'path', 'seconds', 'peak_mb', 'rows', 'status']
+
+# tracemalloc.reset_peak() is Python 3.9+; before that a stage's peak is the larger of its start and end usage
+_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def trace_path():
+    """Trace file from the environment, or None when tracing is off"""
+    return os.environ.get(TRACE_ENV) or None
+
+
+def _peak():
+    """Traced memory peak since the last reset, or current usage where peaks cannot be reset"""
+    current, peak = tracemalloc.get_traced_memory()
+    return peak if _RESET_PEAK else current
+
+
+def _reset_peak():
+    if _RESET_PEAK:
+        tracemalloc.reset_peak()
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+class Stage:
+    """One timed pipeline stage; set ``rows`` inside the block to record a row count"""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+        self.peak = 0
+        self.path = name
+
+    def __enter__(self):
+        self.output = trace_path()
+        if self.output is None:
+            return self
+        stack = _stack()
+        if stack:
+            self.path = f'{stack[-1].path}/{self.name}'
+        self.memory = os.environ.get(TRACE_MEMORY_ENV, '1') != '0'
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            # Fold the enclosing stage's peak so far into it before resetting the counter
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, _peak())
+            _reset_peak()
+            self.peak = _peak()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.output is None:
+            return False
+        self.seconds = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        if self.memory:
+            self.peak = max(self.peak, _peak())
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            _reset_peak()
+        write_record({
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'pid': os.getpid(),
+            'script': os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else '',
+            'stage': self.name,
+            'path': self.path,
+            'seconds': round(self.seconds, 6),
+            'peak_mb': round(self.peak / 2 ** 20, 3) if self.memory else None,
+            'rows': self.rows,
+            'status': 'ok' if exc_type is None else exc_type.__name__,
+        }, self.output)
+        return False
+
+
+def stage(name, rows=None):
+    """Context manager timing one stage; a no-op unless HRO_TRACE is set"""
+    return Stage(name, rows)
+
+
+def traced(name=None):
+    """Decorator running a function as a stage; frames and arrays it returns set the row count"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if trace_path() is None:
+                return func(*args, **kwargs)
+            with Stage(label) as current:
+                result = func(*args, **kwargs)
+                if hasattr(result, 'shape') and len(result.shape):
+                    current.rows = int(result.shape[0])
+                return result
+        return wrapper
+    return decorate
+
+
+def write_record(record, output):
+    """Append one stage record; each is written whole, so worker processes can share a file"""
+    with _write_lock:
+        if output.endswith('.csv'):
+            new = not os.path.exists(output) or os.path.getsize(output) == 0
+            with open(output, 'a', newline='', encoding='utf-8') as handle:
+                writer = csv.DictWriter(handle, fieldnames=TRACE_FIELDS)
+                if new:
+                    writer.writeheader()
+                writer.writerow(record)
+        else:
+            with open(output, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps(record) + '\n')
+
+
+def read_trace(path):
+    """Load a trace written in either format as a DataFrame"""
+    import pandas as pd
+
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_json(path, lines=True)
+
+
+def summarize(trace):
+    """Total and mean time, call count, peak memory and rows per stage path, slowest first"""
+    summary = trace.groupby('path').agg(calls=('seconds', 'size'), total_seconds=('seconds', 'sum'),
+                                        mean_seconds=('seconds', 'mean'), peak_mb=('peak_mb', 'max'),
+                                        rows=('rows', 'max'))
+    return summary.sort_values('total_seconds', ascending=False)
+
+
+def profile_run():
+    """Profile the rest of the run when HRO_PROFILE is set; dumped at exit by the starting process
+
+    Called first thing in each script's ``__main__`` block, so importing a
+    module never starts the profiler.
+    """
+    output = os.environ.get(PROFILE_ENV)
+    if not output:
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    owner = os.getpid()
+
+    def dump():
+        if os.getpid() == owner:
+            profiler.disable()
+            profiler.dump_stats(output)
+
+    profiler.enable()
+    atexit.register(dump)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarise a stage trace written with HRO_TRACE')
+    parser.add_argument('trace', help='trace file (.jsonl/.json or .csv)')
+    args = parser.parse_args()
+
+    import pandas as pd
+    with pd.option_context('display.width', 200, 'display.max_rows', 500, 'display.max_colwidth', 80,
+                           'display.max_columns', 10):
+        print(summarize(read_trace(args.trace)).round(4))
@@ -0,0 +1,114 @@
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from instrumentation import PROFILE_ENV, TRACE_ENV, TRACE_MEMORY_ENV, read_trace, stage, summarize, traced
+
+
+@traced('build_rows')
+def build_rows(n):
+    return np.zeros(n)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Unit tests for stage tracing"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _environ(self, filename, **extra):
+        path = os.path.join(self.tmpdir, filename)
+        values = {TRACE_ENV: path, **extra}
+        return path, mock.patch.dict(os.environ, values)
+
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded without the trace variable"""
+        with mock.patch.dict(os.environ):
+            os.environ.pop(TRACE_ENV, None)
+            with stage('quiet') as current:
+                current.rows = 3
+            self.assertEqual(build_rows(4).shape, (4,))
+        self.assertIsNone(current.seconds)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_nested_stages_record_paths_rows_and_peaks(self):
+        """Test nesting, row counts and that an outer peak covers its inner stages"""
+        path, environ = self._environ('trace.jsonl')
+        with environ:
+            with stage('outer'):
+                with stage('inner') as inner:
+                    block = np.ones(2_000_000)
+                    inner.rows = len(block)
+                    del block
+                build_rows(10)
+        trace = read_trace(path).set_index('path')
+        self.assertEqual(list(trace.index), ['outer/inner', 'outer/build_rows', 'outer'])
+        self.assertEqual(trace.at['outer/inner', 'rows'], 2_000_000)
+        self.assertEqual(trace.at['outer/build_rows', 'rows'], 10)
+        self.assertGreaterEqual(trace.at['outer/inner', 'peak_mb'], 15)
+        self.assertGreaterEqual(trace.at['outer', 'peak_mb'], trace.at['outer/inner', 'peak_mb'])
+        self.assertGreaterEqual(trace.at['outer', 'seconds'], trace.at['outer/inner', 'seconds'])
+        self.assertTrue((trace['status'] == 'ok').all())
+
+    def test_csv_trace_records_failures(self):
+        """Test the CSV format and that a failing stage is recorded before the error propagates"""
+        path, environ = self._environ('trace.csv', **{TRACE_MEMORY_ENV: '0'})
+        with environ:
+            with self.assertRaises(ValueError):
+                with stage('broken'):
+                    raise ValueError('bad input')
+            with stage('fine', rows=5):
+                pass
+        trace = read_trace(path)
+        self.assertEqual(trace['stage'].tolist(), ['broken', 'fine'])
+        self.assertEqual(trace['status'].tolist(), ['ValueError', 'ok'])
+        self.assertTrue(trace['peak_mb'].isna().all())
+
+    def test_summary_totals_per_path(self):
+        """Test that repeated stages are summed and sorted slowest first"""
+        trace = pd.DataFrame({'path': ['a', 'b', 'a'], 'seconds': [1.0, 1.5, 2.0],
+                              'peak_mb': [1.0, 3.0, 2.0], 'rows': [10, None, 20]})
+        summary = summarize(trace)
+        self.assertEqual(list(summary.index), ['a', 'b'])
+        self.assertEqual(summary.at['a', 'calls'], 2)
+        self.assertEqual(summary.at['a', 'total_seconds'], 3.0)
+        self.assertEqual(summary.at['a', 'peak_mb'], 2.0)
+        self.assertEqual(summary.at['a', 'rows'], 20)
+
+    def test_profile_written_at_exit(self):
+        """Test that profile_run() under HRO_PROFILE dumps a pstats profile, and importing alone does not"""
+        output = os.path.join(self.tmpdir, 'run.prof')
+        env = {**os.environ, PROFILE_ENV: output}
+        env.pop(TRACE_ENV, None)
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        subprocess.run([sys.executable, '-c', 'import instrumentation; sum(range(1000))'],
+                       cwd=cwd, env=env, check=True)
+        self.assertFalse(os.path.exists(output))
+        code = 'import instrumentation; instrumentation.profile_run(); sum(range(1000))'
+        subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env, check=True)
+        stats = pstats.Stats(output)
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_peaks_without_reset_peak(self):
+        """Test that stages still record memory where tracemalloc cannot reset its peak (Python 3.8)"""
+        path, environ = self._environ('trace.jsonl')
+        with environ, mock.patch('instrumentation._RESET_PEAK', False):
+            with stage('outer'):
+                with stage('inner'):
+                    block = np.ones(1_000_000)
+                del block
+        trace = read_trace(path).set_index('path')
+        self.assertGreaterEqual(trace.at['outer/inner', 'peak_mb'], 7)
+        self.assertGreaterEqual(trace.at['outer', 'peak_mb'], trace.at['outer/inner', 'peak_mb'])
+
+if __name__ == '__main__':
+    unittest.main()
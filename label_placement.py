@@ -0,0 +1,122 @@
+import numpy as np
+
+# Candidate label directions around a point, in preference order
+DIRECTIONS = np.array([
+    (1, 1), (-1, 1), (1, -1), (-1, -1),
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+], dtype=float)
+
+# Box and arrow styling shared with the original hand-placed annotations
+LABEL_BBOX = dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='gray', alpha=0.7)
+LABEL_ARROW = dict(arrowstyle='->', connectionstyle='arc3,rad=0', color='gray', lw=0.5)
+
+
+def label_scores(x, y):
+    """Score points by how far they sit from the bulk, using robust z-scores"""
+    scores = np.zeros(len(x))
+    for values in (np.asarray(x, dtype=float), np.asarray(y, dtype=float)):
+        q1, median, q3 = np.nanpercentile(values, [25, 50, 75])
+        spread = (q3 - q1) or np.nanstd(values) or 1.0
+        scores += ((values - median) / spread) ** 2
+    return np.sqrt(scores)
+
+
+def select_labels(x, y, max_labels=None, scores=None):
+    """Return point indices to label, most distinctive first"""
+    if scores is None:
+        scores = label_scores(x, y)
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    return order if max_labels is None else order[:max_labels]
+
+
+class GridIndex:
+    """Uniform-grid spatial hash of axis-aligned boxes in display pixels"""
+
+    def __init__(self, cell_size):
+        self.cell_size = max(float(cell_size), 1.0)
+        self.cells = {}
+
+    def _cells(self, box):
+        """Grid cells overlapped by a (x0, y0, x1, y1) box"""
+        x0, y0, x1, y1 = (np.floor(np.asarray(box) / self.cell_size)).astype(int)
+        return ((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def insert(self, box):
+        """Register a box as occupied"""
+        for cell in self._cells(box):
+            self.cells.setdefault(cell, []).append(box)
+
+    def collides(self, box):
+        """Return True if ``box`` overlaps any registered box"""
+        x0, y0, x1, y1 = box
+        for cell in self._cells(box):
+            for other in self.cells.get(cell, ()):
+                if x0 < other[2] and other[0] < x1 and y0 < other[3] and other[1] < y1:
+                    return True
+        return False
+
+
+def place_labels(ax, x, y, labels, max_labels=None, scores=None, fontsize=8,
+                 marker_size=150, gap=4, arrows=True, bbox=LABEL_BBOX, **text_kwargs):
+    """Annotate points on ``ax`` without overlapping each other or the markers
+
+    Points are visited in score order; each tries eight positions around
+    its marker and takes the first whose box is inside the axes and free of
+    collisions, including text already drawn on the axes (quadrant labels).
+    Collision checks go through a grid index, so placement is close to
+    linear in the number of points. Call it after the layout is
+    final (after tight_layout/colorbar) so display coordinates are stable.
+    Returns the created annotations.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    labels = [str(label) for label in labels]
+    if len(x) == 0:
+        return []
+
+    # Reading the limits resolves any pending autoscale, so transData is final
+    ax.get_xlim()
+    ax.get_ylim()
+    px_per_pt = ax.figure.dpi / 72.0
+    points = ax.transData.transform(np.column_stack([x, y]))
+
+    # Approximate text extents from character counts; avoids a renderer round-trip per label
+    widths = (np.array([len(label) for label in labels]) * 0.6 * fontsize + 8) * px_per_pt
+    height = (1.4 * fontsize + 6) * px_per_pt
+    radius = np.sqrt(marker_size) / 2 * px_per_pt
+
+    index = GridIndex(max(widths.max(), height, 2 * radius))
+    for px, py in points:
+        index.insert((px - radius, py - radius, px + radius, py + radius))
+
+    # Existing annotations such as quadrant captions are obstacles too
+    get_renderer = getattr(ax.figure.canvas, 'get_renderer', None)
+    if get_renderer is not None:
+        renderer = get_renderer()
+        for text in ax.texts:
+            index.insert(tuple(text.get_window_extent(renderer).extents))
+
+    ax_x0, ax_y0, ax_x1, ax_y1 = ax.bbox.extents
+    reach = radius + gap * px_per_pt
+    annotations = []
+    for i in select_labels(x, y, max_labels, scores):
+        if not np.isfinite(points[i]).all():
+            continue
+        half = np.array([widths[i] / 2, height / 2])
+        # Box centres pushed out along each direction so the box clears the marker
+        centres = points[i] + DIRECTIONS * (reach + half)
+        boxes = np.hstack([centres - half, centres + half])
+        inside = ((boxes[:, 0] >= ax_x0) & (boxes[:, 2] <= ax_x1)
+                  & (boxes[:, 1] >= ax_y0) & (boxes[:, 3] <= ax_y1))
+        for box, centre in zip(boxes[inside], centres[inside]):
+            box = tuple(box)
+            if index.collides(box):
+                continue
+            index.insert(box)
+            offset = (centre - points[i]) / px_per_pt
+            annotations.append(ax.annotate(
+                labels[i], (x[i], y[i]), xytext=tuple(offset), textcoords='offset points',
+                fontsize=fontsize, ha='center', va='center', bbox=bbox,
+                arrowprops=LABEL_ARROW if arrows else None, **text_kwargs))
+            break
+    return annotations
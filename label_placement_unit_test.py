@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend for testing
+import matplotlib.pyplot as plt
+from label_placement import GridIndex, place_labels, select_labels
+
+
+class TestLabelPlacement(unittest.TestCase):
+    """Unit tests for collision-aware label placement"""
+
+    def test_select_labels_prefers_outliers(self):
+        """Test that the most extreme point is labelled first"""
+        x = np.array([1.0, 2.0, 3.0, 100.0, 2.5])
+        y = np.array([1.0, 2.0, 3.0, 2.0, 2.5])
+        self.assertEqual(select_labels(x, y, max_labels=1).tolist(), [3])
+
+    def test_grid_index_collisions(self):
+        """Test overlap detection across grid cells"""
+        index = GridIndex(10)
+        index.insert((0, 0, 15, 5))
+        self.assertTrue(index.collides((12, 2, 30, 8)))
+        self.assertFalse(index.collides((16, 0, 30, 5)))
+
+    def test_placed_labels_do_not_overlap(self):
+        """Test that no two placed labels overlap on a dense scatter"""
+        rng = np.random.default_rng(3)
+        x, y = rng.normal(size=(2, 2000))
+        fig, ax = plt.subplots(figsize=(8, 6))
+        ax.scatter(x, y, s=20)
+        annotations = place_labels(ax, x, y, [f'Area {i}' for i in range(len(x))], marker_size=20)
+        fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        boxes = [a.get_bbox_patch().get_window_extent(renderer) for a in annotations]
+        plt.close(fig)
+
+        self.assertGreater(len(boxes), 10)
+        self.assertLess(len(boxes), len(x))
+        for i, a in enumerate(boxes):
+            for b in boxes[i + 1:]:
+                self.assertFalse(a.overlaps(b), "Labels overlap")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,231 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+from artifact_cache import cached_render
+from data_loader import DATA_PATH, load_housing_data
+from geometry_store import load_boundaries
+from heat_map_chart import COLOR_SCALE, MAX_GEOMETRY_BYTES, ZOOM_START, borough_property
+from instrumentation import profile_run, stage
+from query_service import METRICS
+
+OUTPUT_PATH = 'london_metrics_map.html'
+
+# Layers shown by default, in menu order; the first is drawn when the page opens
+DEFAULT_METRICS = ['gross_yield', 'rent', 'price', 'sales', 'renters']
+
+# Short name -> (prefix, suffix, decimals) used for tooltips, the legend and value rounding
+FORMATS = {
+    'gross_yield': ('', '%', 2),
+    'rent': ('£', '', 0),
+    'yearly_rent': ('£', '', 0),
+    'price': ('£', '', 0),
+    'sales': ('', '', 0),
+    'renters': ('', '', 0),
+}
+
+MISSING_COLOR = 'lightgray'
+
+# Client side of the map: one GeoJSON layer recoloured from the attribute table when the metric changes
+SCRIPT = '''
+{% macro script(this, kwargs) %}
+(function() {
+    var table = {{ this.table|tojson }};
+    var scale = {{ this.colors|tojson }};
+    var missing = {{ this.missing|tojson }};
+    var layer = {{ this.layer.get_name() }};
+    var map = {{ this._parent.get_name() }};
+    var current = table.metrics[0];
+
+    function rgb(hex) {
+        return [1, 3, 5].map(function(i) { return parseInt(hex.substr(i, 2), 16); });
+    }
+    var stops = scale.map(rgb);
+
+    function color(value, metric) {
+        if (value === null) { return missing; }
+        var t = metric.max > metric.min ? (value - metric.min) / (metric.max - metric.min) : 0;
+        var x = Math.min(Math.max(t, 0), 1) * (stops.length - 1);
+        var i = Math.min(Math.floor(x), stops.length - 2), f = x - i;
+        var c = stops[i].map(function(v, k) { return Math.round(v + f * (stops[i + 1][k] - v)); });
+        return 'rgb(' + c.join(',') + ')';
+    }
+
+    function format(value, metric) {
+        if (value === null) { return 'n/a'; }
+        var text = value.toLocaleString('en-GB', {minimumFractionDigits: metric.decimals,
+                                                  maximumFractionDigits: metric.decimals});
+        return metric.prefix + text + metric.suffix;
+    }
+
+    function tooltip(feature) {
+        var i = feature.properties.i;
+        var rows = table.metrics.map(function(metric) {
+            var row = metric.label + ': ' + format(metric.values[i], metric);
+            return metric === current ? '<b>' + row + '</b>' : row;
+        });
+        return '<b>' + table.names[i] + '</b><br>' + rows.join('<br>');
+    }
+
+    function style(feature) {
+        return {fillColor: color(current.values[feature.properties.i], current),
+                color: 'white', fillOpacity: 0.8, opacity: 0.5, weight: 1};
+    }
+
+    var legend = L.control({position: 'topright'});
+    legend.onAdd = function() {
+        var div = L.DomUtil.create('div', 'metric-legend');
+        div.style.cssText = 'background: white; padding: 8px; border: 2px solid grey; font: 12px Arial;';
+        var select = L.DomUtil.create('select', '', div);
+        table.metrics.forEach(function(metric, k) {
+            var option = L.DomUtil.create('option', '', select);
+            option.value = k;
+            option.text = metric.label;
+        });
+        var bar = L.DomUtil.create('div', '', div);
+        bar.style.cssText = 'height: 10px; margin-top: 6px; background: linear-gradient(to right, '
+                            + scale.join(', ') + ');';
+        var range = L.DomUtil.create('div', '', div);
+        range.style.cssText = 'display: flex; justify-content: space-between;';
+        function update() {
+            range.innerHTML = '<span>' + format(current.min, current) + '</span><span>'
+                              + format(current.max, current) + '</span>';
+        }
+        select.onchange = function() {
+            current = table.metrics[select.value];
+            layer.setStyle(style);
+            update();
+        };
+        L.DomEvent.disableClickPropagation(div);
+        update();
+        return div;
+    };
+    legend.addTo(map);
+
+    layer.setStyle(style);
+    layer.eachLayer(function(shape) {
+        shape.bindTooltip(function() { return tooltip(shape.feature); }, {sticky: true});
+        shape.on('mouseover', function() { shape.setStyle({weight: 3, color: '#000000'}); });
+        shape.on('mouseout', function() { shape.setStyle(style(shape.feature)); });
+    });
+})();
+{% endmacro %}
+'''
+
+
+def _round(value, decimals):
+    if value is None or not math.isfinite(value):
+        return None
+    return round(float(value), decimals) if decimals else int(round(value))
+
+
+def attribute_table(df, names, metrics=None):
+    """Per-feature metric values as columns in feature order, with each metric's range and format
+
+    Missing boroughs and values are None. Values are rounded to the
+    precision shown, so each one costs a few bytes of page weight.
+    """
+    if metrics is None:
+        metrics = [m for m in DEFAULT_METRICS if METRICS[m] in df.columns]
+    rows = df.drop_duplicates('Boroughs').set_index('Boroughs')
+    table = {'names': list(names), 'metrics': []}
+    for metric in metrics:
+        column = METRICS.get(metric, metric)
+        if column not in rows.columns:
+            raise KeyError(f'Unknown metric {metric!r}')
+        prefix, suffix, decimals = FORMATS.get(metric, ('', '', 2))
+        values = [_round(v, decimals) for v in rows[column].astype(float).reindex(names)]
+        present = [v for v in values if v is not None]
+        table['metrics'].append({
+            'key': metric, 'label': column.strip(), 'values': values,
+            'min': min(present) if present else 0, 'max': max(present) if present else 1,
+            'prefix': prefix, 'suffix': suffix, 'decimals': decimals,
+        })
+    return table
+
+
+def build_metric_map(df, london_geo, metrics=None, zoom_start=ZOOM_START):
+    """Folium map with every metric as a switchable layer over one embedded geometry
+
+    Features keep only their name and index; the values live in a
+    columnar attribute table and the page recolours the single GeoJSON
+    layer when another metric is chosen, so each extra metric adds one
+    number per borough rather than another copy of the boundaries.
+    """
+    import folium
+    from branca.element import MacroElement
+    from folium.template import Template
+
+    name_key = borough_property(london_geo)
+    names = [feature['properties'].get(name_key) for feature in london_geo['features']]
+    table = attribute_table(df, names, metrics)
+    if not table['metrics']:
+        raise ValueError('No metrics to draw')
+
+    london_map = folium.Map(
+        location=[51.5074, -0.1278],
+        zoom_start=zoom_start,
+        tiles='https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png',
+        attr='&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors &copy; <a href="https://carto.com/attributions">CARTO</a>'
+    )
+    features = [{'type': 'Feature', 'properties': {'name': name, 'i': i}, 'geometry': feature['geometry']}
+                for i, (name, feature) in enumerate(zip(names, london_geo['features']))]
+    layer = folium.GeoJson({'type': 'FeatureCollection', 'features': features}, name='Boroughs')
+    layer.add_to(london_map)
+
+    layers = MacroElement()
+    layers._name = 'MetricLayers'
+    layers._template = Template(SCRIPT)
+    layers.layer, layers.table, layers.colors, layers.missing = layer, table, COLOR_SCALE, MISSING_COLOR
+    london_map.add_child(layers)
+
+    title_html = '''
+                 <div style="position: fixed;
+                             top: 10px; left: 50px; width: 300px; height: 50px;
+                             background-color: white; border:2px solid grey; z-index:9999;
+                             font-size:16px; font-weight: bold; padding: 10px">
+                 London Boroughs - Housing Metrics
+                 </div>
+                 '''
+    london_map.get_root().html.add_child(folium.Element(title_html))
+    return london_map
+
+
+def save_metric_map(df, output_path=OUTPUT_PATH, metrics=None, zoom_start=ZOOM_START, max_bytes=MAX_GEOMETRY_BYTES):
+    """Build and save the multi-metric map, served from the artifact cache when nothing changed
+
+    Returns True on a cache hit.
+    """
+    london_geo = load_boundaries(zoom=zoom_start, max_bytes=max_bytes)
+    geometry_digest = hashlib.sha256(json.dumps(london_geo, sort_keys=True).encode('utf-8')).hexdigest()
+    if metrics is None:
+        metrics = [m for m in DEFAULT_METRICS if METRICS[m] in df.columns]
+    columns = ['Boroughs'] + [METRICS.get(m, m) for m in metrics]
+
+    def render(path):
+        london_map = build_metric_map(df, london_geo, metrics, zoom_start)
+        with stage('save_html'):
+            london_map.save(path)
+
+    return cached_render(output_path, render, df, columns,
+                         params={'zoom': zoom_start, 'geometry': geometry_digest, 'metrics': list(metrics)},
+                         code=[__file__])
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='One interactive borough map with a layer per metric')
+    parser.add_argument('--data', default=DATA_PATH, help='borough metrics CSV')
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help=f'short names ({", ".join(METRICS)}) or column names; default: all present')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH, help='HTML file to write')
+    parser.add_argument('--no-browser', action='store_true', help='do not open the map when done')
+    args = parser.parse_args()
+
+    if save_metric_map(load_housing_data(args.data), args.output, args.metrics):
+        print("Metric map unchanged, served from cache")
+    print(f"Metric map saved as '{args.output}'")
+    if not args.no_browser:
+        import webbrowser
+        webbrowser.open('file://' + os.path.abspath(args.output))
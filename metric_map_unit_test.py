@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from metric_map import attribute_table, build_metric_map
+
+
+def collection(n):
+    """``n`` square boroughs with detailed rings, one missing from the data"""
+    features = []
+    for k in range(n):
+        x0 = -0.5 + 0.05 * k
+        ring = [[round(x0 + 0.04 * j / 50, 6), 51.5] for j in range(50)]
+        ring += [[x0 + 0.04, 51.54], [x0, 51.54], [x0, 51.5]]
+        features.append({'type': 'Feature', 'properties': {'name': f'Borough {k}'},
+                         'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class TestMetricMap(unittest.TestCase):
+    """Unit tests for the multi-metric interactive map"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        n = 20
+        self.geo = collection(n)
+        self.df = pd.DataFrame({'Boroughs': [f'Borough {k}' for k in range(n - 1)],
+                                'Gross Yield (%)': [3.0 + k / 7 for k in range(n - 1)],
+                                'Average Monthly Rent (£)': [1500.4 + 10 * k for k in range(n - 1)],
+                                'Average Price (£)': [500000.0 + 1000 * k for k in range(n - 1)],
+                                'Average Sales Volume ': [100 + k for k in range(n - 1)],
+                                'Counts of Rents': [2000 + k for k in range(n - 1)]})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _page_bytes(self, metrics):
+        path = os.path.join(self.tmpdir, f'{len(metrics)}.html')
+        build_metric_map(self.df, self.geo, metrics).save(path)
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_attribute_table_follows_features(self):
+        """Test values in feature order, rounded to display precision, None when missing"""
+        names = ['Borough 1', 'Islington', 'Borough 0']
+        table = attribute_table(self.df, names, ['gross_yield', 'rent'])
+        self.assertEqual(table['names'], names)
+        yields, rents = table['metrics']
+        self.assertEqual(yields['values'], [3.14, None, 3.0])
+        self.assertEqual(rents['values'], [1510, None, 1500])
+        self.assertEqual((rents['min'], rents['max'], rents['prefix']), (1500, 1510, '£'))
+        self.assertEqual([m['key'] for m in attribute_table(self.df, names)['metrics']],
+                         ['gross_yield', 'rent', 'price', 'sales', 'renters'])
+
+    def test_unknown_metric(self):
+        """Test that a metric missing from the data is rejected"""
+        with self.assertRaises(KeyError):
+            attribute_table(self.df, ['Borough 0'], ['not_a_metric'])
+
+    def test_geometry_embedded_once(self):
+        """Test that every metric shares one copy of the boundaries"""
+        page = self._page_bytes(['gross_yield', 'rent', 'price', 'sales', 'renters'])
+        self.assertEqual(page.count('[-0.5, 51.54]'), 1)
+        self.assertEqual(page.count('"type": "Polygon"'), len(self.geo['features']))
+        self.assertEqual(page.count('var table = '), 1)
+
+    def test_hover_restores_metric_colour(self):
+        """Test that leaving a borough restores its metric colour, not the layer's default style"""
+        page = self._page_bytes(['gross_yield'])
+        self.assertIn('shape.setStyle(style(shape.feature))', page)
+        self.assertNotIn('resetStyle', page)
+
+    def test_page_weight_nearly_constant_in_metrics(self):
+        """Test that four extra metrics add far less than one copy of the geometry"""
+        one = len(self._page_bytes(['gross_yield']).encode('utf-8'))
+        five = len(self._page_bytes(['gross_yield', 'rent', 'price', 'sales', 'renters']).encode('utf-8'))
+        geometry = len(str(self.geo).encode('utf-8'))
+        self.assertLess(five - one, geometry / 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,378 @@
+import argparse
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from instrumentation import profile_run, stage
+from stats_engine import ols_from_moments
+from streaming_ingest import (AMOUNT_COL, BOROUGH_COL, DATE_COL, DEFAULT_CHUNKSIZE, OUTPUT_COLUMNS, RENT_TYPE,
+                              SALE_TYPE, TYPE_COL)
+
+# Quantiles tracked for every borough's rents and prices
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+# Bumped whenever the checkpoint layout changes; older checkpoints are rejected
+CHECKPOINT_VERSION = 1
+
+# Chart axes whose cross-borough medians split the elasticity plots into quadrants
+MEDIAN_COLUMNS = ['Average Monthly Rent (£)', 'Average Sales Volume ', 'Average Price (£)', 'Counts of Rents']
+
+
+class RunningMoments:
+    """Count, mean and variance updated one value at a time (Welford's algorithm)"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count, self.mean, self.m2 = count, mean, m2
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1); NaN below two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile from five markers (the P-square algorithm)
+
+    Memory and update cost are constant. The first five values are kept
+    exactly; after that the markers track the minimum, the maximum, the
+    quantile and the points halfway to it, moved by piecewise-parabolic
+    interpolation as values arrive.
+    """
+
+    __slots__ = ('p', 'heights', 'positions', 'desired', 'count')
+
+    def __init__(self, p, heights=None, positions=None, desired=None, count=0):
+        if not 0 < p < 1:
+            raise ValueError(f'Quantile must be between 0 and 1, got {p}')
+        self.p = p
+        self.heights = list(heights or [])
+        self.positions = list(positions or [0, 1, 2, 3, 4])
+        self.desired = list(desired or [0, 2 * p, 4 * p, 2 + 2 * p, 4])
+        self.count = count
+
+    def update(self, x):
+        self.count += 1
+        q, n = self.heights, self.positions
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        p = self.p
+        for i, step in enumerate((0, p / 2, p, (1 + p) / 2, 1)):
+            self.desired[i] += step
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    @property
+    def value(self):
+        """Current estimate; exact (linear interpolation) until five values are seen"""
+        if not self.heights:
+            return math.nan
+        if self.count <= 5:
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+    def to_dict(self):
+        return {'p': self.p, 'heights': self.heights, 'positions': self.positions,
+                'desired': self.desired, 'count': self.count}
+
+
+class RunningDistribution:
+    """Moments and quantile sketches of one stream of amounts"""
+
+    __slots__ = ('moments', 'quantiles')
+
+    def __init__(self, quantiles=DEFAULT_QUANTILES):
+        self.moments = RunningMoments()
+        self.quantiles = [P2Quantile(p) for p in quantiles]
+
+    def update(self, x):
+        self.moments.update(x)
+        for sketch in self.quantiles:
+            sketch.update(x)
+
+    def to_dict(self):
+        return {'moments': self.moments.to_dict(), 'quantiles': [q.to_dict() for q in self.quantiles]}
+
+    @classmethod
+    def from_dict(cls, state):
+        dist = cls(())
+        dist.moments = RunningMoments(**state['moments'])
+        dist.quantiles = [P2Quantile(**q) for q in state['quantiles']]
+        return dist
+
+
+class OnlineRegression:
+    """Simple linear regression of y on x updated one observation at a time
+
+    Keeps the weighted count, means and centred sums of squares and
+    cross-products, updated in O(1) per point (recursive least squares for
+    one regressor), and hands them to stats_engine.ols_from_moments. With
+    ``decay`` < 1 older points are down-weighted geometrically, and the
+    effective sample size W^2 / sum(w^2) is used for the degrees of
+    freedom. With ``window`` only the latest points count: each one
+    leaving the window is subtracted again, and the sums are rebuilt from
+    the window every ``window`` removals to stop rounding drift.
+    """
+
+    def __init__(self, decay=1.0, window=None, confidence=0.95):
+        if not 0 < decay <= 1:
+            raise ValueError(f'decay must be in (0, 1], got {decay}')
+        if window is not None and (decay != 1 or window < 3):
+            raise ValueError('window needs at least 3 points and cannot be combined with decay')
+        self.decay, self.window, self.confidence = decay, window, confidence
+        self.points = deque() if window else None
+        self._removed = 0
+        self._reset()
+
+    def _reset(self):
+        self.weight = self.weight_sq = 0.0
+        self.x_mean = self.y_mean = 0.0
+        self.sxx = self.syy = self.sxy = 0.0
+
+    def _add(self, x, y, w=1.0):
+        self.weight += w
+        self.weight_sq += w * w
+        dx = x - self.x_mean
+        dy = y - self.y_mean
+        self.x_mean += w * dx / self.weight
+        self.y_mean += w * dy / self.weight
+        self.sxx += w * dx * (x - self.x_mean)
+        self.syy += w * dy * (y - self.y_mean)
+        self.sxy += w * dx * (y - self.y_mean)
+
+    def _remove(self, x, y):
+        if self.weight <= 1:
+            self._reset()
+            return
+        # Welford's step run backwards: S_old = S_new - (x - new mean)(y - old mean)
+        x_mean, y_mean = self.x_mean, self.y_mean
+        self.weight -= 1
+        self.weight_sq -= 1
+        self.x_mean -= (x - x_mean) / self.weight
+        self.y_mean -= (y - y_mean) / self.weight
+        self.sxx -= (x - self.x_mean) * (x - x_mean)
+        self.syy -= (y - self.y_mean) * (y - y_mean)
+        self.sxy -= (x - self.x_mean) * (y - y_mean)
+
+    def update(self, x, y):
+        """Add one (x, y) observation"""
+        x, y = float(x), float(y)
+        if self.decay < 1:
+            self.weight *= self.decay
+            self.weight_sq *= self.decay ** 2
+            self.sxx *= self.decay
+            self.syy *= self.decay
+            self.sxy *= self.decay
+        self._add(x, y)
+        if self.points is not None:
+            self.points.append((x, y))
+            if len(self.points) > self.window:
+                self._remove(*self.points.popleft())
+                self._removed += 1
+                if self._removed >= self.window:
+                    self._removed = 0
+                    self._reset()
+                    for px, py in self.points:
+                        self._add(px, py)
+
+    def update_many(self, xs, ys):
+        for x, y in zip(np.asarray(xs, dtype=float).tolist(), np.asarray(ys, dtype=float).tolist()):
+            self.update(x, y)
+        return self
+
+    @property
+    def n(self):
+        """Effective number of observations (the count when nothing is decayed)"""
+        return self.weight ** 2 / self.weight_sq if self.weight_sq else 0.0
+
+    def fit(self):
+        """Current statistics with the fields of a stats_engine.pairwise_stats row
+
+        The result can be passed as ``fit`` to the rent vs price plot,
+        its summary printout and stats_engine.confidence_band.
+        """
+        n = self.n
+        scale = n / self.weight if self.weight else 0.0
+        stats = ols_from_moments(n, self.x_mean, self.y_mean, self.sxx * scale, self.syy * scale,
+                                 self.sxy * scale, self.confidence)
+        fit = {key: float(value) for key, value in stats.items()}
+        fit['pearson_r'], fit['pearson_p'] = fit['r'], fit['p_value']
+        return fit
+
+
+class OnlineBoroughStats:
+    """Per-borough rent and price statistics maintained one observation at a time
+
+    Each observation updates its borough's count, Welford mean and
+    variance and P-square quantile sketches in constant time, so the
+    borough table, quadrant medians and yields can be read at any moment
+    without revisiting earlier records. The state checkpoints to JSON and
+    resumes exactly where it left off.
+    """
+
+    def __init__(self, quantiles=DEFAULT_QUANTILES):
+        self.quantiles = tuple(quantiles)
+        self.rents = {}
+        self.prices = {}
+        self.months = set()
+
+    def add(self, borough, kind, amount, month=None):
+        """Fold one observation in; ``kind`` is 'rent' or 'sale', ``month`` a 'YYYY-MM' string"""
+        kind = str(kind).strip().lower()
+        if kind == RENT_TYPE:
+            streams = self.rents
+        elif kind == SALE_TYPE:
+            streams = self.prices
+        else:
+            return
+        dist = streams.get(borough)
+        if dist is None:
+            dist = streams[borough] = RunningDistribution(self.quantiles)
+        dist.update(float(amount))
+        if month is not None:
+            self.months.add(month)
+
+    def update(self, chunk, borough_col=BOROUGH_COL, type_col=TYPE_COL, amount_col=AMOUNT_COL,
+               date_col=DATE_COL):
+        """Fold a frame of raw records in, with the same columns streaming_ingest reads"""
+        amount = pd.to_numeric(chunk[amount_col], errors='coerce')
+        valid = (amount.notna() & chunk[borough_col].notna()).to_numpy()
+        boroughs = chunk[borough_col].to_numpy()[valid]
+        kinds = chunk[type_col].astype(str).to_numpy()[valid]
+        amounts = amount.to_numpy(dtype=float)[valid]
+        if date_col in chunk.columns:
+            months = pd.to_datetime(chunk[date_col], errors='coerce').dt.strftime('%Y-%m').to_numpy()[valid]
+        else:
+            months = [None] * len(amounts)
+        with stage('online_update', rows=len(amounts)):
+            for borough, kind, value, month in zip(boroughs, kinds, amounts, months):
+                self.add(borough, kind, value, month if isinstance(month, str) else None)
+
+    def result(self):
+        """Borough metrics in the layout the plotting scripts read, as streaming_ingest builds them"""
+        boroughs = sorted(set(self.rents) | set(self.prices), key=str)
+        empty = RunningMoments()
+        rent = [self.rents[b].moments if b in self.rents else empty for b in boroughs]
+        sale = [self.prices[b].moments if b in self.prices else empty for b in boroughs]
+        rent_count = np.array([m.count for m in rent], dtype=float)
+        sale_count = np.array([m.count for m in sale], dtype=float)
+        monthly_rent = np.where(rent_count > 0, [m.mean for m in rent], np.nan)
+        avg_price = np.where(sale_count > 0, [m.mean for m in sale], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gross_yield = monthly_rent * 12 / avg_price * 100
+        return pd.DataFrame({
+            'Boroughs': [str(b) for b in boroughs],
+            'Average Monthly Rent (£)': monthly_rent,
+            'Counts of Rents': rent_count,
+            'Average Yearly Rent (£)': monthly_rent * 12,
+            'Average Price (£)': avg_price,
+            'Average Sales Volume ': sale_count / max(len(self.months), 1),
+            'Gross Yield (%)': gross_yield,
+        }, columns=OUTPUT_COLUMNS)
+
+    def distribution(self):
+        """Per-borough count, mean, standard deviation and quantiles of rents and prices"""
+        rows = {}
+        for label, streams in (('Rent', self.rents), ('Price', self.prices)):
+            for borough, dist in streams.items():
+                row = rows.setdefault(str(borough), {})
+                row[f'{label} Count'] = dist.moments.count
+                row[f'{label} Mean'] = dist.moments.mean
+                row[f'{label} Std'] = dist.moments.std if dist.moments.count > 1 else math.nan
+                for sketch in dist.quantiles:
+                    row[f'{label} Q{sketch.p * 100:g}'] = sketch.value
+        frame = pd.DataFrame.from_dict(rows, orient='index').sort_index()
+        frame.index.name = 'Boroughs'
+        return frame
+
+    def medians(self):
+        """Cross-borough medians of the elasticity chart axes, which split the plots into quadrants"""
+        return self.result()[MEDIAN_COLUMNS].median()
+
+    def save(self, path):
+        """Write a checkpoint atomically"""
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'quantiles': list(self.quantiles),
+            'months': sorted(self.months),
+            'rents': {str(b): dist.to_dict() for b, dist in self.rents.items()},
+            'prices': {str(b): dist.to_dict() for b, dist in self.prices.items()},
+        }
+        staging = path + '.tmp'
+        with open(staging, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle, ensure_ascii=False)
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path):
+        """Resume from a checkpoint written by save()"""
+        with open(path, encoding='utf-8') as handle:
+            state = json.load(handle)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {path!r} has version {state.get('version')}, "
+                             f'expected {CHECKPOINT_VERSION}')
+        stats = cls(state['quantiles'])
+        stats.months = set(state['months'])
+        stats.rents = {b: RunningDistribution.from_dict(d) for b, d in state['rents'].items()}
+        stats.prices = {b: RunningDistribution.from_dict(d) for b, d in state['prices'].items()}
+        return stats
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Fold new rent and sale records into checkpointed borough statistics')
+    parser.add_argument('source', help='CSV of transaction-level rent and sale records')
+    parser.add_argument('--checkpoint', required=True, help='statistics checkpoint to resume from and update')
+    parser.add_argument('-o', '--output', help='also write the borough metrics table here')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='rows read per chunk')
+    args = parser.parse_args()
+
+    stats = OnlineBoroughStats.load(args.checkpoint) if os.path.exists(args.checkpoint) else OnlineBoroughStats()
+    for chunk in pd.read_csv(args.source, chunksize=args.chunksize, thousands=',',
+                             dtype={BOROUGH_COL: str, TYPE_COL: str}):
+        stats.update(chunk)
+    stats.save(args.checkpoint)
+    if args.output:
+        stats.result().to_csv(args.output, index=False)
+    print(stats.distribution().to_string())
+    print(f"\nQuadrant medians:\n{stats.medians().to_string()}")
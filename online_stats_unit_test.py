@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from scipy import stats as scipy_stats
+from online_stats import OnlineBoroughStats, OnlineRegression, P2Quantile, RunningMoments
+from stats_engine import confidence_band
+from streaming_ingest import aggregate_chunks
+
+
+class TestOnlineStats(unittest.TestCase):
+    """Unit tests for incremental per-borough statistics"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a small random transaction extract"""
+        rng = np.random.default_rng(11)
+        n = 6000
+        cls.records = pd.DataFrame({
+            'Borough': rng.choice(['Camden', 'Hackney', 'Bexley'], size=n),
+            'Type': rng.choice(['rent', 'sale', 'Sale '], size=n),
+            'Amount (£)': rng.lognormal(10, 1, size=n).round(),
+            'Date': pd.to_datetime('2018-01-01') + pd.to_timedelta(rng.integers(0, 365, size=n), unit='D'),
+        })
+
+    def test_welford_matches_numpy(self):
+        """Test running mean and variance against numpy on badly conditioned values"""
+        values = 1e9 + np.random.default_rng(1).normal(0, 1, 10_000)
+        moments = RunningMoments()
+        for x in values.tolist():
+            moments.update(x)
+        self.assertEqual(moments.count, len(values))
+        self.assertAlmostEqual(moments.mean, values.mean(), delta=1e-5)
+        self.assertAlmostEqual(moments.variance, values.var(ddof=1), delta=1e-6)
+        self.assertTrue(np.isnan(RunningMoments().variance))
+
+    def test_p2_quantiles_track_the_distribution(self):
+        """Test P-square estimates against exact quantiles, and exactness below five values"""
+        values = np.random.default_rng(2).lognormal(7, 0.5, 20_000)
+        for p in (0.1, 0.5, 0.9):
+            sketch = P2Quantile(p)
+            for x in values.tolist():
+                sketch.update(x)
+            exact = np.quantile(values, p)
+            self.assertLess(abs(sketch.value - exact) / exact, 0.01, p)
+        small = P2Quantile(0.5)
+        for x in (3.0, 1.0, 2.0):
+            small.update(x)
+        self.assertEqual(small.value, 2.0)
+        with self.assertRaises(ValueError):
+            P2Quantile(1.0)
+
+    def test_result_matches_batch_aggregation(self):
+        """Test that the online table equals streaming_ingest's batch result"""
+        stats = OnlineBoroughStats()
+        for start in range(0, len(self.records), 1000):
+            stats.update(self.records.iloc[start:start + 1000])
+        pd.testing.assert_frame_equal(stats.result(), aggregate_chunks([self.records]), rtol=1e-9)
+
+        kind = self.records['Type'].str.strip().str.lower()
+        rents = self.records[kind == 'rent'].groupby('Borough')['Amount (£)']
+        dist = stats.distribution()
+        np.testing.assert_allclose(dist['Rent Std'], rents.std().reindex(dist.index))
+        np.testing.assert_allclose(dist['Rent Q50'], rents.median().reindex(dist.index), rtol=0.05)
+        medians = stats.medians()
+        np.testing.assert_allclose(medians['Average Monthly Rent (£)'],
+                                   stats.result()['Average Monthly Rent (£)'].median())
+
+    def test_checkpoint_resumes_exactly(self):
+        """Test that saving, loading and continuing equals one uninterrupted run"""
+        half = len(self.records) // 2
+        whole = OnlineBoroughStats()
+        whole.update(self.records)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'stats.json')
+            first = OnlineBoroughStats()
+            first.update(self.records.iloc[:half])
+            first.save(path)
+            resumed = OnlineBoroughStats.load(path)
+        resumed.update(self.records.iloc[half:])
+        pd.testing.assert_frame_equal(resumed.result(), whole.result())
+        pd.testing.assert_frame_equal(resumed.distribution(), whole.distribution())
+
+    def test_single_observations(self):
+        """Test adding observations one at a time, ignoring unknown record types"""
+        stats = OnlineBoroughStats()
+        stats.add('Camden', 'rent', 2000, '2018-01')
+        stats.add('Camden', ' Sale', 800000, '2018-02')
+        stats.add('Camden', 'auction', 1.0)
+        row = stats.result().iloc[0]
+        self.assertEqual(row['Counts of Rents'], 1)
+        self.assertAlmostEqual(row['Gross Yield (%)'], 3.0)
+        self.assertEqual(row['Average Sales Volume '], 0.5)
+
+    def test_online_regression_matches_linregress(self):
+        """Test the streaming fit against scipy over all points and over a sliding window"""
+        rng = np.random.default_rng(3)
+        x = rng.uniform(1000, 4000, 400)
+        y = 300 * x + rng.normal(0, 1e5, 400)
+        for window, start in ((None, 0), (50, -50)):
+            fit = OnlineRegression(window=window).update_many(x, y).fit()
+            reference = scipy_stats.linregress(x[start:], y[start:])
+            np.testing.assert_allclose([fit['slope'], fit['intercept'], fit['pearson_r'], fit['slope_se'],
+                                        fit['intercept_se'], fit['pearson_p']],
+                                       [reference.slope, reference.intercept, reference.rvalue, reference.stderr,
+                                        reference.intercept_stderr, reference.pvalue], rtol=1e-8)
+            self.assertEqual(fit['n'], len(x[start:]))
+        band = confidence_band(fit, [x.mean(), x.max()])
+        self.assertTrue(np.all(band > 0))
+
+    def test_online_regression_decay(self):
+        """Test exponential forgetting against weighted least squares and its effective sample size"""
+        rng = np.random.default_rng(4)
+        x = rng.uniform(0, 10, 300)
+        y = np.where(np.arange(300) < 150, 2 * x, 5 * x) + rng.normal(0, 0.1, 300)
+        decay = 0.95
+        fit = OnlineRegression(decay=decay).update_many(x, y).fit()
+        weights = decay ** np.arange(len(x))[::-1]
+        slope, intercept = np.polyfit(x, y, 1, w=np.sqrt(weights))
+        np.testing.assert_allclose([fit['slope'], fit['intercept']], [slope, intercept], rtol=1e-8, atol=1e-8)
+        self.assertAlmostEqual(fit['n'], weights.sum() ** 2 / (weights ** 2).sum())
+        with self.assertRaises(ValueError):
+            OnlineRegression(decay=0.9, window=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
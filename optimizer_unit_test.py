@@ -0,0 +1,92 @@
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+from data_loader import load_housing_data
+from optimizer import PRICE_COL, RENT_COL, greedy_fill, optimize_portfolio, prune_dominated, sample_candidates
+
+
+class TestOptimizer(unittest.TestCase):
+    """Unit tests for the budget-constrained acquisition optimizer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.metrics = load_housing_data()
+
+    def test_matches_brute_force(self):
+        """Test the MILP optimum against enumerating every subset of a small candidate set"""
+        rng = np.random.default_rng(1)
+        candidates = pd.DataFrame({'Boroughs': rng.choice(['A', 'B', 'C'], 12),
+                                   PRICE_COL: rng.integers(200, 600, 12) * 1000.0,
+                                   RENT_COL: rng.integers(800, 2500, 12).astype(float)})
+        budget, share = 1_500_000, 0.5
+        selected, summary = optimize_portfolio(candidates, budget, max_borough_share=share)
+
+        best = 0.0
+        for mask in itertools.product([False, True], repeat=len(candidates)):
+            pick = candidates[list(mask)]
+            if pick[PRICE_COL].sum() > budget:
+                continue
+            if (pick.groupby('Boroughs')[PRICE_COL].sum() > share * budget).any():
+                continue
+            best = max(best, pick[RENT_COL].sum() * 12)
+        self.assertAlmostEqual(summary['annual_rent'], best)
+
+    def test_constraints_hold(self):
+        """Test budget, borough share, per-borough count and liquidity limits on the selection"""
+        candidates = sample_candidates(self.metrics, 5000, seed=2)
+        budget = 4_000_000
+        min_liquidity = self.metrics['Counts of Rents'].median()
+        selected, summary = optimize_portfolio(candidates, budget, self.metrics, max_borough_share=0.2,
+                                               max_per_borough=2, min_liquidity=min_liquidity)
+        self.assertGreater(summary['selected'], 0)
+        self.assertLessEqual(selected[PRICE_COL].sum(), budget)
+        per_borough = selected.groupby('Boroughs')[PRICE_COL].agg(['sum', 'count'])
+        self.assertTrue((per_borough['sum'] <= 0.2 * budget).all())
+        self.assertTrue((per_borough['count'] <= 2).all())
+        liquid = set(self.metrics.loc[self.metrics['Counts of Rents'] >= min_liquidity, 'Boroughs'])
+        self.assertTrue(set(selected['Boroughs']) <= liquid)
+
+    def test_pruning_keeps_an_optimal_portfolio(self):
+        """Test that dominance pruning drops candidates without changing the optimum"""
+        candidates = sample_candidates(self.metrics, 400, seed=3)
+        budget, share = 2_000_000, 0.25
+        codes, boroughs = pd.factorize(candidates['Boroughs'])
+        price = candidates[PRICE_COL].to_numpy()
+        score = candidates[RENT_COL].to_numpy() * 12.0
+        keep = prune_dominated(codes, price, score, np.full(len(boroughs), share * budget))
+        self.assertLess(keep.sum(), len(candidates))
+
+        # Unpruned reference: the same knapsack over every candidate
+        n = len(candidates)
+        A = np.vstack([price, np.where(codes == np.arange(len(boroughs))[:, None], price, 0)])
+        upper = np.r_[budget, np.full(len(boroughs), share * budget)]
+        reference = milp(-score, constraints=LinearConstraint(A, -np.inf, upper),
+                         integrality=np.ones(n), bounds=Bounds(0, 1))
+        _, summary = optimize_portfolio(candidates, budget, max_borough_share=share, time_limit=30)
+        self.assertAlmostEqual(summary['annual_rent'], -reference.fun, places=4)
+
+    def test_large_instance_under_default_time_limit(self):
+        """Test that tens of thousands of candidates still deploy the budget within a small proven gap"""
+        candidates = sample_candidates(self.metrics, 50_000)
+        budget = 20_000_000
+        selected, summary = optimize_portfolio(candidates, budget, self.metrics)
+        self.assertLessEqual(selected[PRICE_COL].sum(), budget)
+        self.assertTrue((selected.groupby('Boroughs')[PRICE_COL].sum() <= 0.25 * budget).all())
+        self.assertGreater(summary['budget_used'], 0.95)
+        self.assertLess(summary['optimality_gap'], 0.02)
+
+    def test_greedy_fill_respects_limits(self):
+        """Test that the fallback portfolio stays within the budget, borough caps and counts"""
+        codes = np.array([0, 0, 0, 1, 1])
+        price = np.array([100.0, 100.0, 50.0, 300.0, 80.0])
+        score = np.array([10.0, 9.0, 6.0, 40.0, 1.0])
+        chosen = greedy_fill(codes, price, score, 400, np.array([200.0, 300.0]), max_per_borough=1)
+        self.assertEqual(chosen.tolist(), [False, False, True, True, False])
+        chosen = greedy_fill(codes, price, score, 1000, np.array([150.0, 1000.0]))
+        self.assertEqual(chosen.tolist(), [True, False, True, True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Period of the bundled sample CSV
+DEFAULT_PERIOD = '2018'
+
+# Raw metrics stored per borough and period
+BASE_COLUMNS = [
+    'Average Monthly Rent (£)',
+    'Counts of Rents',
+    'Average Price (£)',
+    'Average Sales Volume ',
+]
+
+# Column pairs with a trend line in price_elasticity_graph.py
+TREND_PAIRS = [
+    ('Average Price (£)', 'Counts of Rents'),
+    ('Average Price (£)', 'Average Sales Volume '),
+    ('Average Monthly Rent (£)', 'Counts of Rents'),
+]
+
+# Columns each figure reads; a figure is only rebuilt when one of them changes
+FIGURE_DEPENDENCIES = {
+    'rent_vs_sales': {'Average Monthly Rent (£)', 'Average Sales Volume ', 'Gross Yield (%)'},
+    'renters_vs_price': {'Average Price (£)', 'Counts of Rents', 'Average Monthly Rent (£)'},
+    'sales_vs_price': {'Average Price (£)', 'Average Sales Volume ', 'Gross Yield (%)'},
+    'rent_vs_renters': {'Average Monthly Rent (£)', 'Counts of Rents', 'Gross Yield (%)'},
+    'rent_price_regression': {'Average Monthly Rent (£)', 'Average Price (£)'},
+    'yield_distribution': {'Gross Yield (%)'},
+    'yield_ranking': {'Gross Yield (%)'},
+    'heat_map': {'Gross Yield (%)', 'Average Monthly Rent (£)', 'Average Price (£)'},
+}
+
+
+def gross_yield(monthly_rent, price):
+    """Annual rent as a percentage of the average price"""
+    return monthly_rent * 12 / price * 100
+
+
+class HousingPanel:
+    """Borough x period panel with per-period derived metrics recomputed on demand
+
+    Each period is stored as its own frame, so adding or replacing one
+    period touches only that period's rows. It invalidates that period's
+    derived columns, medians and trend lines, and reports the figures
+    whose inputs actually changed. ``frame`` joins the periods, indexed
+    by (Boroughs, Period), when it is read.
+    """
+
+    COLUMNS = BASE_COLUMNS + ['Gross Yield (%)']
+
+    def __init__(self):
+        self._frames = {}
+        self._frame = None
+        self._summaries = {}
+        self.dirty_figures = set()
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build a panel from a mapping of period label to borough DataFrame"""
+        panel = cls()
+        for period, df in frames.items():
+            panel.update(period, df)
+        return panel
+
+    @property
+    def periods(self):
+        """Sorted period labels held by the panel"""
+        return sorted(self._frames)
+
+    @property
+    def frame(self):
+        """Every period in one frame indexed by (Boroughs, Period), built once per change"""
+        if self._frame is None:
+            if self._frames:
+                self._frame = pd.concat([self._frames[period] for period in self.periods]).sort_index()
+            else:
+                self._frame = pd.DataFrame(
+                    columns=self.COLUMNS,
+                    index=pd.MultiIndex.from_arrays([[], []], names=['Boroughs', 'Period']),
+                    dtype=float,
+                )
+        return self._frame
+
+    def update(self, period, df):
+        """Insert or replace one period and return the figures it invalidates
+
+        ``df`` uses the plotting layout (a 'Boroughs' column plus the base
+        metric columns). Only rows of ``period`` are touched.
+        """
+        period = str(period)
+        incoming = df.set_index('Boroughs')[BASE_COLUMNS].astype(float)
+        incoming['Gross Yield (%)'] = gross_yield(incoming['Average Monthly Rent (£)'],
+                                                  incoming['Average Price (£)'])
+        incoming.index = pd.MultiIndex.from_product([incoming.index, [period]],
+                                                    names=['Boroughs', 'Period'])
+        incoming = incoming.sort_index()
+
+        previous = self._frames.get(period)
+        if previous is not None and previous.index.equals(incoming.index):
+            changed = previous.ne(incoming) & ~(previous.isna() & incoming.isna())
+            changed_columns = set(changed.columns[changed.any()])
+        else:
+            changed_columns = set(incoming.columns)
+
+        self._frames[period] = incoming
+        if changed_columns:
+            self._frame = None
+            self._summaries.pop(period, None)
+        figures = {name for name, deps in FIGURE_DEPENDENCIES.items() if deps & changed_columns}
+        self.dirty_figures.update((name, period) for name in figures)
+        return figures
+
+    def period_frame(self, period):
+        """Return one period in the layout the plotting scripts read"""
+        df = self._frames[str(period)].droplevel('Period').reset_index()
+        df['Average Yearly Rent (£)'] = df['Average Monthly Rent (£)'] * 12
+        return df
+
+    def summary(self, period):
+        """Medians and trend-line coefficients for one period, cached until it changes"""
+        period = str(period)
+        if period not in self._summaries:
+            df = self._frames[period].droplevel('Period')
+            trends = {}
+            for x_col, y_col in TREND_PAIRS:
+                valid = df[[x_col, y_col]].dropna()
+                if len(valid) >= 2:
+                    trends[(x_col, y_col)] = np.polyfit(valid[x_col], valid[y_col], 1)
+            self._summaries[period] = {'medians': df.median(), 'trends': trends}
+        return self._summaries[period]
+
+    def pop_dirty_figures(self, names=None):
+        """Return and clear the (figure, period) pairs that need rebuilding
+
+        With ``names`` only those figures are taken; pairs for other
+        figures stay queued for whichever script draws them.
+        """
+        if names is None:
+            dirty, self.dirty_figures = self.dirty_figures, set()
+            return dirty
+        dirty = {(name, period) for name, period in self.dirty_figures if name in names}
+        self.dirty_figures -= dirty
+        return dirty
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from data_loader import load_housing_data
+from panel import FIGURE_DEPENDENCIES, HousingPanel
+
+
+class TestHousingPanel(unittest.TestCase):
+    """Unit tests for the borough x period panel"""
+
+    def setUp(self):
+        """Start every test from a one-period panel"""
+        self.df = load_housing_data()
+        self.panel = HousingPanel.from_frames({'2018': self.df})
+        self.panel.pop_dirty_figures()
+
+    def test_derived_yield_matches_source(self):
+        """Test that recomputed gross yield agrees with the published column"""
+        frame = self.panel.period_frame('2018').set_index('Boroughs')
+        published = self.df.set_index('Boroughs')['Gross Yield (%)']
+        np.testing.assert_allclose(frame['Gross Yield (%)'], published.reindex(frame.index), atol=0.01)
+
+    def test_new_period_only_dirties_that_period(self):
+        """Test that adding a period leaves existing summaries cached"""
+        cached = self.panel.summary('2018')
+        figures = self.panel.update('2019', self.df)
+        self.assertEqual(figures, set(FIGURE_DEPENDENCIES))
+        self.assertIs(self.panel.summary('2018'), cached)
+        self.assertEqual({period for _, period in self.panel.pop_dirty_figures()}, {'2019'})
+        self.assertEqual(self.panel.periods, ['2018', '2019'])
+        frame = self.panel.frame
+        self.assertEqual(len(frame), 2 * len(self.df))
+        self.assertTrue(frame.index.is_monotonic_increasing)
+        self.assertIs(self.panel.frame, frame)
+
+    def test_single_column_change_rebuilds_dependent_figures(self):
+        """Test that editing sales volume only invalidates sales figures"""
+        changed = self.df.copy()
+        changed.loc[0, 'Average Sales Volume '] += 1
+        figures = self.panel.update('2018', changed)
+        self.assertEqual(figures, {'rent_vs_sales', 'sales_vs_price'})
+        self.assertEqual(self.panel.pop_dirty_figures({'sales_vs_price'}), {('sales_vs_price', '2018')})
+        self.assertEqual(self.panel.pop_dirty_figures(), {('rent_vs_sales', '2018')})
+        self.assertEqual(self.panel.frame.loc[(self.df.loc[0, 'Boroughs'], '2018'), 'Average Sales Volume '],
+                         self.df.loc[0, 'Average Sales Volume '] + 1)
+
+    def test_identical_refresh_is_a_no_op(self):
+        """Test that re-loading unchanged data rebuilds nothing"""
+        cached = self.panel.summary('2018')
+        self.assertEqual(self.panel.update('2018', self.df), set())
+        self.assertIs(self.panel.summary('2018'), cached)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,338 +1,347 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-
-# Import the data
-df = pd.read_csv('data/Housing_Rent_Price_Volume.csv')
-
-# Clean the data
-df['Average Price (£)'] = df['Average Price (£)'].str.replace(',', '').astype(float)
-df['Counts of Rents'] = df['Counts of Rents'].str.replace(',', '').astype(float)
-
-# ===== Plot 1: Rent vs Sales Volume =====
-# Create first figure
-fig1, ax1 = plt.subplots(figsize=(12, 8))
-# Interpret: High rent + low sales = strong rental market
-#           Low rent + high sales = affordable market
-
-scatter1 = ax1.scatter(df['Average Monthly Rent (£)'], 
-                       df['Average Sales Volume '],
-                       s=150, 
-                       c=df['Gross Yield (%)'],
-                       cmap='RdYlGn',
-                       alpha=0.7,
-                       edgecolors='black',
-                       linewidth=1)
-
-# Add quadrant lines to show market types
-median_rent = df['Average Monthly Rent (£)'].median()
-median_sales = df['Average Sales Volume '].median()
-
-ax1.axvline(median_rent, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-ax1.axhline(median_sales, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-
-# Add quadrant labels
-ax1.text(df['Average Monthly Rent (£)'].min() * 1.0, 
-         df['Average Sales Volume '].max() * 0.995,
-         'Affordable Market\n(Low Rent, High Sales)', 
-         fontsize=10, style='italic', alpha=0.6, ha='left', va='top',
-         bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.3))
-
-ax1.text(df['Average Monthly Rent (£)'].max() * 0.85, 
-         df['Average Sales Volume '].max() * 0.95,
-         'High Rent\nHigh Sales', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-ax1.text(df['Average Monthly Rent (£)'].max() * 0.85, 
-         df['Average Sales Volume '].min() * 1.5,
-         'Strong Rental Market\n(High Rent, Low Sales)', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.3))
-
-ax1.text(df['Average Monthly Rent (£)'].min() * 1.2, 
-         df['Average Sales Volume '].min() * 1.5,
-         'Low Rent\nLow Sales', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-# Annotate key boroughs
-for idx, row in df.iterrows():
-    if row['Average Monthly Rent (£)'] > 2500 or row['Average Sales Volume '] > 350:
-        # Smart positioning based on location
-        if row['Average Monthly Rent (£)'] > 2800:  # Far right, move label left
-            xytext = (-80, -15)
-        elif row['Average Sales Volume '] > 350:  # Top, move label down and left
-            xytext = (-60, -20)
-        else:
-            xytext = (10, 10)
-        
-        ax1.annotate(row['Boroughs'], 
-                    (row['Average Monthly Rent (£)'], row['Average Sales Volume ']),
-                    fontsize=8, alpha=0.8, xytext=xytext, 
-                    textcoords='offset points',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='gray', alpha=0.7),
-                    arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0', color='gray', lw=0.5))
-
-ax1.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
-ax1.set_ylabel('Average Sales Volume', fontsize=12, fontweight='bold')
-ax1.set_title('Rental Market Strength Analysis\nRent vs Sales Volume', 
-              fontsize=13, fontweight='bold', pad=15)
-ax1.grid(True, alpha=0.3)
-
-cbar1 = plt.colorbar(scatter1, ax=ax1)
-cbar1.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
-
-fig1.suptitle('2018 Price Elasticity - Rental Market Strength Analysis', 
-             fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.show()
-
-# ===== Plot 2: Renters (Count of Rents) vs Average Price =====
-# Create second figure
-fig2, ax2 = plt.subplots(figsize=(12, 8))
-# Interpret: Shows which boroughs are "renter-heavy" due to affordability issues
-
-scatter2 = ax2.scatter(df['Average Price (£)'], 
-                       df['Counts of Rents'],
-                       s=150, 
-                       c=df['Average Monthly Rent (£)'],
-                       cmap='YlOrRd',
-                       alpha=0.7,
-                       edgecolors='black',
-                       linewidth=1)
-
-# Add trend line
-z = np.polyfit(df['Average Price (£)'], df['Counts of Rents'], 1)
-p = np.poly1d(z)
-ax2.plot(df['Average Price (£)'], p(df['Average Price (£)']), 
-         "r--", alpha=0.5, linewidth=2, label='Trend Line')
-
-# Add quadrant lines
-median_price = df['Average Price (£)'].median()
-median_renters = df['Counts of Rents'].median()
-
-ax2.axvline(median_price, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-ax2.axhline(median_renters, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-
-# Add quadrant labels
-ax2.text(df['Average Price (£)'].min() * 1.02, 
-         df['Counts of Rents'].max() * 0.98,
-         'Affordable &\nRenter-Heavy', 
-         fontsize=10, style='italic', alpha=0.6, ha='left', va='top',
-         bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.3))
-
-ax2.text(df['Average Price (£)'].max() * 0.85, 
-         df['Counts of Rents'].max() * 0.95,
-         'Expensive &\nRenter-Heavy', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='orange', alpha=0.3))
-
-ax2.text(df['Average Price (£)'].max() * 0.85, 
-         df['Counts of Rents'].min() * 2,
-         'Expensive &\nOwner-Heavy', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-ax2.text(df['Average Price (£)'].min() * 1.2, 
-         df['Counts of Rents'].min() * 2,
-         'Affordable &\nOwner-Heavy', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-# Annotate key boroughs
-for idx, row in df.iterrows():
-    if row['Counts of Rents'] > 3500 or row['Average Price (£)'] > 1200000:
-        # Smart positioning based on location
-        if row['Average Price (£)'] > 1200000:  # Far right (Kensington), move label left and down
-            xytext = (-80, -25)
-        elif row['Counts of Rents'] > 3500:  # Top, move label down
-            xytext = (10, -20)
-        else:
-            xytext = (10, 10)
-        
-        ax2.annotate(row['Boroughs'], 
-                    (row['Average Price (£)'], row['Counts of Rents']),
-                    fontsize=8, alpha=0.8, xytext=xytext, 
-                    textcoords='offset points',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='gray', alpha=0.7),
-                    arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0', color='gray', lw=0.5))
-
-ax2.set_xlabel('Average House Price (£)', fontsize=12, fontweight='bold')
-ax2.set_ylabel('Count of Renters', fontsize=12, fontweight='bold')
-ax2.set_title('Affordability vs Rental Demand\nRenters vs Average Price', 
-              fontsize=13, fontweight='bold', pad=15)
-ax2.grid(True, alpha=0.3)
-ax2.legend(loc='upper left', fontsize=9)
-
-cbar2 = plt.colorbar(scatter2, ax=ax2)
-cbar2.set_label('Avg Monthly Rent (£)', fontsize=10, fontweight='bold')
-
-fig2.suptitle('2018 Price Elasticity - Affordability vs Rental Demand', 
-             fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.show()
-
-# ===== Plot 3: Sales Volume vs House Price =====
-# Create third figure
-fig3, ax3 = plt.subplots(figsize=(12, 8))
-# Interpret: Shows relationship between market activity and property values
-
-scatter3 = ax3.scatter(df['Average Price (£)'], 
-                       df['Average Sales Volume '],
-                       s=150, 
-                       c=df['Gross Yield (%)'],
-                       cmap='RdYlGn',
-                       alpha=0.7,
-                       edgecolors='black',
-                       linewidth=1)
-
-# Add trend line
-z3 = np.polyfit(df['Average Price (£)'], df['Average Sales Volume '], 1)
-p3 = np.poly1d(z3)
-ax3.plot(df['Average Price (£)'], p3(df['Average Price (£)']), 
-         "b--", alpha=0.5, linewidth=2, label='Trend Line')
-
-# Add quadrant lines
-median_price_3 = df['Average Price (£)'].median()
-median_sales_3 = df['Average Sales Volume '].median()
-
-ax3.axvline(median_price_3, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-ax3.axhline(median_sales_3, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-
-# Add quadrant labels
-ax3.text(df['Average Price (£)'].min() * 1.0, 
-         df['Average Sales Volume '].max() * 0.995,
-         'Affordable &\nHigh Activity', 
-         fontsize=10, style='italic', alpha=0.6, ha='left', va='top',
-         bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.3))
-
-ax3.text(df['Average Price (£)'].max() * 0.85, 
-         df['Average Sales Volume '].max() * 0.95,
-         'Expensive &\nHigh Activity', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.3))
-
-ax3.text(df['Average Price (£)'].max() * 0.85, 
-         df['Average Sales Volume '].min() * 1.5,
-         'Expensive &\nLow Activity', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.3))
-
-ax3.text(df['Average Price (£)'].min() * 1.2, 
-         df['Average Sales Volume '].min() * 1.5,
-         'Affordable &\nLow Activity', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-# Annotate key boroughs
-for idx, row in df.iterrows():
-    if row['Average Sales Volume '] > 350 or row['Average Price (£)'] > 1200000:
-        # Smart positioning based on location
-        if row['Average Price (£)'] > 1200000:  # Far right (Kensington), move label left
-            xytext = (-80, -25)
-        elif row['Average Sales Volume '] > 350:  # High sales, move label down
-            xytext = (10, -20)
-        else:
-            xytext = (10, 10)
-        
-        ax3.annotate(row['Boroughs'], 
-                    (row['Average Price (£)'], row['Average Sales Volume ']),
-                    fontsize=8, alpha=0.8, xytext=xytext, 
-                    textcoords='offset points',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='gray', alpha=0.7),
-                    arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0', color='gray', lw=0.5))
-
-ax3.set_xlabel('Average House Price (£)', fontsize=12, fontweight='bold')
-ax3.set_ylabel('Average Sales Volume', fontsize=12, fontweight='bold')
-ax3.set_title('Market Activity vs Property Values\nSales Volume vs House Price', 
-              fontsize=13, fontweight='bold', pad=15)
-ax3.grid(True, alpha=0.3)
-ax3.legend(loc='upper left', fontsize=9)
-
-cbar3 = plt.colorbar(scatter3, ax=ax3)
-cbar3.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
-
-fig3.suptitle('2018 Price Elasticity - Market Activity Analysis', 
-             fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.show()
-
-# ===== Plot 4: Average Rent Price vs Count of Renters =====
-# Create fourth figure
-fig4, ax4 = plt.subplots(figsize=(12, 8))
-# Interpret: Shows rental market size and pricing dynamics
-
-scatter4 = ax4.scatter(df['Average Monthly Rent (£)'], 
-                       df['Counts of Rents'],
-                       s=150, 
-                       c=df['Gross Yield (%)'],
-                       cmap='RdYlGn',
-                       alpha=0.7,
-                       edgecolors='black',
-                       linewidth=1)
-
-# Add trend line
-z4 = np.polyfit(df['Average Monthly Rent (£)'], df['Counts of Rents'], 1)
-p4 = np.poly1d(z4)
-ax4.plot(df['Average Monthly Rent (£)'], p4(df['Average Monthly Rent (£)']), 
-         "b--", alpha=0.5, linewidth=2, label='Trend Line')
-
-# Add quadrant lines
-median_rent_4 = df['Average Monthly Rent (£)'].median()
-median_renters_4 = df['Counts of Rents'].median()
-
-ax4.axvline(median_rent_4, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-ax4.axhline(median_renters_4, color='gray', linestyle='--', alpha=0.5, linewidth=1)
-
-# Add quadrant labels
-ax4.text(df['Average Monthly Rent (£)'].min() * 1.0, 
-         df['Counts of Rents'].max() * 0.995,
-         'Low Rent &\nHigh Demand', 
-         fontsize=10, style='italic', alpha=0.6, ha='left', va='top',
-         bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.3))
-
-ax4.text(df['Average Monthly Rent (£)'].max() * 0.85, 
-         df['Counts of Rents'].max() * 0.95,
-         'High Rent &\nHigh Demand', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.3))
-
-ax4.text(df['Average Monthly Rent (£)'].max() * 0.85, 
-         df['Counts of Rents'].min() * 1.5,
-         'High Rent &\nLow Demand', 
-         fontsize=10, style='italic', alpha=0.6, ha='center',
-         bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.3))
-
-ax4.text(df['Average Monthly Rent (£)'].min() * 1.2, 
-         df['Counts of Rents'].min() * 1.5,
-         'Low Rent &\nLow Demand', 
-         fontsize=10, style='italic', alpha=0.6, ha='center')
-
-# Annotate key boroughs
-for idx, row in df.iterrows():
-    if row['Counts of Rents'] > 3500 or row['Average Monthly Rent (£)'] > 2800:
-        # Smart positioning based on location
-        if row['Average Monthly Rent (£)'] > 2800:  # High rent, move label left
-            xytext = (-80, -15)
-        elif row['Counts of Rents'] > 3500:  # High demand, move label down
-            xytext = (10, -20)
-        else:
-            xytext = (10, 10)
-        
-        ax4.annotate(row['Boroughs'], 
-                    (row['Average Monthly Rent (£)'], row['Counts of Rents']),
-                    fontsize=8, alpha=0.8, xytext=xytext, 
-                    textcoords='offset points',
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='gray', alpha=0.7),
-                    arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0', color='gray', lw=0.5))
-
-ax4.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
-ax4.set_ylabel('Count of Renters', fontsize=12, fontweight='bold')
-ax4.set_title('Rental Market Size vs Pricing\nAverage Rent vs Count of Renters', 
-              fontsize=13, fontweight='bold', pad=15)
-ax4.grid(True, alpha=0.3)
-ax4.legend(loc='upper left', fontsize=9)
-
-cbar4 = plt.colorbar(scatter4, ax=ax4)
-cbar4.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
-
-fig4.suptitle('2018 Price Elasticity - Rental Market Dynamics', 
-             fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.show()
+from artifact_cache import cached_render
+from data_loader import DATA_PATH, load_housing_data
+from instrumentation import profile_run, stage
+from panel import DEFAULT_PERIOD, FIGURE_DEPENDENCIES
+import label_placement
+import segmentation
+import stats_engine
+from label_placement import place_labels
+from segmentation import segment
+from stats_engine import pairwise_stats, regression_row
+
+# Upper bound on borough labels per plot; collisions may leave fewer
+MAX_LABELS = 8
+
+
+def trend_line(df, x_col, y_col):
+    """Fitted OLS line of ``y_col`` on ``x_col`` from the statistics engine"""
+    fit = regression_row(pairwise_stats(df, [x_col, y_col]), x_col, y_col)
+    return np.poly1d([fit['slope'], fit['intercept']])
+
+
+def draw_quadrants(ax, df, x_col, y_col, labels, floor=1.5):
+    """Median lines and one label per quadrant, from the shared segmentation engine
+
+    ``labels`` maps (high x, high y) to the label text and its box colour
+    (None for no box). Labels sit in the corners of the data range; the
+    lower ones at ``floor`` times the smallest y. Returns the Segmentation.
+    """
+    quadrants = segment(df, x_col, y_col)
+    ax.axvline(quadrants.x_edges[0], color='gray', linestyle='--', alpha=0.5, linewidth=1)
+    ax.axhline(quadrants.y_edges[0], color='gray', linestyle='--', alpha=0.5, linewidth=1)
+
+    x, y = df[x_col], df[y_col]
+    anchors = {
+        (False, True): (x.min(), y.max() * 0.995, 'left', 'top'),
+        (True, True): (x.max() * 0.85, y.max() * 0.95, 'center', 'baseline'),
+        (True, False): (x.max() * 0.85, y.min() * floor, 'center', 'baseline'),
+        (False, False): (x.min() * 1.2, y.min() * floor, 'center', 'baseline'),
+    }
+    for key, (text, color) in labels.items():
+        tx, ty, ha, va = anchors[key]
+        bbox = dict(boxstyle='round', facecolor=color, alpha=0.3) if color else None
+        ax.text(tx, ty, text, fontsize=10, style='italic', alpha=0.6, ha=ha, va=va, bbox=bbox)
+    return quadrants
+
+
+def plot_rent_vs_sales(df, period=DEFAULT_PERIOD):
+    """Plot 1: Rent vs Sales Volume, coloured by gross yield"""
+    import matplotlib.pyplot as plt
+
+    # Create first figure
+    fig1, ax1 = plt.subplots(figsize=(12, 8))
+    # Interpret: High rent + low sales = strong rental market
+    #           Low rent + high sales = affordable market
+
+    scatter1 = ax1.scatter(df['Average Monthly Rent (£)'], 
+                           df['Average Sales Volume '],
+                           s=150, 
+                           c=df['Gross Yield (%)'],
+                           cmap='RdYlGn',
+                           alpha=0.7,
+                           edgecolors='black',
+                           linewidth=1)
+
+    # Add quadrant lines and labels to show market types
+    draw_quadrants(ax1, df, 'Average Monthly Rent (£)', 'Average Sales Volume ', {
+        (False, True): ('Affordable Market\n(Low Rent, High Sales)', 'lightgreen'),
+        (True, True): ('High Rent\nHigh Sales', None),
+        (True, False): ('Strong Rental Market\n(High Rent, Low Sales)', 'lightcoral'),
+        (False, False): ('Low Rent\nLow Sales', None),
+    })
+
+    ax1.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Average Sales Volume', fontsize=12, fontweight='bold')
+    ax1.set_title('Rental Market Strength Analysis\nRent vs Sales Volume', 
+                  fontsize=13, fontweight='bold', pad=15)
+    ax1.grid(True, alpha=0.3)
+
+    cbar1 = plt.colorbar(scatter1, ax=ax1)
+    cbar1.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
+
+    fig1.suptitle(f'{period} Price Elasticity - Rental Market Strength Analysis', 
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    # Label the most distinctive boroughs, placed clear of markers and each other
+    place_labels(ax1, df['Average Monthly Rent (£)'], df['Average Sales Volume '], df['Boroughs'],
+                 max_labels=MAX_LABELS, alpha=0.8)
+    return fig1
+
+
+def plot_renters_vs_price(df, period=DEFAULT_PERIOD):
+    """Plot 2: Renters (Count of Rents) vs Average Price, coloured by rent"""
+    import matplotlib.pyplot as plt
+
+    # Create second figure
+    fig2, ax2 = plt.subplots(figsize=(12, 8))
+    # Interpret: Shows which boroughs are "renter-heavy" due to affordability issues
+
+    scatter2 = ax2.scatter(df['Average Price (£)'], 
+                           df['Counts of Rents'],
+                           s=150, 
+                           c=df['Average Monthly Rent (£)'],
+                           cmap='YlOrRd',
+                           alpha=0.7,
+                           edgecolors='black',
+                           linewidth=1)
+
+    # Add trend line
+    p = trend_line(df, 'Average Price (£)', 'Counts of Rents')
+    ax2.plot(df['Average Price (£)'], p(df['Average Price (£)']), 
+             "r--", alpha=0.5, linewidth=2, label='Trend Line')
+
+    # Add quadrant lines and labels
+    draw_quadrants(ax2, df, 'Average Price (£)', 'Counts of Rents', {
+        (False, True): ('Affordable &\nRenter-Heavy', 'lightblue'),
+        (True, True): ('Expensive &\nRenter-Heavy', 'orange'),
+        (True, False): ('Expensive &\nOwner-Heavy', None),
+        (False, False): ('Affordable &\nOwner-Heavy', None),
+    }, floor=2)
+
+    ax2.set_xlabel('Average House Price (£)', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Count of Renters', fontsize=12, fontweight='bold')
+    ax2.set_title('Affordability vs Rental Demand\nRenters vs Average Price', 
+                  fontsize=13, fontweight='bold', pad=15)
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(loc='upper left', fontsize=9)
+
+    cbar2 = plt.colorbar(scatter2, ax=ax2)
+    cbar2.set_label('Avg Monthly Rent (£)', fontsize=10, fontweight='bold')
+
+    fig2.suptitle(f'{period} Price Elasticity - Affordability vs Rental Demand', 
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    # Label the most distinctive boroughs, placed clear of markers and each other
+    place_labels(ax2, df['Average Price (£)'], df['Counts of Rents'], df['Boroughs'],
+                 max_labels=MAX_LABELS, alpha=0.8)
+    return fig2
+
+
+def plot_sales_vs_price(df, period=DEFAULT_PERIOD):
+    """Plot 3: Sales Volume vs House Price, coloured by gross yield"""
+    import matplotlib.pyplot as plt
+
+    # Create third figure
+    fig3, ax3 = plt.subplots(figsize=(12, 8))
+    # Interpret: Shows relationship between market activity and property values
+
+    scatter3 = ax3.scatter(df['Average Price (£)'], 
+                           df['Average Sales Volume '],
+                           s=150, 
+                           c=df['Gross Yield (%)'],
+                           cmap='RdYlGn',
+                           alpha=0.7,
+                           edgecolors='black',
+                           linewidth=1)
+
+    # Add trend line
+    p3 = trend_line(df, 'Average Price (£)', 'Average Sales Volume ')
+    ax3.plot(df['Average Price (£)'], p3(df['Average Price (£)']), 
+             "b--", alpha=0.5, linewidth=2, label='Trend Line')
+
+    # Add quadrant lines and labels
+    draw_quadrants(ax3, df, 'Average Price (£)', 'Average Sales Volume ', {
+        (False, True): ('Affordable &\nHigh Activity', 'lightgreen'),
+        (True, True): ('Expensive &\nHigh Activity', 'lightyellow'),
+        (True, False): ('Expensive &\nLow Activity', 'lightcoral'),
+        (False, False): ('Affordable &\nLow Activity', None),
+    })
+
+    ax3.set_xlabel('Average House Price (£)', fontsize=12, fontweight='bold')
+    ax3.set_ylabel('Average Sales Volume', fontsize=12, fontweight='bold')
+    ax3.set_title('Market Activity vs Property Values\nSales Volume vs House Price', 
+                  fontsize=13, fontweight='bold', pad=15)
+    ax3.grid(True, alpha=0.3)
+    ax3.legend(loc='upper left', fontsize=9)
+
+    cbar3 = plt.colorbar(scatter3, ax=ax3)
+    cbar3.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
+
+    fig3.suptitle(f'{period} Price Elasticity - Market Activity Analysis', 
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    # Label the most distinctive boroughs, placed clear of markers and each other
+    place_labels(ax3, df['Average Price (£)'], df['Average Sales Volume '], df['Boroughs'],
+                 max_labels=MAX_LABELS, alpha=0.8)
+    return fig3
+
+
+def plot_rent_vs_renters(df, period=DEFAULT_PERIOD):
+    """Plot 4: Average Rent vs Count of Renters, coloured by gross yield"""
+    import matplotlib.pyplot as plt
+
+    # Create fourth figure
+    fig4, ax4 = plt.subplots(figsize=(12, 8))
+    # Interpret: Shows rental market size and pricing dynamics
+
+    scatter4 = ax4.scatter(df['Average Monthly Rent (£)'], 
+                           df['Counts of Rents'],
+                           s=150, 
+                           c=df['Gross Yield (%)'],
+                           cmap='RdYlGn',
+                           alpha=0.7,
+                           edgecolors='black',
+                           linewidth=1)
+
+    # Add trend line
+    p4 = trend_line(df, 'Average Monthly Rent (£)', 'Counts of Rents')
+    ax4.plot(df['Average Monthly Rent (£)'], p4(df['Average Monthly Rent (£)']), 
+             "b--", alpha=0.5, linewidth=2, label='Trend Line')
+
+    # Add quadrant lines and labels
+    draw_quadrants(ax4, df, 'Average Monthly Rent (£)', 'Counts of Rents', {
+        (False, True): ('Low Rent &\nHigh Demand', 'lightgreen'),
+        (True, True): ('High Rent &\nHigh Demand', 'lightyellow'),
+        (True, False): ('High Rent &\nLow Demand', 'lightcoral'),
+        (False, False): ('Low Rent &\nLow Demand', None),
+    })
+
+    ax4.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
+    ax4.set_ylabel('Count of Renters', fontsize=12, fontweight='bold')
+    ax4.set_title('Rental Market Size vs Pricing\nAverage Rent vs Count of Renters', 
+                  fontsize=13, fontweight='bold', pad=15)
+    ax4.grid(True, alpha=0.3)
+    ax4.legend(loc='upper left', fontsize=9)
+
+    cbar4 = plt.colorbar(scatter4, ax=ax4)
+    cbar4.set_label('Gross Yield (%)', fontsize=10, fontweight='bold')
+
+    fig4.suptitle(f'{period} Price Elasticity - Rental Market Dynamics', 
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+
+    # Label the most distinctive boroughs, placed clear of markers and each other
+    place_labels(ax4, df['Average Monthly Rent (£)'], df['Counts of Rents'], df['Boroughs'],
+                 max_labels=MAX_LABELS, alpha=0.8)
+    return fig4
+
+
+# Figures rendered by this script, in display order, with their batch-mode file names
+PLOTS = {
+    'rent_vs_sales': (plot_rent_vs_sales, 'Price_Elasticity_Rent_vs_Sales_Volume.png'),
+    'renters_vs_price': (plot_renters_vs_price, 'Price_Elasticity_Renters_vs_Price.png'),
+    'sales_vs_price': (plot_sales_vs_price, 'Price_Elasticity_Sales_vs_Price.png'),
+    'rent_vs_renters': (plot_rent_vs_renters, 'Price_Elasticity_Rent_vs_Renters.png'),
+}
+
+# Source files whose changes invalidate cached elasticity figures
+PLOT_CODE = [__file__, label_placement.__file__, segmentation.__file__, stats_engine.__file__]
+
+
+def render_plot(name, output_dir='.', data_path=DATA_PATH, dpi=300, period=DEFAULT_PERIOD, df=None):
+    """Render one named figure straight to a file on the Agg backend
+
+    ``df`` is drawn when given, otherwise the data is loaded from
+    ``data_path``. The figure is restored from the artifact cache when its
+    input columns, DPI, period and the plotting code are all unchanged.
+    """
+    # Workers may be spawned rather than forked, so select the backend here too
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plot_func, filename = PLOTS[name]
+    if df is None:
+        df = load_housing_data(data_path)
+    output_path = os.path.join(output_dir, filename)
+
+    def render(path):
+        fig = plot_func(df, period)
+        with stage('savefig'):
+            fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+
+    columns = ['Boroughs'] + sorted(FIGURE_DEPENDENCIES[name])
+    cached_render(output_path, render, df, columns, params={'figure': name, 'dpi': dpi, 'period': period},
+                  code=PLOT_CODE)
+    return output_path
+
+
+def _render_all(jobs, workers):
+    """Run render_plot over argument tuples, in a process pool when more than one worker is asked for"""
+    import matplotlib
+    matplotlib.use('Agg')
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [render_plot(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_plot, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def render_batch(output_dir='.', data_path=DATA_PATH, dpi=300, workers=None, names=None, period=DEFAULT_PERIOD):
+    """Render the figures headlessly, one process per figure
+
+    Each worker loads the data through the snapshot cache rather than
+    receiving a pickled frame, so start-up cost stays flat as the data grows.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = list(PLOTS) if names is None else list(names)
+    return _render_all([(name, output_dir, data_path, dpi, period) for name in names], workers)
+
+
+def render_panel(panel, output_dir='.', dpi=300, workers=None):
+    """Redraw only the figures a panel.HousingPanel marked dirty, into one subdirectory per period
+
+    Takes this script's (figure, period) pairs off the panel's dirty set;
+    pairs for other scripts' figures stay queued.
+    """
+    jobs = []
+    for name, period in sorted(panel.pop_dirty_figures(PLOTS)):
+        period_dir = os.path.join(output_dir, period)
+        os.makedirs(period_dir, exist_ok=True)
+        jobs.append((name, period_dir, None, dpi, period, panel.period_frame(period)))
+    return _render_all(jobs, workers) if jobs else []
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Price elasticity plots')
+    parser.add_argument('--period', default=DEFAULT_PERIOD,
+                        help=f'period the data covers, shown in the titles (default {DEFAULT_PERIOD})')
+    parser.add_argument('--batch', action='store_true',
+                        help='render all plots to files on the Agg backend instead of showing them')
+    parser.add_argument('--output-dir', default='.', help='directory for batch-mode images')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes for batch mode (default: one per core)')
+    parser.add_argument('--dpi', type=int, default=300, help='resolution of batch-mode images')
+    args = parser.parse_args()
+
+    if args.batch:
+        for path in render_batch(args.output_dir, dpi=args.dpi, workers=args.workers, period=args.period):
+            print(f"Saved '{path}'")
+    else:
+        import matplotlib.pyplot as plt
+
+        # Import the cleaned data
+        df = load_housing_data()
+        for plot_func, _ in PLOTS.values():
+            plot_func(df, args.period)
+            plt.show()
@@ -2,9 +2,16 @@ import unittest
 import pandas as pd
 import numpy as np
 import os
+import tempfile
+from unittest import mock
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for testing
 import matplotlib.pyplot as plt
+from artifact_cache import DISABLE_ENV
+from data_loader import DATA_PATH, load_housing_data
+from panel import HousingPanel
+from price_elasticity_graph import MAX_LABELS, PLOTS, render_panel, render_plot
+from segmentation import segment
 
 
 class TestPriceElasticityGraphs(unittest.TestCase):
@@ -13,10 +20,8 @@ class TestPriceElasticityGraphs(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Load data once for all tests"""
-        cls.data_path = 'data/Housing_Rent_Price_Volume.csv'
-        cls.df = pd.read_csv(cls.data_path)
-        cls.df['Average Price (£)'] = cls.df['Average Price (£)'].str.replace(',', '').astype(float)
-        cls.df['Counts of Rents'] = cls.df['Counts of Rents'].str.replace(',', '').astype(float)
+        cls.data_path = DATA_PATH
+        cls.df = load_housing_data(cls.data_path)
     
     def test_data_file_exists(self):
         """Test that the data file exists"""
@@ -151,62 +156,68 @@ class TestPriceElasticityGraphs(unittest.TestCase):
         
         self.assertTrue(success, "Scatter plot generation failed")
     
+    @mock.patch.dict(os.environ, {DISABLE_ENV: '1'})
+    def test_batch_render_writes_files(self):
+        """Test that headless batch mode saves every figure to disk"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            for name in PLOTS:
+                path = render_plot(name, output_dir, self.data_path, dpi=50)
+                self.assertTrue(os.path.getsize(path) > 0, f"{name} was not rendered")
+
+    @mock.patch.dict(os.environ, {DISABLE_ENV: '1'})
+    def test_render_panel_redraws_only_dirty_figures(self):
+        """Test that a panel update redraws just the affected figures of that period"""
+        panel = HousingPanel.from_frames({'2018': self.df})
+        panel.pop_dirty_figures()
+        changed = self.df.copy()
+        changed.loc[0, 'Average Sales Volume '] += 1
+        panel.update('2019', self.df)
+        panel.update('2018', changed)
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths = render_panel(panel, output_dir, dpi=30, workers=1)
+            rendered = {os.path.relpath(path, output_dir) for path in paths}
+        expected = {os.path.join('2019', filename) for _, filename in PLOTS.values()}
+        expected |= {os.path.join('2018', PLOTS[name][1]) for name in ('rent_vs_sales', 'sales_vs_price')}
+        self.assertEqual(rendered, expected)
+        self.assertFalse(any(name in PLOTS for name, _ in panel.dirty_figures))
+        self.assertIn(('yield_ranking', '2019'), panel.dirty_figures)
+        self.assertEqual(render_panel(panel, dpi=30), [])
+
     def test_colormap_values_valid(self):
         """Test that gross yield values are valid for colormap"""
         gross_yield = self.df['Gross Yield (%)']
         self.assertTrue((gross_yield >= 0).all(), "Gross yield should be non-negative")
         self.assertTrue((gross_yield <= 100).all(), "Gross yield should be <= 100%")
     
-    def test_annotation_threshold_logic(self):
-        """Test that annotation thresholds correctly identify boroughs"""
-        # Plot 1 thresholds
-        plot1_annotated = self.df[
-            (self.df['Average Monthly Rent (£)'] > 2500) | 
-            (self.df['Average Sales Volume '] > 350)
-        ]
-        self.assertGreater(len(plot1_annotated), 0, "Should have boroughs to annotate in Plot 1")
-        
-        # Plot 2 thresholds
-        plot2_annotated = self.df[
-            (self.df['Counts of Rents'] > 3500) | 
-            (self.df['Average Price (£)'] > 1200000)
-        ]
-        self.assertGreater(len(plot2_annotated), 0, "Should have boroughs to annotate in Plot 2")
-        
-        # Plot 3 thresholds
-        plot3_annotated = self.df[
-            (self.df['Average Sales Volume '] > 350) | 
-            (self.df['Average Price (£)'] > 1200000)
-        ]
-        self.assertGreater(len(plot3_annotated), 0, "Should have boroughs to annotate in Plot 3")
-        
-        # Plot 4 thresholds
-        plot4_annotated = self.df[
-            (self.df['Counts of Rents'] > 3500) | 
-            (self.df['Average Monthly Rent (£)'] > 2800)
-        ]
-        self.assertGreater(len(plot4_annotated), 0, "Should have boroughs to annotate in Plot 4")
-    
+    def test_selected_labels_placed_without_overlap(self):
+        """Test that every plot labels some boroughs, within the cap, with no two label boxes overlapping"""
+        from matplotlib.text import Annotation
+        for name, (plot_func, _) in PLOTS.items():
+            fig = plot_func(self.df)
+            ax = fig.axes[0]
+            labels = [text for text in ax.texts if isinstance(text, Annotation)]
+            self.assertGreater(len(labels), 0, name)
+            self.assertLessEqual(len(labels), MAX_LABELS, name)
+            self.assertTrue({label.get_text() for label in labels} <= set(self.df['Boroughs']), name)
+            fig.canvas.draw()  # label boxes are only positioned when drawn
+            renderer = fig.canvas.get_renderer()
+            boxes = [label.get_bbox_patch().get_window_extent(renderer) for label in labels]
+            for i, first in enumerate(boxes):
+                for second in boxes[i + 1:]:
+                    self.assertFalse(first.overlaps(second), name)
+            plt.close(fig)
+
     def test_quadrant_classification(self):
         """Test that quadrant classification logic works"""
-        median_rent = self.df['Average Monthly Rent (£)'].median()
-        median_sales = self.df['Average Sales Volume '].median()
-        
-        # Count boroughs in each quadrant
-        q1 = len(self.df[(self.df['Average Monthly Rent (£)'] <= median_rent) & 
-                        (self.df['Average Sales Volume '] > median_sales)])
-        q2 = len(self.df[(self.df['Average Monthly Rent (£)'] > median_rent) & 
-                        (self.df['Average Sales Volume '] > median_sales)])
-        q3 = len(self.df[(self.df['Average Monthly Rent (£)'] > median_rent) & 
-                        (self.df['Average Sales Volume '] <= median_sales)])
-        q4 = len(self.df[(self.df['Average Monthly Rent (£)'] <= median_rent) & 
-                        (self.df['Average Sales Volume '] <= median_sales)])
-        
-        # Total should equal number of boroughs
-        total_classified = q1 + q2 + q3 + q4
-        self.assertEqual(total_classified, len(self.df), 
+        quadrants = segment(self.df, 'Average Monthly Rent (£)', 'Average Sales Volume ')
+
+        # Edges are the medians, and every borough falls in exactly one quadrant
+        self.assertEqual(quadrants.x_edges[0], self.df['Average Monthly Rent (£)'].median())
+        self.assertEqual(quadrants.y_edges[0], self.df['Average Sales Volume '].median())
+        self.assertTrue((quadrants.cells >= 0).all())
+        self.assertEqual(quadrants.counts.sum(), len(self.df),
                         "All boroughs should be classified into quadrants")
-    
+
     def test_data_ranges_realistic(self):
         """Test that data values are within realistic ranges for London"""
         # Rent should be between £500 and £5000 per month
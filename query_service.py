@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+from data_loader import DATA_PATH, SNAPSHOT_DIR, load_housing_data
+from instrumentation import profile_run, traced
+from panel import DEFAULT_PERIOD
+from segmentation import segment
+
+DEFAULT_PORT = 8765
+
+# Short names accepted wherever a metric is requested
+METRICS = {
+    'gross_yield': 'Gross Yield (%)',
+    'rent': 'Average Monthly Rent (£)',
+    'yearly_rent': 'Average Yearly Rent (£)',
+    'price': 'Average Price (£)',
+    'sales': 'Average Sales Volume ',
+    'renters': 'Counts of Rents',
+}
+
+# Rent vs sales volume quadrants, as labelled on the first elasticity plot
+QUADRANTS = {
+    (False, True): 'Affordable Market',
+    (True, True): 'High Rent High Sales',
+    (True, False): 'Strong Rental Market',
+    (False, False): 'Low Rent Low Sales',
+}
+
+# Seconds between data file modification checks
+CHECK_INTERVAL = 1.0
+
+
+class QueryError(Exception):
+    """A request the index cannot answer, with the HTTP status to send"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_value(value):
+    """Plain Python value for JSON, with NaN as null"""
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class MetricsIndex:
+    """Borough metrics precomputed for lookup, keyed by (period, borough)
+
+    Everything a request can ask for is computed once at load time:
+    per-borough records with their quadrant and yield rank, every metric's
+    ranking, quadrant membership and summary aggregates. Requests are then
+    dictionary lookups and list slices.
+    """
+
+    def __init__(self, df, source=None):
+        self.source = source
+        self.loaded_at = time.time()
+        self.rows = len(df)
+        if 'Period' not in df.columns:
+            df = df.assign(Period=DEFAULT_PERIOD)
+        df = df.assign(Period=df['Period'].astype(str))
+        self.metrics = {name: col for name, col in METRICS.items() if col in df.columns}
+
+        self.periods = sorted(df['Period'].unique())
+        self.records = {}
+        self.names = {}
+        self.rankings = {}
+        self.quadrants = {}
+        self.aggregates = {}
+        for period, frame in df.groupby('Period', sort=True):
+            self._index_period(period, frame.reset_index(drop=True))
+
+    def _index_period(self, period, frame):
+        quadrants = segment(frame, 'Average Monthly Rent (£)', 'Average Sales Volume ')
+        median_rent, median_sales = quadrants.x_edges[0], quadrants.y_edges[0]
+        quadrant = [label if isinstance(label, str) else None for label in quadrants.labels(QUADRANTS)]
+        yield_rank = frame['Gross Yield (%)'].rank(ascending=False, method='min').to_numpy()
+
+        records = {}
+        for i, row in enumerate(frame.to_dict('records')):
+            record = {'borough': row['Boroughs'], 'period': period, 'quadrant': quadrant[i],
+                      'yield_rank': int(yield_rank[i])}
+            record.update({name: _json_value(row[col]) for name, col in self.metrics.items()})
+            records[row['Boroughs'].casefold()] = record
+        self.records[period] = records
+        self.names[period] = sorted(frame['Boroughs'])
+
+        self.rankings[period] = {}
+        for name, col in self.metrics.items():
+            ordered = frame[['Boroughs', col]].dropna().sort_values(col, ascending=False, kind='stable')
+            self.rankings[period][name] = [{'borough': b, name: _json_value(v)}
+                                           for b, v in zip(ordered['Boroughs'], ordered[col])]
+
+        members = {label: [] for label in QUADRANTS.values()}
+        for borough, label in zip(frame['Boroughs'], quadrant):
+            if label is not None:
+                members[label].append(borough)
+        self.quadrants[period] = {'median_rent': _json_value(median_rent),
+                                  'median_sales': _json_value(median_sales),
+                                  'quadrants': {label: sorted(boroughs) for label, boroughs in members.items()}}
+
+        summary = frame[list(self.metrics.values())].agg(['count', 'mean', 'median', 'min', 'max'])
+        self.aggregates[period] = {name: {stat: _json_value(summary.at[stat, col]) for stat in summary.index}
+                                   for name, col in self.metrics.items()}
+
+    def _period(self, period):
+        if period is None:
+            return self.periods[-1]
+        if period not in self.records:
+            raise QueryError(f'Unknown period {period!r}; available: {self.periods}', 404)
+        return period
+
+    def _metric(self, metric):
+        name = metric if metric in self.metrics else next(
+            (short for short, col in self.metrics.items() if col == metric), None)
+        if name is None:
+            raise QueryError(f'Unknown metric {metric!r}; available: {sorted(self.metrics)}')
+        return name
+
+    def borough(self, name, period=None):
+        """Metrics, quadrant and yield rank for one borough (case-insensitive)"""
+        record = self.records[self._period(period)].get(name.casefold())
+        if record is None:
+            raise QueryError(f'Unknown borough {name!r}', 404)
+        return record
+
+    def boroughs(self, period=None):
+        """Sorted borough names"""
+        return self.names[self._period(period)]
+
+    def ranking(self, metric='gross_yield', n=None, order='desc', period=None):
+        """Boroughs ordered by ``metric``, highest first unless ``order='asc'``"""
+        if order not in ('asc', 'desc'):
+            raise QueryError(f"order must be 'asc' or 'desc', not {order!r}")
+        ranked = self.rankings[self._period(period)][self._metric(metric)]
+        if order == 'asc':
+            ranked = ranked[::-1]
+        return ranked if n is None else ranked[:n]
+
+    def quadrant_members(self, period=None):
+        """Rent and sales medians with the boroughs in each quadrant"""
+        return self.quadrants[self._period(period)]
+
+    def summary(self, period=None):
+        """Count, mean, median, min and max of every metric"""
+        return self.aggregates[self._period(period)]
+
+
+class MetricsStore:
+    """Holds the current index and rebuilds it when the data file changes
+
+    The file's modification time is checked at most every
+    ``check_interval`` seconds, on the request path. A reload builds the
+    new index outside the lock, so other requests keep being answered
+    from the current one meanwhile, and only one reload runs at a time.
+    The new index is swapped in whole, so concurrent requests always see
+    one consistent version. If a reload fails, the previous index is kept.
+    """
+
+    def __init__(self, path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.check_interval = check_interval
+        self.reload_error = None
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._mtime = os.stat(path).st_mtime_ns
+        self._checked = time.monotonic()
+        self._index = self._build()
+
+    @traced('build_index')
+    def _build(self):
+        return MetricsIndex(load_housing_data(self.path, snapshot_dir=self.snapshot_dir), source=self.path)
+
+    @property
+    def index(self):
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+        return self._index
+
+    def refresh(self):
+        """Reload if the data file changed since the last load; returns True on reload
+
+        Returns False at once when another thread is already reloading.
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            if self._reloading:
+                return False
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as exc:
+                self.reload_error = repr(exc)
+                return False
+            if mtime == self._mtime:
+                return False
+            self._reloading = True
+        try:
+            index = self._build()
+        except Exception as exc:
+            with self._lock:
+                self.reload_error, self._reloading = repr(exc), False
+            return False
+        with self._lock:
+            self._index, self._mtime, self.reload_error, self._reloading = index, mtime, None, False
+        return True
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over a MetricsStore; the store is set on a subclass by make_server"""
+
+    store = None
+    quiet = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        try:
+            body = self.route(parts, params)
+            status = 200
+        except QueryError as exc:
+            body, status = {'error': str(exc)}, exc.status
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def route(self, parts, params):
+        index = self.store.index
+        period = params.get('period')
+        if parts == ['health']:
+            return {'rows': index.rows, 'periods': index.periods, 'source': index.source,
+                    'loaded_at': index.loaded_at, 'reload_error': self.store.reload_error}
+        if parts == ['boroughs']:
+            return index.boroughs(period)
+        if len(parts) == 2 and parts[0] == 'borough':
+            return index.borough(parts[1], period)
+        if parts == ['ranking']:
+            n = params.get('n')
+            if n is not None and not n.isdigit():
+                raise QueryError(f'n must be a non-negative integer, not {n!r}')
+            return index.ranking(params.get('metric', 'gross_yield'), None if n is None else int(n),
+                                 params.get('order', 'desc'), period)
+        if parts == ['quadrants']:
+            return index.quadrant_members(period)
+        if parts == ['aggregates']:
+            return index.summary(period)
+        raise QueryError(f'Unknown endpoint /{"/".join(parts)}', 404)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(store, host='127.0.0.1', port=DEFAULT_PORT, quiet=False):
+    """ThreadingHTTPServer answering queries from ``store``; port 0 picks a free port"""
+    handler = type('BoundQueryHandler', (QueryHandler,), {'store': store, 'quiet': quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Local HTTP query service over the borough metrics')
+    parser.add_argument('--data', default=DATA_PATH, help='borough metrics CSV to serve and watch')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--check-interval', type=float, default=CHECK_INTERVAL,
+                        help='seconds between data file change checks')
+    parser.add_argument('--quiet', action='store_true', help='do not log each request')
+    args = parser.parse_args()
+
+    server = make_server(MetricsStore(args.data, check_interval=args.check_interval), args.host, args.port,
+                         args.quiet)
+    print(f'Serving borough metrics on http://{args.host}:{server.server_address[1]}/ '
+          '(endpoints: /health /boroughs /borough/<name> /ranking /quadrants /aggregates)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
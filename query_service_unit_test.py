@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+import pandas as pd
+from data_loader import DATA_PATH
+from query_service import MetricsStore, make_server
+
+
+class TestQueryService(unittest.TestCase):
+    """Unit tests for the local HTTP query service"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.data_path = os.path.join(cls.tmpdir, 'housing.csv')
+        shutil.copyfile(DATA_PATH, cls.data_path)
+        cls.store = MetricsStore(cls.data_path, snapshot_dir=os.path.join(cls.tmpdir, 'snapshots'),
+                                 check_interval=0)
+        cls.server = make_server(cls.store, port=0, quiet=True)
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.df = pd.read_csv(DATA_PATH, thousands=',')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def get(self, path):
+        with urlopen(self.base + path) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def test_borough_lookup(self):
+        """Test one borough's record, case-insensitively"""
+        row = self.df.iloc[0]
+        record = self.get('/borough/' + quote(row['Boroughs'].upper()))
+        self.assertEqual(record['borough'], row['Boroughs'])
+        self.assertAlmostEqual(record['gross_yield'], row['Gross Yield (%)'])
+        self.assertEqual(record['period'], '2018')
+
+    def test_ranking_matches_sort(self):
+        """Test the top and bottom of the yield ranking"""
+        expected = self.df.sort_values('Gross Yield (%)', ascending=False)['Boroughs'].tolist()
+        top = self.get('/ranking?metric=gross_yield&n=5')
+        self.assertEqual([r['borough'] for r in top], expected[:5])
+        bottom = self.get('/ranking?metric=Gross%20Yield%20(%25)&n=3&order=asc')
+        self.assertEqual([r['borough'] for r in bottom], expected[::-1][:3])
+
+    def test_quadrants_cover_all_boroughs(self):
+        """Test that every borough falls in exactly one quadrant"""
+        quadrants = self.get('/quadrants')['quadrants']
+        members = [b for boroughs in quadrants.values() for b in boroughs]
+        self.assertEqual(sorted(members), sorted(self.df['Boroughs']))
+
+    def test_errors(self):
+        """Test 404 for unknown boroughs and endpoints, 400 for bad parameters"""
+        for path, status in [('/borough/Atlantis', 404), ('/nope', 404), ('/ranking?metric=height', 400)]:
+            with self.assertRaises(HTTPError) as ctx:
+                self.get(path)
+            self.assertEqual(ctx.exception.code, status)
+
+    def test_hot_reload(self):
+        """Test that editing the data file is picked up without restarting"""
+        df = pd.read_csv(self.data_path, dtype=str)
+        original = df.copy()
+        df.loc[0, 'Gross Yield (%)'] = '99.0'
+        try:
+            df.to_csv(self.data_path, index=False)
+            stat = os.stat(self.data_path)
+            os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            record = self.get('/borough/' + quote(df.loc[0, 'Boroughs']))
+            self.assertAlmostEqual(record['gross_yield'], 99.0)
+            self.assertEqual(self.get('/ranking?n=1')[0]['borough'], df.loc[0, 'Boroughs'])
+        finally:
+            original.to_csv(self.data_path, index=False)
+            stat = os.stat(self.data_path)
+            os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+            self.store.refresh()
+
+    def test_requests_served_during_reload(self):
+        """Test that a slow rebuild does not block readers or start a second rebuild"""
+        store = MetricsStore(self.data_path, snapshot_dir=os.path.join(self.tmpdir, 'snapshots'), check_interval=0)
+        old, build = store.index, store._build
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build():
+            started.set()
+            release.wait(5)
+            return build()
+        store._build = slow_build
+        store._mtime -= 1
+        reloads = []
+        worker = threading.Thread(target=lambda: reloads.append(store.refresh()))
+        worker.start()
+        try:
+            self.assertTrue(started.wait(5))
+            self.assertIs(store.index, old)
+            self.assertFalse(store.refresh())
+        finally:
+            release.set()
+            worker.join(5)
+        self.assertEqual(reloads, [True])
+        self.assertIsNot(store.index, old)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,88 +1,153 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
 import numpy as np
-from scipy import stats
-
-# Import the data
-df = pd.read_csv('data/Housing_Rent_Price_Volume.csv')
-
-# Clean the Average Price column (remove commas and convert to numeric)
-df['Average Price (£)'] = df['Average Price (£)'].str.replace(',', '').astype(float)
-
-# Statistical and Regression Analysis
-x = df['Average Monthly Rent (£)']
-y = df['Average Price (£)']
-
-# Calculate correlation coefficient and p-value
-correlation, p_value = stats.pearsonr(x, y)
-
-# Linear regression
-slope, intercept, r_value, p_value_reg, std_err = stats.linregress(x, y)
-r_squared = r_value**2
-
-# Calculate confidence interval for the regression line
-predict_y = slope * x + intercept
-residuals = y - predict_y
-n = len(x)
-dof = n - 2  # degrees of freedom
-t_val = stats.t.ppf(0.975, dof)  # 95% confidence interval
-std_resid = np.sqrt(np.sum(residuals**2) / dof)
-
-# Create scatter plot
-fig, ax = plt.subplots(figsize=(14, 9))
-ax.scatter(x, y, s=100, alpha=0.6, c='steelblue', edgecolors='black', linewidth=0.5, label='Data Points')
-
-# Add trend line
-x_line = np.linspace(x.min(), x.max(), 100)
-y_line = slope * x_line + intercept
-ax.plot(x_line, y_line, 'r--', alpha=0.7, linewidth=2, label='Regression Line')
-
-# Add confidence interval
-confidence_interval = t_val * std_resid * np.sqrt(1/n + (x_line - x.mean())**2 / np.sum((x - x.mean())**2))
-ax.fill_between(x_line, y_line - confidence_interval, y_line + confidence_interval, 
-                 alpha=0.2, color='red', label='95% Confidence Interval')
-
-# Add labels for each point with borough names
-for i, borough in enumerate(df['Boroughs']):
-    ax.annotate(borough, 
-                (df['Average Monthly Rent (£)'].iloc[i], df['Average Price (£)'].iloc[i]),
-                fontsize=7, alpha=0.6, ha='right')
-
-# Add statistics box
-stats_text = f'''Statistical Analysis:
+from artifact_cache import cached_render
+from data_loader import load_housing_data
+from instrumentation import profile_run, stage, traced
+import label_placement
+import stats_engine
+from label_placement import place_labels
+from online_stats import OnlineRegression
+from stats_engine import confidence_band, pairwise_stats, regression_row, significance_stars
+
+OUTPUT_PATH = 'Rent_vs_Price_Regression.png'
+
+# Fit fields drawn in the line, band and statistics box; a passed-in fit keys the artifact cache by these
+FIT_FIELDS = ['slope', 'intercept', 'r_squared', 'pearson_r', 'pearson_p', 'slope_se',
+              'n', 'x_mean', 'sxx', 'resid_std', 't_crit']
+
+
+@traced('regression')
+def regression_fit(df):
+    """Correlation, regression and confidence-band terms from the batched statistics engine"""
+    return regression_row(pairwise_stats(df, ['Average Monthly Rent (£)', 'Average Price (£)']),
+                          'Average Monthly Rent (£)', 'Average Price (£)')
+
+
+def online_regression(df, decay=1.0, window=None):
+    """Streaming fit of price on rent seeded with ``df``
+
+    Feed new listings with ``.update(rent, price)``; ``.fit()`` returns the
+    same fields as regression_fit, ready for the plot and summary.
+    """
+    return OnlineRegression(decay, window).update_many(df['Average Monthly Rent (£)'], df['Average Price (£)'])
+
+
+def plot_rent_price_regression(df, fit=None):
+    """Scatter of rent against price with the OLS line, 95% band and statistics box"""
+    import matplotlib.pyplot as plt
+
+    if fit is None:
+        fit = regression_fit(df)
+    x = df['Average Monthly Rent (£)']
+    y = df['Average Price (£)']
+    correlation, p_value = fit['pearson_r'], fit['pearson_p']
+    slope, intercept, std_err = fit['slope'], fit['intercept'], fit['slope_se']
+    r_squared = fit['r_squared']
+
+    # Create scatter plot
+    fig, ax = plt.subplots(figsize=(14, 9))
+    ax.scatter(x, y, s=100, alpha=0.6, c='steelblue', edgecolors='black', linewidth=0.5, label='Data Points')
+
+    # Add trend line
+    x_line = np.linspace(x.min(), x.max(), 100)
+    y_line = slope * x_line + intercept
+    ax.plot(x_line, y_line, 'r--', alpha=0.7, linewidth=2, label='Regression Line')
+
+    # Add confidence interval
+    confidence_interval = confidence_band(fit, x_line)
+    ax.fill_between(x_line, y_line - confidence_interval, y_line + confidence_interval, 
+                     alpha=0.2, color='red', label='95% Confidence Interval')
+
+    # Add statistics box
+    stats_text = f'''Statistical Analysis:
 Regression Equation: y = {slope:.2f}x + {intercept:.2f}
 R² = {r_squared:.4f}
 Correlation (r) = {correlation:.4f}
 P-value = {p_value:.2e}
 Standard Error = {std_err:.2f}
-Significance: {"***" if p_value < 0.001 else "**" if p_value < 0.01 else "*" if p_value < 0.05 else "ns"}'''
-
-props = dict(boxstyle='round', facecolor='wheat', alpha=0.8)
-ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, fontsize=9,
-        verticalalignment='top', bbox=props, family='monospace')
-
-ax.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
-ax.set_ylabel('Average Price (£)', fontsize=12, fontweight='bold')
-ax.set_title('Statistical & Regression Analysis:\nAverage Monthly Rent vs Average House Price\nLondon Boroughs', 
-          fontsize=14, fontweight='bold')
-ax.grid(True, alpha=0.3)
-ax.legend(loc='lower right', fontsize=10)
-plt.tight_layout()
-plt.show()
-
-# Print detailed statistics to console
-print("=" * 60)
-print("STATISTICAL AND REGRESSION ANALYSIS")
-print("=" * 60)
-print(f"\nRegression Equation: Price = {slope:.2f} × Rent + {intercept:.2f}")
-print(f"\nR-squared (R²): {r_squared:.4f}")
-print(f"  → {r_squared*100:.2f}% of variance in house price is explained by rent")
-print(f"\nCorrelation Coefficient (r): {correlation:.4f}")
-print(f"  → {'Strong' if abs(correlation) > 0.7 else 'Moderate' if abs(correlation) > 0.4 else 'Weak'} positive correlation")
-print(f"\nP-value: {p_value:.2e}")
-print(f"  → Result is {'highly significant' if p_value < 0.001 else 'significant' if p_value < 0.05 else 'not significant'}")
-print(f"\nStandard Error: {std_err:.2f}")
-print(f"\nInterpretation:")
-print(f"  • For every £1 increase in monthly rent,")
-print(f"    house price increases by approximately £{slope:.2f}")
-print("=" * 60)
+Significance: {significance_stars(p_value)}'''
+
+    props = dict(boxstyle='round', facecolor='wheat', alpha=0.8)
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, fontsize=9,
+            verticalalignment='top', bbox=props, family='monospace')
+
+    ax.set_xlabel('Average Monthly Rent (£)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Average Price (£)', fontsize=12, fontweight='bold')
+    ax.set_title('Statistical & Regression Analysis:\nAverage Monthly Rent vs Average House Price\nLondon Boroughs', 
+              fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc='lower right', fontsize=10)
+    plt.tight_layout()
+
+    # Label boroughs, most distinctive first, skipping any label that would overlap another
+    place_labels(ax, x, y, df['Boroughs'], fontsize=7, marker_size=100, gap=2,
+                 arrows=False, bbox=None, alpha=0.6)
+    return fig
+
+
+def print_summary(fit):
+    """Print detailed statistics to the console"""
+    correlation, p_value = fit['pearson_r'], fit['pearson_p']
+    slope, intercept, std_err = fit['slope'], fit['intercept'], fit['slope_se']
+    r_squared = fit['r_squared']
+
+    print("=" * 60)
+    print("STATISTICAL AND REGRESSION ANALYSIS")
+    print("=" * 60)
+    print(f"\nRegression Equation: Price = {slope:.2f} × Rent + {intercept:.2f}")
+    print(f"\nR-squared (R²): {r_squared:.4f}")
+    print(f"  → {r_squared*100:.2f}% of variance in house price is explained by rent")
+    print(f"\nCorrelation Coefficient (r): {correlation:.4f}")
+    print(f"  → {'Strong' if abs(correlation) > 0.7 else 'Moderate' if abs(correlation) > 0.4 else 'Weak'} positive correlation")
+    print(f"\nP-value: {p_value:.2e}")
+    print(f"  → Result is {'highly significant' if p_value < 0.001 else 'significant' if p_value < 0.05 else 'not significant'}")
+    print(f"\nStandard Error: {std_err:.2f}")
+    print(f"\nInterpretation:")
+    print(f"  • For every £1 increase in monthly rent,")
+    print(f"    house price increases by approximately £{slope:.2f}")
+    print("=" * 60)
+
+
+def save_regression(df, output_path=OUTPUT_PATH, dpi=300, fit=None):
+    """Save the chart, served from the artifact cache when nothing changed
+
+    ``fit`` is an already computed regression of these rows, as for
+    plot_rent_price_regression; its values, to 10 significant digits, are
+    part of the cache key. Returns True on a cache hit.
+    """
+    fit_key = None if fit is None else {field: float(f'{float(fit[field]):.10g}') for field in FIT_FIELDS}
+
+    def render(path):
+        import matplotlib.pyplot as plt
+
+        fig = plot_rent_price_regression(df, fit)
+        with stage('savefig'):
+            fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+
+    return cached_render(output_path, render, df, ['Boroughs', 'Average Monthly Rent (£)', 'Average Price (£)'],
+                         params={'dpi': dpi, 'fit': fit_key}, code=[__file__, label_placement.__file__, stats_engine.__file__])
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Rent vs price regression with statistics box')
+    parser.add_argument('--online', action='store_true',
+                        help='fit with the streaming OnlineRegression instead of the batch engine')
+    parser.add_argument('--decay', type=float, default=1.0,
+                        help='online mode: weight kept per new point, e.g. 0.99 (default 1, no forgetting)')
+    parser.add_argument('--window', type=int, default=None, help='online mode: fit only the latest N rows')
+    args = parser.parse_args()
+    import matplotlib.pyplot as plt
+
+    # Import the cleaned data
+    df = load_housing_data()
+
+    # Statistical and Regression Analysis; --decay or --window imply the online fit
+    if args.online or args.decay != 1.0 or args.window is not None:
+        fit = online_regression(df, args.decay, args.window).fit()
+    else:
+        fit = regression_fit(df)
+    plot_rent_price_regression(df, fit)
+    plt.show()
+    print_summary(fit)
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+from data_loader import DATA_PATH, load_housing_data
+from instrumentation import profile_run, stage
+
+STATISTICS_PATH = 'report_statistics.csv'
+
+# Stored yields are rounded to 2 d.p.; larger gaps mean the inputs disagree
+YIELD_TOLERANCE = 0.01
+
+
+def _headless():
+    """Select the Agg backend in whichever process renders; the report never opens windows"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _frame(inputs, data_path):
+    """The cleaned frame handed down by an upstream node, or loaded when the node runs on its own"""
+    import pandas as pd
+
+    for value in inputs.values():
+        if isinstance(value, pd.DataFrame) and 'Boroughs' in value.columns:
+            return value
+    return load_housing_data(data_path)
+
+
+def describe(value):
+    """Short text for a node's output in the timing table: a frame's note or row count, else the value"""
+    if hasattr(value, 'attrs') and hasattr(value, 'columns'):
+        return value.attrs.get('note', f'{len(value):,} rows')
+    return value
+
+
+def load_node(inputs, data_path, output_dir, dpi):
+    """Parse and clean the CSV once; the frame is handed to the nodes downstream"""
+    return load_housing_data(data_path)
+
+
+def derive_node(inputs, data_path, output_dir, dpi):
+    """Check the stored gross yield against rent and price and take the quadrant medians
+
+    A stored yield further than YIELD_TOLERANCE from rent x 12 / price
+    only warns: the figures still draw the stored column.
+    """
+    from panel import gross_yield
+
+    df = _frame(inputs, data_path).copy(deep=False)
+    derived = gross_yield(df['Average Monthly Rent (£)'], df['Average Price (£)'])
+    gap = float((derived - df['Gross Yield (%)']).abs().max())
+    medians = df[['Average Monthly Rent (£)', 'Average Sales Volume ', 'Average Price (£)']].median()
+    note = ', '.join(f'median {col.strip()} = {value:,.0f}' for col, value in medians.items())
+    if gap > YIELD_TOLERANCE:
+        warnings.warn(f'Gross Yield (%) differs from rent x 12 / price by up to {gap:.3f} points')
+        note += f'; yield gap up to {gap:.3f} points'
+    df.attrs['note'] = note
+    return df
+
+
+def stats_node(inputs, data_path, output_dir, dpi):
+    """All-pairs correlation and regression table, written for the appendix and handed downstream"""
+    from stats_engine import pairwise_stats
+
+    output_path = os.path.join(output_dir, STATISTICS_PATH)
+    table = pairwise_stats(_frame(inputs, data_path))
+    table.to_csv(output_path, index=False)
+    table.attrs['note'] = output_path
+    return table
+
+
+def elasticity_node(name, inputs, data_path, output_dir, dpi):
+    """One of the four price elasticity figures, bound to ``name`` with functools.partial"""
+    from price_elasticity_graph import render_plot
+    return render_plot(name, output_dir, data_path, dpi, df=_frame(inputs, data_path))
+
+
+def regression_node(inputs, data_path, output_dir, dpi):
+    """Rent vs price regression chart, using the fit from the statistics table when it is upstream"""
+    from analysis import scatter_module
+    from stats_engine import regression_row
+
+    _headless()
+    scatter = scatter_module()
+    fit = None
+    if 'stats' in inputs:
+        fit = regression_row(inputs['stats'], 'Average Monthly Rent (£)', 'Average Price (£)')
+    output_path = os.path.join(output_dir, scatter.OUTPUT_PATH)
+    scatter.save_regression(_frame(inputs, data_path), output_path, dpi, fit)
+    return output_path
+
+
+def distribution_node(inputs, data_path, output_dir, dpi):
+    """Gross yield histogram with KDE"""
+    import distribution_Gross_Rental_Yield_histogram as histogram
+
+    _headless()
+    output_path = os.path.join(output_dir, histogram.OUTPUT_PATH)
+    histogram.save_distribution(_frame(inputs, data_path), output_path, dpi=dpi)
+    return output_path
+
+
+def ranking_node(inputs, data_path, output_dir, dpi):
+    """Gross yield ranking bar chart"""
+    import yield_ranking_barchart as ranking
+
+    _headless()
+    output_path = os.path.join(output_dir, ranking.OUTPUT_PATH)
+    ranking.save_ranking(_frame(inputs, data_path), output_path, dpi=dpi)
+    return output_path
+
+
+def heat_map_node(inputs, data_path, output_dir, dpi):
+    """Interactive gross yield heat map"""
+    import heat_map_chart
+
+    output_path = os.path.join(output_dir, heat_map_chart.OUTPUT_PATH)
+    heat_map_chart.save_heat_map(_frame(inputs, data_path), output_path)
+    return output_path
+
+
+# name -> (stage, function, dependencies). Loading and cleaning share one node
+# because the snapshot cache stores the already-cleaned frame. Each node is
+# called with ``inputs``, its dependencies' outputs by name.
+GRAPH = {
+    'load': ('load', load_node, []),
+    'derive': ('derive', derive_node, ['load']),
+    'stats': ('stats', stats_node, ['derive']),
+    'rent_vs_sales': ('render', partial(elasticity_node, 'rent_vs_sales'), ['derive']),
+    'renters_vs_price': ('render', partial(elasticity_node, 'renters_vs_price'), ['derive']),
+    'sales_vs_price': ('render', partial(elasticity_node, 'sales_vs_price'), ['derive']),
+    'rent_vs_renters': ('render', partial(elasticity_node, 'rent_vs_renters'), ['derive']),
+    'rent_price_regression': ('render', regression_node, ['derive', 'stats']),
+    'yield_distribution': ('render', distribution_node, ['derive']),
+    'yield_ranking': ('render', ranking_node, ['derive']),
+    'heat_map': ('render', heat_map_node, ['derive']),
+}
+
+
+def topological_order(graph):
+    """Node names ordered so every node follows its dependencies"""
+    remaining = {name: set(deps) for name, (_, _, deps) in graph.items()}
+    for name, deps in remaining.items():
+        unknown = deps - remaining.keys()
+        if unknown:
+            raise ValueError(f'Node {name!r} depends on unknown nodes: {sorted(unknown)}')
+    order = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f'Dependency cycle among nodes: {sorted(remaining)}')
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+        order.extend(ready)
+    return order
+
+
+def select_nodes(graph, names):
+    """Sub-graph containing ``names`` and everything they depend on"""
+    selected, stack = set(), list(names)
+    while stack:
+        name = stack.pop()
+        if name not in graph:
+            raise ValueError(f'Unknown node: {name!r}')
+        if name not in selected:
+            selected.add(name)
+            stack.extend(graph[name][2])
+    return {name: spec for name, spec in graph.items() if name in selected}
+
+
+def _run_node(name, func, inputs, kwargs):
+    """Call a node on its dependencies' outputs and time it where it runs"""
+    start = time.perf_counter()
+    with stage(name):
+        result = func(inputs, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_graph(graph=GRAPH, workers=None, **kwargs):
+    """Run every node once its dependencies have finished, independent nodes concurrently
+
+    Nodes run in a process pool of ``workers`` processes (default one per
+    core); ``workers=1`` runs them in order in this process. A failed node
+    marks everything downstream as skipped while unrelated branches carry on.
+    Each node receives its dependencies' return values, so the cleaned frame
+    is loaded once and handed along the edges; in a pool it is pickled to
+    the workers that need it. Returns one timing record per node in
+    completion order.
+    """
+    order = topological_order(graph)
+    records = {}
+    outputs = {}
+
+    def finish(name, result=None, seconds=None, error=None):
+        status = 'ok' if error is None else 'failed'
+        if error is None:
+            outputs[name] = result
+        records[name] = {'node': name, 'stage': graph[name][0], 'status': status,
+                         'seconds': seconds, 'result': describe(result) if error is None else repr(error)}
+
+    def inputs(name):
+        return {dep: outputs[dep] for dep in graph[name][2]}
+
+    def blocked(name):
+        return any(records.get(dep, {}).get('status') in ('failed', 'skipped') for dep in graph[name][2])
+
+    def skip(name):
+        records[name] = {'node': name, 'stage': graph[name][0], 'status': 'skipped',
+                         'seconds': None, 'result': 'dependency failed'}
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for name in order:
+            if blocked(name):
+                skip(name)
+                continue
+            try:
+                finish(name, *_run_node(name, graph[name][1], inputs(name), kwargs))
+            except Exception as exc:
+                finish(name, error=exc)
+        return list(records.values())
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        waiting = list(order)
+        while waiting or running:
+            for name in list(waiting):
+                deps = graph[name][2]
+                if blocked(name):
+                    skip(name)
+                    waiting.remove(name)
+                elif all(records.get(dep, {}).get('status') == 'ok' for dep in deps):
+                    running[pool.submit(_run_node, name, graph[name][1], inputs(name), kwargs)] = name
+                    waiting.remove(name)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    finish(name, *future.result())
+                except Exception as exc:
+                    finish(name, error=exc)
+    return list(records.values())
+
+
+def print_summary(records, wall_seconds):
+    """Per-node timing table followed by the end-to-end wall time"""
+    print(f"\n{'node':<24} {'stage':<8} {'status':<8} {'seconds':>9}  result")
+    print('-' * 80)
+    for record in records:
+        seconds = '' if record['seconds'] is None else f"{record['seconds']:.3f}"
+        print(f"{record['node']:<24} {record['stage']:<8} {record['status']:<8} {seconds:>9}  {record['result']}")
+    busy = sum(record['seconds'] or 0 for record in records)
+    print('-' * 80)
+    print(f'Wall time {wall_seconds:.3f}s for {busy:.3f}s of node time')
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Run every analysis as one dependency graph')
+    parser.add_argument('--data', default=DATA_PATH, help='borough metrics CSV')
+    parser.add_argument('--output-dir', default='.', help='directory for figures, the map and tables')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--dpi', type=int, default=300, help='resolution of saved figures')
+    parser.add_argument('--nodes', nargs='+', choices=list(GRAPH), default=None,
+                        help='run only these nodes and their dependencies')
+    parser.add_argument('--timings', default=None, help='also write the timing records to this JSON file')
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    graph = GRAPH if args.nodes is None else select_nodes(GRAPH, args.nodes)
+    start = time.perf_counter()
+    records = run_graph(graph, args.workers, data_path=args.data, output_dir=args.output_dir, dpi=args.dpi)
+    print_summary(records, time.perf_counter() - start)
+
+    if args.timings:
+        with open(args.timings, 'w', encoding='utf-8') as handle:
+            json.dump(records, handle, indent=2, default=str)
+    if any(record['status'] != 'ok' for record in records):
+        raise SystemExit(1)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+import pandas as pd
+from data_loader import load_housing_data
+from report import GRAPH, derive_node, run_graph, select_nodes, topological_order
+
+
+def _value(inputs, data_path, output_dir, dpi):
+    return dpi
+
+
+def _fail(inputs, data_path, output_dir, dpi):
+    raise RuntimeError('boom')
+
+
+def _add(inputs, data_path, output_dir, dpi):
+    return sum(inputs.values()) + 1
+
+
+class TestReportGraph(unittest.TestCase):
+    """Unit tests for the report's dependency-graph scheduler"""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_topological_order_respects_dependencies(self):
+        """Test that every node runs after the nodes it depends on"""
+        order = topological_order(GRAPH)
+        self.assertEqual(sorted(order), sorted(GRAPH))
+        for name, (_, _, deps) in GRAPH.items():
+            for dep in deps:
+                self.assertLess(order.index(dep), order.index(name))
+
+    def test_cycles_and_unknown_nodes_are_rejected(self):
+        """Test graph validation"""
+        with self.assertRaises(ValueError):
+            topological_order({'a': ('x', _value, ['b']), 'b': ('x', _value, ['a'])})
+        with self.assertRaises(ValueError):
+            topological_order({'a': ('x', _value, ['missing'])})
+
+    def test_select_nodes_pulls_in_dependencies(self):
+        """Test that selecting the regression chart also selects stats, derive and load"""
+        self.assertEqual(set(select_nodes(GRAPH, ['rent_price_regression'])),
+                         {'load', 'derive', 'stats', 'rent_price_regression'})
+
+    def test_failure_skips_only_downstream_nodes(self):
+        """Test that a failed node skips its dependents while other branches still run"""
+        graph = {
+            'root': ('load', _value, []),
+            'bad': ('stats', _fail, ['root']),
+            'after_bad': ('render', _value, ['bad']),
+            'good': ('render', _value, ['root']),
+        }
+        for workers in (1, 2):
+            records = {r['node']: r for r in run_graph(graph, workers, data_path=None,
+                                                        output_dir=self.output_dir, dpi=72)}
+            self.assertEqual(records['bad']['status'], 'failed')
+            self.assertEqual(records['after_bad']['status'], 'skipped')
+            self.assertEqual(records['good']['status'], 'ok')
+            self.assertEqual(records['good']['result'], 72)
+            self.assertGreaterEqual(records['good']['seconds'], 0)
+
+    def test_outputs_flow_along_edges(self):
+        """Test that each node receives exactly its dependencies' outputs, in and out of process"""
+        graph = {
+            'a': ('load', _value, []),
+            'b': ('stats', _add, ['a']),
+            'c': ('render', _add, ['a', 'b']),
+        }
+        for workers in (1, 2):
+            records = {r['node']: r for r in run_graph(graph, workers, data_path=None,
+                                                        output_dir=self.output_dir, dpi=72)}
+            self.assertEqual([records[name]['result'] for name in 'abc'], [72, 73, 146])
+
+    def test_yield_mismatch_warns(self):
+        """Test that a stored yield disagreeing with rent and price warns rather than failing"""
+        df = load_housing_data('data/Housing_Rent_Price_Volume.csv').copy()
+        df.loc[0, 'Gross Yield (%)'] += 1
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            derived = derive_node({'load': df}, None, self.output_dir, 72)
+        self.assertEqual(len(caught), 1)
+        self.assertIn('yield gap up to 1.0', derived.attrs['note'])
+        self.assertEqual(len(derived), len(df))
+
+    def test_statistics_branch_writes_table(self):
+        """Test the load -> derive -> stats path on the real dataset"""
+        records = run_graph(select_nodes(GRAPH, ['stats']), 1, data_path='data/Housing_Rent_Price_Volume.csv',
+                            output_dir=self.output_dir, dpi=72)
+        self.assertTrue(all(r['status'] == 'ok' for r in records))
+        self.assertEqual(records[0]['result'], f'{len(load_housing_data()):,} rows')
+        table = pd.read_csv(os.path.join(self.output_dir, 'report_statistics.csv'))
+        self.assertIn('pearson_r', table.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+from instrumentation import profile_run, stage
+from stats_engine import confidence_band, ols_from_moments, significance_stars
+
+# Same regression as rent+price_scatter_plot.py, fitted per segment
+X_COL = 'Average Monthly Rent (£)'
+Y_COL = 'Average Price (£)'
+SEGMENT_COLUMNS = ['Boroughs', 'Property Type', 'Period']
+
+
+def segment_regressions(df, segment_cols=SEGMENT_COLUMNS, x_col=X_COL, y_col=Y_COL, confidence=0.95):
+    """Fit y ~ x separately for every segment from grouped sufficient statistics
+
+    One groupby-sum pass collects n, sums, sums of squares and the cross
+    product per segment; every fit is then evaluated at once by
+    stats_engine.ols_from_moments. Values are shifted by their global means
+    before squaring to limit cancellation on large prices. Segments with
+    fewer than three observations get NaN statistics.
+    """
+    segment_cols = [c for c in segment_cols if c in df.columns]
+    data = df[segment_cols + [x_col, y_col]].dropna()
+    x_shift = data[x_col].mean()
+    y_shift = data[y_col].mean()
+    x = data[x_col].to_numpy(dtype=float) - x_shift
+    y = data[y_col].to_numpy(dtype=float) - y_shift
+
+    with stage('segment_moments', rows=len(data)):
+        moments = pd.DataFrame({'x': x, 'y': y, 'xx': x * x, 'yy': y * y, 'xy': x * y},
+                               index=data.index)
+        keys = [data[c] for c in segment_cols] if segment_cols else np.zeros(len(data), dtype=int)
+        grouped = moments.groupby(keys, observed=True, sort=True)
+        sums = grouped.sum()
+        n = grouped.size().to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = sums['x'].to_numpy() / n
+        y_mean = sums['y'].to_numpy() / n
+        sxx = sums['xx'].to_numpy() - n * x_mean ** 2
+        syy = sums['yy'].to_numpy() - n * y_mean ** 2
+        sxy = sums['xy'].to_numpy() - n * x_mean * y_mean
+    too_small = n < 3
+    sxx = np.where(too_small, np.nan, sxx)
+
+    with stage('segment_fits', rows=len(n)):
+        fit = ols_from_moments(n, x_mean + x_shift, y_mean + y_shift, sxx, syy, sxy, confidence)
+    margin = fit['t_crit'] * fit['slope_se']
+    table = sums.index.to_frame(index=False) if segment_cols else pd.DataFrame(index=range(len(n)))
+    table = table.assign(
+        n=n.astype(int),
+        slope=fit['slope'],
+        intercept=fit['intercept'],
+        slope_ci_low=fit['slope'] - margin,
+        slope_ci_high=fit['slope'] + margin,
+        r_squared=fit['r_squared'],
+        p_value=fit['p_value'],
+        significance=np.where(too_small, 'n/a', significance_stars(fit['p_value'])),
+        resid_std=fit['resid_std'],
+        t_crit=fit['t_crit'],
+        x_mean=fit['x_mean'],
+        sxx=fit['sxx'],
+    )
+    return table
+
+
+def plot_segment_grid(df, table, segment_cols=SEGMENT_COLUMNS, x_col=X_COL, y_col=Y_COL,
+                      max_panels=16, ncols=4):
+    """Small-multiple scatter plots with each segment's fit and confidence band
+
+    Panels show the ``max_panels`` largest segments with a valid fit.
+    """
+    import matplotlib.pyplot as plt
+
+    segment_cols = [c for c in segment_cols if c in df.columns]
+    shown = table[table['slope'].notna()].nlargest(max_panels, 'n')
+    nrows = max(math.ceil(len(shown) / ncols), 1)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(4 * ncols, 3.2 * nrows),
+                             sharex=True, sharey=True, squeeze=False)
+    groups = df.groupby(segment_cols, observed=True) if segment_cols else None
+
+    for ax, (_, row) in zip(axes.flat, shown.iterrows()):
+        key = tuple(row[c] for c in segment_cols)
+        points = groups.get_group(key) if groups else df
+        ax.scatter(points[x_col], points[y_col], s=12, alpha=0.5, c='steelblue', edgecolors='none')
+        x_line = np.linspace(points[x_col].min(), points[x_col].max(), 50)
+        y_line = row['slope'] * x_line + row['intercept']
+        band = confidence_band(row, x_line)
+        ax.plot(x_line, y_line, 'r--', linewidth=1.5)
+        ax.fill_between(x_line, y_line - band, y_line + band, color='red', alpha=0.2)
+        ax.set_title(' | '.join(str(k) for k in key), fontsize=9, fontweight='bold')
+        ax.text(0.03, 0.95, f"R² = {row['r_squared']:.2f} {row['significance']}\nn = {row['n']}",
+                transform=ax.transAxes, fontsize=8, va='top', family='monospace')
+        ax.grid(True, alpha=0.3)
+    for ax in list(axes.flat)[len(shown):]:
+        ax.set_visible(False)
+
+    fig.supxlabel(x_col, fontsize=12, fontweight='bold')
+    fig.supylabel(y_col, fontsize=12, fontweight='bold')
+    fig.suptitle('Rent vs Price Regression by Segment (95% CI)', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Rent vs price regression per segment')
+    parser.add_argument('source', help='property-level CSV with rent, price and segment columns')
+    parser.add_argument('--segments', nargs='+', default=SEGMENT_COLUMNS, help='segment columns')
+    parser.add_argument('-o', '--output', default='segment_regressions.csv', help='result table path')
+    parser.add_argument('--figure', default='Segment_Regressions.png', help='small-multiples image path')
+    args = parser.parse_args()
+
+    with stage('read_csv') as reading:
+        records = pd.read_csv(args.source, thousands=',')
+        reading.rows = len(records)
+    results = segment_regressions(records, args.segments)
+    results.drop(columns=['t_crit', 'x_mean', 'sxx']).to_csv(args.output, index=False)
+    print(f"Fitted {int(results['slope'].notna().sum())} of {len(results)} segments -> '{args.output}'")
+
+    with stage('plot'):
+        fig = plot_segment_grid(records, results, args.segments)
+    with stage('savefig'):
+        fig.savefig(args.figure, dpi=150)
+    print(f"Small multiples saved as '{args.figure}'")
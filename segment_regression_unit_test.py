@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend for testing
+import matplotlib.pyplot as plt
+from scipy import stats
+from segment_regression import X_COL, Y_COL, plot_segment_grid, segment_regressions
+
+
+class TestSegmentRegression(unittest.TestCase):
+    """Unit tests for grouped per-segment regression"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Synthetic property records across borough x type x period segments"""
+        rng = np.random.default_rng(11)
+        n = 6000
+        boroughs = rng.choice(['Camden', 'Hackney', 'Bexley', 'Barnet'], size=n)
+        rent = rng.uniform(900, 3500, size=n)
+        cls.records = pd.DataFrame({
+            'Boroughs': boroughs,
+            'Property Type': rng.choice(['Flat', 'House'], size=n),
+            'Period': rng.choice(['2018', '2019'], size=n),
+            X_COL: rent,
+            Y_COL: 400 * rent - 150000 + rng.normal(0, 60000, size=n),
+        })
+        # A segment too small to fit
+        cls.records.loc[n] = ['Sutton', 'Flat', '2018', 1200.0, 300000.0]
+        cls.table = segment_regressions(cls.records)
+
+    def test_matches_linregress_per_segment(self):
+        """Test every fitted segment against scipy.stats.linregress"""
+        keyed = self.table.set_index(['Boroughs', 'Property Type', 'Period'])
+        fitted = 0
+        for key, group in self.records.groupby(['Boroughs', 'Property Type', 'Period']):
+            if len(group) < 3:
+                continue
+            reg = stats.linregress(group[X_COL], group[Y_COL])
+            row = keyed.loc[key]
+            np.testing.assert_allclose(row['slope'], reg.slope, rtol=1e-8)
+            np.testing.assert_allclose(row['intercept'], reg.intercept, rtol=1e-8)
+            np.testing.assert_allclose(row['r_squared'], reg.rvalue ** 2, rtol=1e-8)
+            t = stats.t.ppf(0.975, len(group) - 2)
+            np.testing.assert_allclose(row['slope_ci_high'] - row['slope'], t * reg.stderr, rtol=1e-8)
+            fitted += 1
+        self.assertEqual(fitted, 16)
+
+    def test_small_segments_are_not_fitted(self):
+        """Test that segments with fewer than three points get no fit"""
+        row = self.table[self.table['Boroughs'] == 'Sutton'].iloc[0]
+        self.assertTrue(np.isnan(row['slope']))
+        self.assertEqual(row['significance'], 'n/a')
+
+    def test_small_multiples_render(self):
+        """Test that the small-multiple figure renders one panel per segment"""
+        fig = plot_segment_grid(self.records, self.table, max_panels=6, ncols=3)
+        visible = [ax for ax in fig.axes if ax.get_visible()]
+        plt.close(fig)
+        self.assertEqual(len(visible), 6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
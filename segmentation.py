@@ -0,0 +1,137 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from data_loader import load_housing_data
+from instrumentation import profile_run, stage
+
+
+def quantile_edges(values, k):
+    """The k - 1 interior cut points splitting ``values`` into k equal-count bins, ignoring NaN"""
+    if k < 2:
+        raise ValueError(f'Need at least 2 bins per axis, got {k}')
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).any():
+        return np.full(k - 1, np.nan)
+    return np.nanquantile(values, np.arange(1, k) / k)
+
+
+def _code_dtype(n_codes):
+    """Smallest of int32/int64 holding codes up to ``n_codes`` (and -1 for missing)"""
+    return np.int32 if n_codes <= np.iinfo(np.int32).max else np.int64
+
+
+def assign_bins(values, edges):
+    """Bin of every value, 0 .. len(edges); values equal to an edge fall in the lower bin, NaN in -1"""
+    values = np.asarray(values, dtype=float)
+    bins = np.searchsorted(edges, values, side='left').astype(_code_dtype(len(edges) + 1))
+    bins[np.isnan(values)] = -1
+    return bins
+
+
+class Segmentation:
+    """Rows assigned to a k x k grid of quantile cells over two metrics
+
+    ``x_bins`` and ``y_bins`` hold each row's bin (0 is lowest, -1 when
+    either value is missing) and ``cells`` the combined code
+    ``x_bin * k + y_bin``. ``counts[i, j]`` is the number of rows in x bin
+    ``i`` and y bin ``j``. With k = 2 and median edges these are the
+    quadrants of the elasticity plots, a value equal to the median
+    counting as low.
+    """
+
+    def __init__(self, x, y, k=2, x_edges=None, y_edges=None, x_name='x', y_name='y'):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.k = k
+        self.x_name, self.y_name = x_name, y_name
+        self.x_edges = quantile_edges(x, k) if x_edges is None else np.asarray(x_edges, dtype=float)
+        self.y_edges = quantile_edges(y, k) if y_edges is None else np.asarray(y_edges, dtype=float)
+        if len(self.x_edges) != k - 1 or len(self.y_edges) != k - 1:
+            raise ValueError(f'Expected {k - 1} edges per axis for k = {k}')
+        code_dtype = _code_dtype(k * k)
+        self.x_bins = assign_bins(x, self.x_edges).astype(code_dtype, copy=False)
+        self.y_bins = assign_bins(y, self.y_edges).astype(code_dtype, copy=False)
+        missing = (self.x_bins < 0) | (self.y_bins < 0)
+        self.cells = self.x_bins * code_dtype(k) + self.y_bins
+        self.cells[missing] = -1
+        self.x_bins[missing] = -1
+        self.y_bins[missing] = -1
+        self.counts = np.bincount(self.cells[~missing], minlength=k * k).reshape(k, k)
+        self._x, self._y = x, y
+
+    def labels(self, names):
+        """Categorical label of every row from ``names`` {(x_bin, y_bin): label}; NaN when missing
+
+        Cells without a name are labelled ``'x<i>/y<j>'``. With k = 2 the
+        keys may be booleans, (False, True) meaning low x and high y.
+        """
+        categories = [names.get((i, j), f'x{i}/y{j}') for i in range(self.k) for j in range(self.k)]
+        if len(set(categories)) == len(categories):
+            return pd.Categorical.from_codes(self.cells, categories)
+        # Several cells share a label: map cell codes onto the distinct labels
+        distinct = list(dict.fromkeys(categories))
+        lookup = np.array([distinct.index(c) for c in categories] + [-1], dtype=np.int32)
+        return pd.Categorical.from_codes(lookup[self.cells], distinct)
+
+    def members(self, x_bin, y_bin):
+        """Positions of the rows in one cell"""
+        return np.flatnonzero(self.cells == x_bin * self.k + y_bin)
+
+    def summary(self, columns=None):
+        """One row per cell: bins, value ranges, count, share and the mean of each metric
+
+        ``columns`` maps names to extra arrays aligned with the rows (a
+        DataFrame will do) to average per cell. Sums come from one weighted
+        bincount per column.
+        """
+        columns = {} if columns is None else columns
+        valid = self.cells >= 0
+        cells = self.cells[valid]
+        n_cells = self.k * self.k
+        counts = self.counts.ravel()
+        x_bounds = np.concatenate([[np.nanmin(self._x)], self.x_edges, [np.nanmax(self._x)]])
+        y_bounds = np.concatenate([[np.nanmin(self._y)], self.y_edges, [np.nanmax(self._y)]])
+        x_bin, y_bin = np.divmod(np.arange(n_cells), self.k)
+        table = {
+            'x_bin': x_bin, 'y_bin': y_bin,
+            f'{self.x_name} low': x_bounds[x_bin], f'{self.x_name} high': x_bounds[x_bin + 1],
+            f'{self.y_name} low': y_bounds[y_bin], f'{self.y_name} high': y_bounds[y_bin + 1],
+            'count': counts, 'share': counts / max(counts.sum(), 1),
+        }
+        means = {f'{self.x_name} mean': self._x, f'{self.y_name} mean': self._y}
+        means.update({f'{name} mean': values for name, values in columns.items()})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, values in means.items():
+                values = np.asarray(values, dtype=float)[valid]
+                present = ~np.isnan(values)
+                sums = np.bincount(cells[present], weights=values[present], minlength=n_cells)
+                table[name] = sums / np.bincount(cells[present], minlength=n_cells)
+        return pd.DataFrame(table)
+
+
+def segment(df, x, y, k=2, x_edges=None, y_edges=None):
+    """Segment the rows of ``df`` into k x k quantile cells of columns ``x`` and ``y``"""
+    with stage('segment', rows=len(df)):
+        return Segmentation(df[x], df[y], k, x_edges, y_edges, x_name=x, y_name=y)
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Quantile segmentation of rows over two metrics')
+    parser.add_argument('x', help='column for the x axis')
+    parser.add_argument('y', help='column for the y axis')
+    parser.add_argument('-k', type=int, default=2, help='bins per axis (default 2: median quadrants)')
+    parser.add_argument('--source', default=None,
+                        help='CSV of rows to segment, e.g. property-level records (default: the borough data)')
+    parser.add_argument('--summarize', nargs='*', default=['Gross Yield (%)'], help='columns to average per cell')
+    parser.add_argument('-o', '--output', help='write every row with its x and y bins to this CSV')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.source, thousands=',') if args.source else load_housing_data()
+    segmentation = segment(df, args.x, args.y, args.k)
+    summary = segmentation.summary(df[[c for c in args.summarize if c in df.columns]])
+    print(summary.to_string(index=False))
+    if args.output:
+        df.assign(x_bin=segmentation.x_bins, y_bin=segmentation.y_bins).to_csv(args.output, index=False)
+        print(f"Wrote {len(df)} rows to '{args.output}'")
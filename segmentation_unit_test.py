@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+from segmentation import assign_bins, quantile_edges, segment
+
+
+class TestSegmentation(unittest.TestCase):
+    """Unit tests for the quantile segmentation engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a property-level sample with a few missing values"""
+        rng = np.random.default_rng(5)
+        n = 20_000
+        cls.df = pd.DataFrame({'rent': rng.lognormal(7.5, 0.3, n), 'price': rng.lognormal(13, 0.4, n),
+                               'yield': rng.normal(4, 1, n)})
+        cls.df.loc[:9, 'price'] = np.nan
+
+    def test_quadrants_match_boolean_filters(self):
+        """Test k = 2 against median filters, with values on the median counted as low"""
+        df = pd.DataFrame({'x': [1.0, 2, 3, 4, 5], 'y': [5.0, 1, 3, 2, 4]})
+        quadrants = segment(df, 'x', 'y')
+        high_x = df['x'] > df['x'].median()
+        high_y = df['y'] > df['y'].median()
+        for i in (0, 1):
+            for j in (0, 1):
+                expected = np.flatnonzero((high_x == bool(i)) & (high_y == bool(j)))
+                np.testing.assert_array_equal(quadrants.members(i, j), expected)
+                self.assertEqual(quadrants.counts[i, j], len(expected))
+        labels = quadrants.labels({(False, True): 'Affordable', (True, False): 'Strong'})
+        self.assertEqual(list(labels), ['Affordable', 'x0/y0', 'x0/y0', 'Strong', 'x1/y1'])
+
+    def test_grid_counts_and_missing(self):
+        """Test equal-count bins per axis and that rows with a missing value are left out"""
+        grid = segment(self.df, 'rent', 'price', k=4)
+        self.assertEqual(grid.counts.shape, (4, 4))
+        self.assertEqual(grid.counts.sum(), len(self.df) - 10)
+        self.assertTrue((grid.cells[:10] == -1).all())
+        np.testing.assert_array_equal(np.bincount(grid.x_bins[grid.x_bins >= 0]), grid.counts.sum(axis=1))
+        np.testing.assert_allclose(grid.counts.sum(axis=0), (len(self.df) - 10) / 4, atol=1)
+        self.assertTrue(pd.isna(grid.labels({})[0]))
+
+    def test_fine_grid_codes_do_not_wrap(self):
+        """Test a grid with more than 32767 cells: codes stay distinct and counts stay exact"""
+        grid = segment(self.df, 'rent', 'yield', k=200)
+        valid = grid.cells >= 0
+        self.assertEqual(grid.cells.max(), 200 * 200 - 1)
+        np.testing.assert_array_equal(grid.cells[valid], grid.x_bins[valid] * 200 + grid.y_bins[valid])
+        self.assertEqual(grid.counts.sum(), len(self.df))
+        self.assertEqual(grid.counts[199, 199], len(grid.members(199, 199)))
+
+    def test_summary_matches_groupby(self):
+        """Test per-cell means and ranges against a pandas groupby"""
+        grid = segment(self.df, 'rent', 'price', k=3)
+        summary = grid.summary(self.df[['yield']]).set_index(['x_bin', 'y_bin'])
+        valid = grid.cells >= 0
+        expected = self.df[valid].groupby([grid.x_bins[valid], grid.y_bins[valid]])['yield'].mean()
+        np.testing.assert_allclose(summary['yield mean'], expected)
+        self.assertAlmostEqual(summary['share'].sum(), 1.0)
+        np.testing.assert_allclose(summary.loc[(0, 0), 'rent high'], grid.x_edges[0])
+        self.assertEqual(summary.loc[(2, 2), 'rent high'], self.df['rent'].max())
+
+    def test_edges_and_bins(self):
+        """Test quantile edges, fixed edges and validation"""
+        np.testing.assert_allclose(quantile_edges([1, 2, 3, 4, np.nan], 2), [2.5])
+        np.testing.assert_array_equal(assign_bins([1, 2.5, 3, np.nan], [2.5]), [0, 0, 1, -1])
+        fixed = segment(self.df, 'rent', 'price', k=2, x_edges=[2000], y_edges=[500000])
+        self.assertEqual(fixed.counts[1].sum(), ((self.df['rent'] > 2000) & self.df['price'].notna()).sum())
+        with self.assertRaises(ValueError):
+            quantile_edges([1, 2], 1)
+        with self.assertRaises(ValueError):
+            segment(self.df, 'rent', 'price', k=3, x_edges=[1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
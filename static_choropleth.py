@@ -0,0 +1,259 @@
+import argparse
+import hashlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from artifact_cache import cached_render
+from borough_locator import name_property
+from data_loader import DATA_PATH, load_housing_data
+from geometry_store import load_boundaries
+from heat_map_chart import COLOR_SCALE
+from instrumentation import profile_run, stage
+from panel import DEFAULT_PERIOD
+
+# Metrics drawn by default, by the short name used in file names
+METRICS = {
+    'gross_yield': 'Gross Yield (%)',
+    'rent': 'Average Monthly Rent (£)',
+    'price': 'Average Price (£)',
+    'renters': 'Counts of Rents',
+}
+
+# Boundary detail: the coarsest stored level that is sub-pixel at this web-map zoom
+STATIC_ZOOM = 11
+
+# Figure width in inches; the height follows the boroughs' projected aspect ratio
+FIGURE_WIDTH = 8.0
+
+MISSING_COLOR = 'lightgray'
+
+# Web Mercator sphere radius in metres (EPSG:3857, the interactive map's projection)
+EARTH_RADIUS = 6_378_137.0
+
+# Matplotlib path codes (matplotlib.path.Path.MOVETO, LINETO, CLOSEPOLY)
+MOVETO, LINETO, CLOSEPOLY = 1, 2, 79
+
+
+def project(lon, lat):
+    """Web Mercator x, y in metres for longitude/latitude in degrees"""
+    x = np.radians(lon) * EARTH_RADIUS
+    y = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * EARTH_RADIUS
+    return x, y
+
+
+def _signed_area(points):
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+class ProjectedBoundaries:
+    """Borough polygons projected once into flat vertex and path-code arrays
+
+    Every ring becomes MOVETO, LINETO..., CLOSEPOLY, and each feature's rings
+    are one compound path. Outer rings are wound anticlockwise and holes
+    clockwise, so matplotlib's non-zero fill leaves holes empty whatever
+    winding the source used. The arrays pickle cheaply, so worker
+    processes receive the projection instead of recomputing it.
+    """
+
+    def __init__(self, collection, name_key=None):
+        name_key = name_key or name_property(collection)
+        self.names = [feature['properties'].get(name_key) for feature in collection['features']]
+        vertices, codes, offsets = [], [], [0]
+        with stage('project_geometry') as projecting:
+            for feature in collection['features']:
+                geometry = feature.get('geometry') or {}
+                if geometry.get('type') == 'Polygon':
+                    polygons = [geometry['coordinates']]
+                elif geometry.get('type') == 'MultiPolygon':
+                    polygons = geometry['coordinates']
+                else:
+                    polygons = []
+                count = 0
+                for polygon in polygons:
+                    for i, ring in enumerate(polygon):
+                        lonlat = np.asarray(ring, dtype=float)[:, :2]
+                        if len(lonlat) < 3:
+                            continue
+                        points = np.column_stack(project(lonlat[:, 0], lonlat[:, 1]))
+                        if np.array_equal(points[0], points[-1]):
+                            points = points[:-1]
+                        if (_signed_area(points) > 0) != (i == 0):
+                            points = points[::-1]
+                        ring_codes = np.full(len(points) + 1, LINETO, dtype=np.uint8)
+                        ring_codes[0], ring_codes[-1] = MOVETO, CLOSEPOLY
+                        vertices.append(np.vstack([points, points[:1]]))
+                        codes.append(ring_codes)
+                        count += len(ring_codes)
+                offsets.append(offsets[-1] + count)
+            self.vertices = np.vstack(vertices) if vertices else np.empty((0, 2))
+            self.codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.uint8)
+            self.offsets = np.asarray(offsets, dtype=np.int64)
+            projecting.rows = len(self.vertices)
+        if not len(self.vertices):
+            raise ValueError('No polygon rings in the boundary collection')
+        self.bounds = (*self.vertices.min(axis=0), *self.vertices.max(axis=0))
+        self.digest = hashlib.sha256(self.vertices.tobytes() + self.codes.tobytes() + self.offsets.tobytes()
+                                     + '\0'.join(map(str, self.names)).encode('utf-8')).hexdigest()
+
+    def paths(self):
+        """One matplotlib compound Path per feature"""
+        from matplotlib.path import Path
+
+        return [Path(self.vertices[start:stop], self.codes[start:stop])
+                for start, stop in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def align(self, frame, column):
+        """Values of ``column`` in feature order, NaN for boroughs missing from ``frame``"""
+        values = frame.drop_duplicates('Boroughs').set_index('Boroughs')[column].astype(float)
+        return values.reindex(self.names).to_numpy()
+
+
+class ChoroplethCanvas:
+    """A figure holding every borough patch, recoloured and saved once per map
+
+    The patches, axes limits and colour bar are built once per process;
+    each map only swaps the colour values, scale and titles.
+    """
+
+    def __init__(self, boundaries, width=FIGURE_WIDTH):
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PathCollection
+        from matplotlib.colors import LinearSegmentedColormap
+
+        xmin, ymin, xmax, ymax = boundaries.bounds
+        height = width * (ymax - ymin) / (xmax - xmin) + 1.0
+        self.figure, self.ax = plt.subplots(figsize=(width + 1.2, height))
+        cmap = LinearSegmentedColormap.from_list('borough_scale', COLOR_SCALE).with_extremes(bad=MISSING_COLOR)
+        self.patches = PathCollection(boundaries.paths(), cmap=cmap, edgecolor='white', linewidth=0.6)
+        self.patches.set_array(np.ma.masked_invalid(np.zeros(len(boundaries.names))))
+        self.ax.add_collection(self.patches)
+        self.ax.set_xlim(xmin, xmax)
+        self.ax.set_ylim(ymin, ymax)
+        self.ax.set_aspect('equal')
+        self.ax.set_axis_off()
+        self.colorbar = self.figure.colorbar(self.patches, ax=self.ax, shrink=0.7)
+
+    def draw(self, values, vmin, vmax, title, label):
+        """Recolour the boroughs for one map"""
+        self.patches.set_array(np.ma.masked_invalid(values))
+        self.patches.set_clim(vmin, vmax)
+        self.colorbar.set_label(label, fontsize=10, fontweight='bold')
+        self.ax.set_title(title, fontsize=13, fontweight='bold')
+
+
+# Per-process state set by _init_worker: the shared projection and its canvas
+_worker = {}
+
+
+def _init_worker(boundaries, width):
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker.clear()
+    _worker.update(boundaries=boundaries, width=width)
+
+
+def _render_job(job):
+    """Draw and save one map in a worker; served from the artifact cache when unchanged"""
+    if 'canvas' not in _worker:
+        _worker['canvas'] = ChoroplethCanvas(_worker['boundaries'], _worker['width'])
+    canvas = _worker['canvas']
+
+    def render(path):
+        canvas.draw(job['values'], job['vmin'], job['vmax'], job['title'], job['label'])
+        with stage('savefig'):
+            canvas.figure.savefig(path, dpi=job['dpi'], format=job['format'])
+
+    params = {key: job[key] for key in ('title', 'label', 'vmin', 'vmax', 'dpi', 'format')}
+    params.update(values=[None if np.isnan(v) else float(v) for v in job['values']],
+                  geometry=_worker['boundaries'].digest, width=_worker['width'])
+    cached_render(job['path'], render, params=params, code=[__file__])
+    return job['path']
+
+
+def choropleth_jobs(df, boundaries, output_dir, metrics=None, periods=None, formats=('png',), dpi=150,
+                    shared_scale=True):
+    """One job per (metric, period, format), with values already aligned to the features
+
+    With ``shared_scale`` a metric's colour range spans all selected periods,
+    so the same colour means the same value in every year.
+    """
+    if 'Period' not in df.columns:
+        df = df.assign(Period=DEFAULT_PERIOD)
+    df = df.assign(Period=df['Period'].astype(str))
+    periods = sorted(df['Period'].unique()) if periods is None else [str(p) for p in periods]
+    metrics = [m for m in METRICS if METRICS[m] in df.columns] if metrics is None else list(metrics)
+    frames = {period: df[df['Period'] == period] for period in periods}
+
+    jobs = []
+    for metric in metrics:
+        column = METRICS.get(metric, metric)
+        values = {period: boundaries.align(frame, column) for period, frame in frames.items()}
+        pooled = np.concatenate(list(values.values()))
+        for period in periods:
+            scale = pooled if shared_scale else values[period]
+            finite = scale[np.isfinite(scale)]
+            vmin, vmax = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+            slug = metric if metric in METRICS else column.split(' (')[0].strip().lower().replace(' ', '_')
+            for fmt in formats:
+                jobs.append({
+                    'path': os.path.join(output_dir, f'choropleth_{slug}_{period}.{fmt}'),
+                    'values': values[period], 'vmin': vmin, 'vmax': vmax,
+                    'title': f'{column} by London Borough, {period}', 'label': column,
+                    'dpi': dpi, 'format': fmt,
+                })
+    return jobs
+
+
+def render_choropleths(df, output_dir='choropleths', metrics=None, periods=None, formats=('png',), dpi=150,
+                       workers=None, boundaries=None, shared_scale=True, width=FIGURE_WIDTH):
+    """Render static choropleths for every metric x period x format straight to files
+
+    The boundaries are projected once here and sent to each worker once;
+    every worker builds one canvas and recolours it for each of its maps.
+    Returns the output paths in job order.
+    """
+    if boundaries is None:
+        boundaries = ProjectedBoundaries(load_boundaries(zoom=STATIC_ZOOM))
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = choropleth_jobs(df, boundaries, output_dir, metrics, periods, formats, dpi, shared_scale)
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) if jobs else 1
+    if workers <= 1:
+        _init_worker(boundaries, width)
+        try:
+            return [_render_job(job) for job in jobs]
+        finally:
+            _close_canvas()
+    chunksize = max(math.ceil(len(jobs) / (workers * 4)), 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(boundaries, width)) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+
+def _close_canvas():
+    canvas = _worker.pop('canvas', None)
+    if canvas is not None:
+        import matplotlib.pyplot as plt
+        plt.close(canvas.figure)
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Static PNG/SVG borough choropleths for many metrics and periods')
+    parser.add_argument('--data', default=DATA_PATH, help="borough metrics CSV, optionally with a 'Period' column")
+    parser.add_argument('--output-dir', default='choropleths', help='directory for the maps')
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help=f'short names ({", ".join(METRICS)}) or column names; default: all present')
+    parser.add_argument('--periods', nargs='+', default=None, help='periods to draw (default: all)')
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--dpi', type=int, default=150, help='resolution of raster maps')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--per-period-scale', action='store_true',
+                        help="scale colours to each period's own range instead of across periods")
+    args = parser.parse_args()
+
+    paths = render_choropleths(load_housing_data(args.data), args.output_dir, args.metrics, args.periods,
+                               args.formats, args.dpi, args.workers, shared_scale=not args.per_period_scale)
+    print(f"Rendered {len(paths)} maps to '{args.output_dir}'")
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from artifact_cache import DISABLE_ENV
+from static_choropleth import (CLOSEPOLY, MISSING_COLOR, MOVETO, ChoroplethCanvas, ProjectedBoundaries,
+                               _signed_area, choropleth_jobs, project, render_choropleths)
+
+
+def square(x0, y0, size, clockwise=False):
+    ring = [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+    return ring[::-1] if clockwise else ring
+
+
+def collection():
+    """Two boroughs: one with a hole wound the wrong way round, one multipolygon"""
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'name': 'Camden'},
+         'geometry': {'type': 'Polygon', 'coordinates': [square(-0.2, 51.5, 0.1, clockwise=True),
+                                                         square(-0.17, 51.53, 0.03)]}},
+        {'type': 'Feature', 'properties': {'name': 'Hackney'},
+         'geometry': {'type': 'MultiPolygon', 'coordinates': [[square(-0.05, 51.5, 0.05)],
+                                                              [square(0.02, 51.5, 0.03)]]}},
+    ]}
+
+
+class TestStaticChoropleth(unittest.TestCase):
+    """Unit tests for the headless batch choropleth renderer"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.boundaries = ProjectedBoundaries(collection())
+        self.df = pd.DataFrame({'Boroughs': ['Camden', 'Hackney', 'Camden', 'Hackney'],
+                                'Period': ['2017', '2017', '2018', '2018'],
+                                'Gross Yield (%)': [3.0, 4.0, 3.5, 5.0],
+                                'Average Price (£)': [800000.0, 600000.0, 820000.0, 610000.0]})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        plt.close('all')
+
+    def test_projection_is_web_mercator(self):
+        """Test the projection against known EPSG:3857 coordinates"""
+        x, y = project(np.array([0.0, 1.0, -0.1278]), np.array([0.0, 0.0, 51.5074]))
+        np.testing.assert_allclose(x[:2], [0.0, 111319.49079], atol=1e-4)
+        np.testing.assert_allclose(y[:2], [0.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose([x[2], y[2]], [-14226.63, 6711542.47], atol=0.5)
+
+    def test_rings_are_oriented_and_grouped_per_feature(self):
+        """Test outer rings anticlockwise, holes clockwise, and one compound path per feature"""
+        b = self.boundaries
+        self.assertEqual(b.names, ['Camden', 'Hackney'])
+        self.assertEqual(list(np.diff(b.offsets)), [10, 10])
+        starts = np.flatnonzero(b.codes == MOVETO)
+        stops = np.flatnonzero(b.codes == CLOSEPOLY)
+        areas = [_signed_area(b.vertices[s:e]) for s, e in zip(starts, stops)]
+        self.assertGreater(areas[0], 0)
+        self.assertLess(areas[1], 0)
+        self.assertTrue(all(area > 0 for area in areas[2:]))
+        self.assertEqual(len(b.paths()), 2)
+
+    def test_values_follow_feature_order(self):
+        """Test that values are aligned to features, with NaN for boroughs without data"""
+        frame = pd.DataFrame({'Boroughs': ['Hackney', 'Islington'], 'Gross Yield (%)': [4.0, 3.0]})
+        np.testing.assert_array_equal(self.boundaries.align(frame, 'Gross Yield (%)'), [np.nan, 4.0])
+
+    def test_jobs_share_a_scale_across_periods(self):
+        """Test one job per metric x period x format, with shared or per-period colour ranges"""
+        jobs = choropleth_jobs(self.df, self.boundaries, self.tmpdir, formats=('png', 'svg'))
+        self.assertEqual(len(jobs), 2 * 2 * 2)
+        names = {os.path.basename(job['path']) for job in jobs}
+        self.assertIn('choropleth_gross_yield_2017.svg', names)
+        self.assertIn('choropleth_price_2018.png', names)
+        yields = [job for job in jobs if 'gross_yield' in job['path']]
+        self.assertTrue(all((job['vmin'], job['vmax']) == (3.0, 5.0) for job in yields))
+        own = choropleth_jobs(self.df, self.boundaries, self.tmpdir, ['gross_yield'], ['2017'], shared_scale=False)
+        self.assertEqual((own[0]['vmin'], own[0]['vmax']), (3.0, 4.0))
+
+    def test_missing_boroughs_are_grey(self):
+        """Test that a borough without a value is drawn in the missing-data colour"""
+        canvas = ChoroplethCanvas(self.boundaries)
+        canvas.draw(np.array([np.nan, 4.0]), 3.0, 5.0, 'title', 'label')
+        canvas.figure.canvas.draw()
+        colors = canvas.patches.get_facecolors()
+        np.testing.assert_allclose(colors[0], to_rgba(MISSING_COLOR))
+        self.assertFalse(np.allclose(colors[1], to_rgba(MISSING_COLOR)))
+
+    def test_batch_writes_every_map(self):
+        """Test sequential and parallel batches write the same PNG and SVG files"""
+        with mock.patch.dict(os.environ, {DISABLE_ENV: '1'}):
+            for workers in (1, 2):
+                output_dir = os.path.join(self.tmpdir, f'maps{workers}')
+                paths = render_choropleths(self.df, output_dir, metrics=['gross_yield'], formats=('png', 'svg'),
+                                           dpi=40, workers=workers, boundaries=self.boundaries)
+                self.assertEqual(len(paths), 4)
+                self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+        with open(os.path.join(self.tmpdir, 'maps2', 'choropleth_gross_yield_2018.svg'), encoding='utf-8') as f:
+            self.assertIn('<path', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from scipy import stats
+from data_loader import load_housing_data
+from stats_engine import confidence_band, pairwise_stats, regression_row, significance_stars
+
+
+class TestStatsEngine(unittest.TestCase):
+    """Unit tests for the batched correlation and regression engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Compute the full pairwise table once"""
+        cls.df = load_housing_data()
+        cls.columns = ['Average Monthly Rent (£)', 'Counts of Rents', 'Average Price (£)',
+                       'Average Sales Volume ', 'Gross Yield (%)']
+        cls.table = pairwise_stats(cls.df, cls.columns)
+
+    def test_every_ordered_pair_present(self):
+        """Test that the table has one row per ordered column pair"""
+        k = len(self.columns)
+        self.assertEqual(len(self.table), k * (k - 1))
+
+    def test_matches_scipy(self):
+        """Test every pair against pearsonr, spearmanr and linregress"""
+        for _, row in self.table.iterrows():
+            x, y = self.df[row['x']], self.df[row['y']]
+            reg = stats.linregress(x, y)
+            spearman = stats.spearmanr(x, y)
+            np.testing.assert_allclose(row['slope'], reg.slope, rtol=1e-9)
+            np.testing.assert_allclose(row['intercept'], reg.intercept, rtol=1e-9, atol=1e-9)
+            np.testing.assert_allclose(row['pearson_r'], reg.rvalue, rtol=1e-9)
+            np.testing.assert_allclose(row['p_value'], reg.pvalue, rtol=1e-6)
+            np.testing.assert_allclose(row['slope_se'], reg.stderr, rtol=1e-9)
+            np.testing.assert_allclose(row['intercept_se'], reg.intercept_stderr, rtol=1e-9)
+            np.testing.assert_allclose(row['spearman_r'], spearman.statistic, rtol=1e-9)
+            np.testing.assert_allclose(row['spearman_p'], spearman.pvalue, rtol=1e-6)
+
+    def test_confidence_band_narrowest_at_mean(self):
+        """Test that the band is symmetric about and narrowest at the mean of x"""
+        row = regression_row(self.table, 'Average Monthly Rent (£)', 'Average Price (£)')
+        mean = row['x_mean']
+        widths = confidence_band(row, [mean - 100, mean, mean + 100])
+        self.assertLess(widths[1], widths[0])
+        np.testing.assert_allclose(widths[0], widths[2])
+
+    def test_significance_stars(self):
+        """Test significance markers for scalars and arrays"""
+        self.assertEqual(significance_stars(0.0005), '***')
+        self.assertEqual(significance_stars(np.array([0.005, 0.02, 0.5])).tolist(), ['**', '*', 'ns'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
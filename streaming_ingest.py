@@ -0,0 +1,127 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from instrumentation import profile_run, traced
+
+# Column names expected in transaction-level extracts
+BOROUGH_COL = 'Borough'
+TYPE_COL = 'Type'
+AMOUNT_COL = 'Amount (£)'
+DATE_COL = 'Date'
+
+# Record types: rent amounts are monthly rents, sale amounts are sale prices
+RENT_TYPE = 'rent'
+SALE_TYPE = 'sale'
+
+# Rows per chunk; memory use is bounded by this, not by the file size
+DEFAULT_CHUNKSIZE = 500_000
+
+# Output columns, in the same order as data/Housing_Rent_Price_Volume.csv
+OUTPUT_COLUMNS = [
+    'Boroughs',
+    'Average Monthly Rent (£)',
+    'Counts of Rents',
+    'Average Yearly Rent (£)',
+    'Average Price (£)',
+    'Average Sales Volume ',
+    'Gross Yield (%)',
+]
+
+
+class BoroughAccumulator:
+    """Running per-borough sums and counts fed one chunk at a time"""
+
+    def __init__(self):
+        self.rent_sum = pd.Series(dtype=float)
+        self.rent_count = pd.Series(dtype=float)
+        self.price_sum = pd.Series(dtype=float)
+        self.sale_count = pd.Series(dtype=float)
+        self.months = set()
+
+    def update(self, chunk, borough_col=BOROUGH_COL, type_col=TYPE_COL,
+               amount_col=AMOUNT_COL, date_col=DATE_COL):
+        """Fold one chunk of raw records into the running aggregates"""
+        kind = chunk[type_col].astype(str).str.strip().str.lower()
+        amount = pd.to_numeric(chunk[amount_col], errors='coerce')
+        valid = amount.notna() & chunk[borough_col].notna()
+
+        rents = valid & (kind == RENT_TYPE)
+        sales = valid & (kind == SALE_TYPE)
+
+        rent_groups = amount[rents].groupby(chunk.loc[rents, borough_col])
+        sale_groups = amount[sales].groupby(chunk.loc[sales, borough_col])
+        self.rent_sum = self.rent_sum.add(rent_groups.sum(), fill_value=0)
+        self.rent_count = self.rent_count.add(rent_groups.count(), fill_value=0)
+        self.price_sum = self.price_sum.add(sale_groups.sum(), fill_value=0)
+        self.sale_count = self.sale_count.add(sale_groups.count(), fill_value=0)
+
+        # Distinct months observed, used to turn sale counts into a monthly average
+        if date_col in chunk.columns:
+            periods = pd.to_datetime(chunk.loc[valid, date_col], errors='coerce').dt.to_period('M')
+            self.months.update(periods.dropna().unique())
+
+    def result(self):
+        """Return the borough metrics in the layout the plotting scripts read"""
+        boroughs = self.rent_sum.index.union(self.price_sum.index)
+        rent_sum = self.rent_sum.reindex(boroughs, fill_value=0)
+        rent_count = self.rent_count.reindex(boroughs, fill_value=0)
+        price_sum = self.price_sum.reindex(boroughs, fill_value=0)
+        sale_count = self.sale_count.reindex(boroughs, fill_value=0)
+        n_months = max(len(self.months), 1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            monthly_rent = rent_sum / rent_count.replace(0, np.nan)
+            avg_price = price_sum / sale_count.replace(0, np.nan)
+            yearly_rent = monthly_rent * 12
+            gross_yield = yearly_rent / avg_price * 100
+
+        return pd.DataFrame({
+            'Boroughs': boroughs.astype(str),
+            'Average Monthly Rent (£)': monthly_rent.to_numpy(),
+            'Counts of Rents': rent_count.to_numpy(dtype=float),
+            'Average Yearly Rent (£)': yearly_rent.to_numpy(),
+            'Average Price (£)': avg_price.to_numpy(),
+            'Average Sales Volume ': (sale_count / n_months).to_numpy(),
+            'Gross Yield (%)': gross_yield.to_numpy(),
+        }, columns=OUTPUT_COLUMNS)
+
+
+def aggregate_chunks(chunks, **columns):
+    """Aggregate an iterable of raw-record DataFrames into borough metrics"""
+    accumulator = BoroughAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk, **columns)
+    return accumulator.result()
+
+
+@traced('stream_borough_metrics')
+def stream_borough_metrics(path, chunksize=DEFAULT_CHUNKSIZE, borough_col=BOROUGH_COL,
+                           type_col=TYPE_COL, amount_col=AMOUNT_COL, date_col=DATE_COL):
+    """Read a transaction extract in bounded chunks and build borough metrics
+
+    The returned frame has the same columns and dtypes as
+    data_loader.load_housing_data(), so it can be passed straight to the
+    plotting code.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in (borough_col, type_col, amount_col, date_col) if c in header]
+    chunks = pd.read_csv(path, usecols=usecols, chunksize=chunksize, thousands=',',
+                         dtype={borough_col: str, type_col: str})
+    return aggregate_chunks(chunks, borough_col=borough_col, type_col=type_col,
+                            amount_col=amount_col, date_col=date_col)
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Aggregate raw rent and sale records into borough metrics')
+    parser.add_argument('source', help='CSV of transaction-level rent and sale records')
+    parser.add_argument('-o', '--output', required=True,
+                        help='where to write the aggregated borough table')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='rows read per chunk')
+    args = parser.parse_args()
+
+    metrics = stream_borough_metrics(args.source, chunksize=args.chunksize)
+    metrics.to_csv(args.output, index=False)
+    print(f"Wrote {len(metrics)} boroughs to '{args.output}'")
@@ -0,0 +1,56 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from streaming_ingest import OUTPUT_COLUMNS, aggregate_chunks, stream_borough_metrics
+
+
+class TestStreamingIngest(unittest.TestCase):
+    """Unit tests for chunked aggregation of transaction-level records"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a small random transaction extract"""
+        rng = np.random.default_rng(7)
+        n = 5000
+        cls.records = pd.DataFrame({
+            'Borough': rng.choice(['Camden', 'Hackney', 'Bexley'], size=n),
+            'Type': rng.choice(['rent', 'sale', 'Sale '], size=n),
+            'Amount (£)': rng.uniform(800, 900000, size=n).round(),
+            'Date': pd.to_datetime('2018-01-01') + pd.to_timedelta(rng.integers(0, 365, size=n), unit='D'),
+        })
+
+    def test_chunked_matches_single_pass(self):
+        """Test that chunk size does not change the aggregated result"""
+        whole = aggregate_chunks([self.records])
+        chunks = (self.records.iloc[i:i + 333] for i in range(0, len(self.records), 333))
+        chunked = aggregate_chunks(chunks)
+        pd.testing.assert_frame_equal(whole, chunked)
+
+    def test_metrics_match_groupby(self):
+        """Test the running aggregates against a direct groupby"""
+        result = aggregate_chunks([self.records]).set_index('Boroughs')
+        kind = self.records['Type'].str.strip().str.lower()
+        rents = self.records[kind == 'rent'].groupby('Borough')['Amount (£)']
+        sales = self.records[kind == 'sale'].groupby('Borough')['Amount (£)']
+        np.testing.assert_allclose(result['Average Monthly Rent (£)'], rents.mean().reindex(result.index))
+        np.testing.assert_allclose(result['Counts of Rents'], rents.count().reindex(result.index))
+        np.testing.assert_allclose(result['Average Price (£)'], sales.mean().reindex(result.index))
+        np.testing.assert_allclose(result['Average Sales Volume '], sales.count().reindex(result.index) / 12)
+        expected_yield = rents.mean() * 12 / sales.mean() * 100
+        np.testing.assert_allclose(result['Gross Yield (%)'], expected_yield.reindex(result.index))
+
+    def test_stream_from_csv(self):
+        """Test that streaming from a file yields the plotting columns"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'records.csv')
+            self.records.to_csv(path, index=False)
+            result = stream_borough_metrics(path, chunksize=1000)
+        self.assertEqual(list(result.columns), OUTPUT_COLUMNS)
+        self.assertEqual(len(result), 3)
+        self.assertTrue(pd.api.types.is_numeric_dtype(result['Average Price (£)']))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from data_loader import DATA_PATH, read_housing_csv
+from instrumentation import profile_run, stage
+
+# Rows generated per block when writing large files, to keep memory bounded
+WRITE_BLOCK = 1_000_000
+
+CSV_COLUMNS = [
+    'Boroughs',
+    'Average Monthly Rent (£)',
+    'Counts of Rents',
+    'Average Yearly Rent (£)',
+    'Average Price (£)',
+    'Average Sales Volume ',
+    'Gross Yield (%)',
+]
+
+
+def generate_housing_data(n_rows, seed=0, template=None, start=0):
+    """Synthetic areas shaped like Housing_Rent_Price_Volume.csv
+
+    Each row perturbs a randomly chosen real borough: rent and yield get
+    log-normal noise, price is derived from them so the rent/price/yield
+    identity still holds, and counts get Poisson noise. Area names are the
+    template borough plus a running number, so they stay unique across
+    blocks when ``start`` is advanced.
+    """
+    if template is None:
+        template = read_housing_csv(DATA_PATH)
+    rng = np.random.default_rng(seed)
+    pick = rng.integers(0, len(template), size=n_rows)
+    base = template.iloc[pick]
+
+    rent = np.round(base['Average Monthly Rent (£)'].to_numpy() * rng.lognormal(0, 0.15, n_rows))
+    gross_yield = base['Gross Yield (%)'].to_numpy() * rng.lognormal(0, 0.08, n_rows)
+    price = np.round(rent * 12 / (gross_yield / 100))
+    counts = rng.poisson(base['Counts of Rents'].to_numpy())
+    sales = rng.poisson(base['Average Sales Volume '].to_numpy())
+    names = base['Boroughs'].to_numpy(dtype=str)
+    ids = np.arange(start, start + n_rows).astype(str)
+
+    return pd.DataFrame({
+        'Boroughs': np.char.add(np.char.add(names, ' '), np.char.zfill(ids, 7)),
+        'Average Monthly Rent (£)': rent.astype(np.int64),
+        'Counts of Rents': counts.astype(float),
+        'Average Yearly Rent (£)': (rent * 12).astype(np.int64),
+        'Average Price (£)': price,
+        'Average Sales Volume ': sales.astype(np.int64),
+        'Gross Yield (%)': np.round(rent * 12 / price * 100, 2),
+    }, columns=CSV_COLUMNS)
+
+
+def write_synthetic_csv(path, n_rows, seed=0, block=WRITE_BLOCK):
+    """Write ``n_rows`` synthetic rows in the CSV's text format, block by block
+
+    Price and rent counts are written comma-formatted, as in the source
+    file, so the loader's cleaning path is exercised.
+    """
+    template = read_housing_csv(DATA_PATH)
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        for i, start in enumerate(range(0, n_rows, block)):
+            with stage('generate_block', rows=min(block, n_rows - start)):
+                df = generate_housing_data(min(block, n_rows - start), seed + i, template, start)
+            with stage('write_block', rows=len(df)):
+                df['Average Price (£)'] = df['Average Price (£)'].map('{:,.0f}'.format)
+                df['Counts of Rents'] = df['Counts of Rents'].map('{:,.0f}'.format)
+                df.to_csv(handle, index=False, header=(start == 0))
+    return path
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Generate synthetic London housing data')
+    parser.add_argument('rows', type=int, help='number of areas to generate')
+    parser.add_argument('-o', '--output', required=True, help='CSV path to write')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_synthetic_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} synthetic rows to '{args.output}'")
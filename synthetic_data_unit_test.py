@@ -0,0 +1,36 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from data_loader import read_housing_csv
+from synthetic_data import CSV_COLUMNS, generate_housing_data, write_synthetic_csv
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Unit tests for the synthetic London dataset generator"""
+
+    def test_generated_frame_shape(self):
+        """Test that generated rows have the CSV's columns and unique names"""
+        df = generate_housing_data(5000, seed=1)
+        self.assertEqual(list(df.columns), CSV_COLUMNS)
+        self.assertEqual(len(df), 5000)
+        self.assertTrue(df['Boroughs'].is_unique)
+
+    def test_yield_identity_holds(self):
+        """Test that gross yield is consistent with rent and price"""
+        df = generate_housing_data(2000, seed=2)
+        implied = df['Average Yearly Rent (£)'] / df['Average Price (£)'] * 100
+        np.testing.assert_allclose(df['Gross Yield (%)'], implied, atol=0.01)
+
+    def test_written_csv_round_trips_through_loader(self):
+        """Test that the comma-formatted CSV parses with the shared loader"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = write_synthetic_csv(os.path.join(tmpdir, 'synthetic.csv'), 2500, block=1000)
+            df = read_housing_csv(path)
+        self.assertEqual(len(df), 2500)
+        self.assertTrue(df['Boroughs'].is_unique)
+        self.assertEqual(df['Average Price (£)'].dtype, np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,38 +1,207 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# Load data
-df = pd.read_csv('data/Housing_Rent_Price_Volume.csv')
-
-# Prepare data
-plot_df = df[['Boroughs', 'Gross Yield (%)']].copy()
-plot_df['Gross Yield (%)'] = plot_df['Gross Yield (%)'].astype(float)
-plot_df = plot_df.sort_values('Gross Yield (%)', ascending=False)
-
-# Style
-plt.style.use('seaborn-v0_8-whitegrid')
-fig, ax = plt.subplots(figsize=(10, 12))
-
-# Bar chart
-bars = ax.barh(plot_df['Boroughs'], plot_df['Gross Yield (%)'], color='#4C72B0', alpha=0.8)
-ax.invert_yaxis()  # Highest at top
-
-# Annotate values
-for bar, val in zip(bars, plot_df['Gross Yield (%)']):
-    ax.text(val + 0.05, bar.get_y() + bar.get_height()/2, f'{val:.2f}%',
-            va='center', ha='left', fontsize=9)
-
-# Labels and title
-ax.set_xlabel('Gross Rental Yield (%)', fontsize=12, fontweight='bold')
-ax.set_ylabel('London Borough', fontsize=12, fontweight='bold')
-ax.set_title('Gross Rental Yield Ranking Across London Boroughs', fontsize=14, fontweight='bold', pad=12)
-
-# Clean look
-ax.spines['right'].set_visible(False)
-ax.spines['top'].set_visible(False)
-ax.grid(axis='x', alpha=0.2, linestyle='--')
-plt.tight_layout()
-
-# Save figure
-plt.savefig('Appendix_Figure_Yield_Ranking.png', dpi=300)
-plt.show()
+from artifact_cache import cached_render
+from data_loader import load_housing_data
+from instrumentation import profile_run, stage
+
+YIELD_COL = 'Gross Yield (%)'
+OUTPUT_PATH = 'Appendix_Figure_Yield_Ranking.png'
+
+# Above this many areas the default chart switches to top/bottom-k with tail bands
+FULL_RANKING_LIMIT = 60
+
+BAR_COLOR = '#4C72B0'
+BAND_COLOR = '#9AA5B1'
+
+# Axis label when the ranked rows may be finer than boroughs (wards, postcodes, ...)
+AREA_LABEL = 'Area'
+
+
+def rank_extremes(df, k, column=YIELD_COL):
+    """Return (top, bottom, rest) using a partial sort, so cost grows with k
+
+    ``top`` and ``bottom`` are both sorted by descending yield, so the
+    lowest area comes last; ``rest`` holds every other row, unsorted.
+    """
+    values = df[column].to_numpy(dtype=float)
+    n = len(values)
+    k = min(k, n // 2)
+    if k == 0:
+        return df.iloc[:0], df.iloc[:0], df
+    top_idx = np.argpartition(-values, k - 1)[:k]
+    top_idx = top_idx[np.argsort(-values[top_idx], kind='stable')]
+    bottom_idx = np.argpartition(values, k - 1)[:k]
+    bottom_idx = bottom_idx[np.argsort(-values[bottom_idx], kind='stable')]
+    mask = np.ones(n, dtype=bool)
+    mask[top_idx] = False
+    mask[bottom_idx] = False
+    return df.iloc[top_idx], df.iloc[bottom_idx], df.iloc[np.flatnonzero(mask)]
+
+
+def tail_bands(rest, n_bands=5, column=YIELD_COL):
+    """Summarise the unranked middle into equal-count yield bands, highest first
+
+    Only the band edges are placed, with one multi-point partition, so the
+    middle is never fully sorted.
+    """
+    if rest.empty:
+        return pd.DataFrame(columns=['label', 'count', 'mean', 'min', 'max'])
+    values = rest[column].to_numpy(dtype=float)
+    n = len(values)
+    n_bands = min(n_bands, n)
+    # Same band sizes as np.array_split over the descending values, larger bands first
+    sizes = np.full(n_bands, n // n_bands)
+    sizes[:n % n_bands] += 1
+    ends = n - np.cumsum(sizes)  # ascending start of each band, highest band first
+    values = np.partition(values, ends[:-1]) if n_bands > 1 else values
+    bands = []
+    for start, size in zip(ends, sizes):
+        chunk = values[start:start + size]
+        low, high = chunk.min(), chunk.max()
+        bands.append({
+            'label': f'{low:.2f}–{high:.2f}% ({size:,} areas)',
+            'count': int(size),
+            'mean': chunk.mean(),
+            'min': low,
+            'max': high,
+        })
+    return pd.DataFrame(bands)
+
+
+def plot_ranking(labels, values, title, colors=None, figsize=None, ylabel='London Borough'):
+    """Horizontal ranked bar chart in the appendix style, highest at top; ``ylabel`` names what is ranked"""
+    import matplotlib.pyplot as plt
+
+    plt.style.use('seaborn-v0_8-whitegrid')
+    if figsize is None:
+        figsize = (10, max(4, 0.35 * len(labels) + 1.5))
+    fig, ax = plt.subplots(figsize=figsize)
+
+    # Bar chart
+    positions = np.arange(len(labels))
+    bars = ax.barh(positions, values, color=colors if colors is not None else BAR_COLOR, alpha=0.8)
+    ax.set_yticks(positions)
+    ax.set_yticklabels(labels)
+    ax.invert_yaxis()  # Highest at top
+
+    # Annotate values
+    for bar, val in zip(bars, values):
+        ax.text(val + 0.05, bar.get_y() + bar.get_height()/2, f'{val:.2f}%',
+                va='center', ha='left', fontsize=9)
+
+    # Labels and title
+    ax.set_xlabel('Gross Rental Yield (%)', fontsize=12, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=12)
+
+    # Clean look
+    ax.spines['right'].set_visible(False)
+    ax.spines['top'].set_visible(False)
+    ax.grid(axis='x', alpha=0.2, linestyle='--')
+    plt.tight_layout()
+    return fig
+
+
+def plot_full_ranking(df):
+    """The original chart: every area, sorted by yield"""
+    plot_df = df[['Boroughs', YIELD_COL]].copy()
+    plot_df[YIELD_COL] = plot_df[YIELD_COL].astype(float)
+    plot_df = plot_df.sort_values(YIELD_COL, ascending=False)
+    return plot_ranking(plot_df['Boroughs'].tolist(), plot_df[YIELD_COL].to_numpy(),
+                        'Gross Rental Yield Ranking Across London Boroughs', figsize=(10, 12))
+
+
+def plot_top_bottom(df, k=15, n_bands=5):
+    """Top and bottom k areas with the middle grouped into summary bands (shown as band means)"""
+    top, bottom, rest = rank_extremes(df, k)
+    bands = tail_bands(rest, n_bands)
+    labels = top['Boroughs'].tolist() + bands['label'].tolist() + bottom['Boroughs'].tolist()
+    values = np.concatenate([top[YIELD_COL].to_numpy(dtype=float), bands['mean'].to_numpy(dtype=float),
+                             bottom[YIELD_COL].to_numpy(dtype=float)])
+    colors = [BAR_COLOR] * len(top) + [BAND_COLOR] * len(bands) + [BAR_COLOR] * len(bottom)
+    return plot_ranking(labels, values,
+                        f'Gross Rental Yield: Top and Bottom {len(top)} of {len(df):,} Areas',
+                        colors=colors, ylabel=AREA_LABEL)
+
+
+def save_ranking(df, output_path=OUTPUT_PATH, top_k=None, n_bands=5, dpi=300):
+    """Save the default chart, served from the artifact cache when nothing changed
+
+    Returns the figure when it was drawn, or None on a cache hit.
+    """
+    drawn = []
+
+    def render(path):
+        if top_k is None and len(df) <= FULL_RANKING_LIMIT:
+            fig = plot_full_ranking(df)
+        else:
+            fig = plot_top_bottom(df, top_k or 15, n_bands)
+        with stage('savefig'):
+            fig.savefig(path, dpi=dpi)
+        drawn.append(fig)
+
+    cached_render(output_path, render, df, ['Boroughs', YIELD_COL],
+                  params={'top_k': top_k, 'bands': n_bands, 'dpi': dpi}, code=[__file__])
+    return drawn[0] if drawn else None
+
+
+def render_page(page_df, page, pages, output_path, dpi=300):
+    """Render one page of the full ranking to a file on the Agg backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    def render(path):
+        fig = plot_ranking(page_df['Boroughs'].tolist(), page_df[YIELD_COL].to_numpy(dtype=float),
+                           f'Gross Rental Yield Ranking (page {page} of {pages})', ylabel=AREA_LABEL)
+        with stage('savefig'):
+            fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+
+    cached_render(output_path, render, page_df, ['Boroughs', YIELD_COL],
+                  params={'page': page, 'pages': pages, 'dpi': dpi}, code=[__file__])
+    return output_path
+
+
+def render_pages(df, per_page=50, output_pattern='Appendix_Figure_Yield_Ranking_p{page:03d}.png',
+                 dpi=300, workers=None):
+    """Split the full ranking into fixed-size pages rendered in a process pool"""
+    ranked = df[['Boroughs', YIELD_COL]].sort_values(YIELD_COL, ascending=False)
+    pages = max(int(np.ceil(len(ranked) / per_page)), 1)
+    jobs = [(ranked.iloc[i * per_page:(i + 1) * per_page], i + 1, pages,
+             output_pattern.format(page=i + 1), dpi) for i in range(pages)]
+    workers = min(workers or os.cpu_count() or 1, pages)
+    if workers <= 1:
+        return [render_page(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_page, *zip(*jobs)))
+
+
+if __name__ == '__main__':
+    profile_run()
+    parser = argparse.ArgumentParser(description='Gross rental yield ranking chart')
+    parser.add_argument('--top-k', type=int, default=None,
+                        help='show only the top and bottom k areas plus summary bands')
+    parser.add_argument('--bands', type=int, default=5, help='summary bands for the unranked middle')
+    parser.add_argument('--pages', action='store_true',
+                        help='render the full ranking across paginated figures instead')
+    parser.add_argument('--per-page', type=int, default=50, help='areas per page in --pages mode')
+    parser.add_argument('--workers', type=int, default=None, help='processes for --pages mode')
+    args = parser.parse_args()
+
+    # Load data
+    df = load_housing_data()
+
+    if args.pages:
+        for path in render_pages(df, args.per_page, workers=args.workers):
+            print(f"Saved '{path}'")
+    else:
+        # Save figure; an unchanged ranking is copied from the artifact cache
+        if save_ranking(df, OUTPUT_PATH, args.top_k, args.bands) is None:
+            print(f"'{OUTPUT_PATH}' unchanged, served from cache")
+        else:
+            import matplotlib.pyplot as plt
+            plt.show()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend for testing
+import matplotlib.pyplot as plt
+from artifact_cache import DISABLE_ENV
+from yield_ranking_barchart import YIELD_COL, plot_top_bottom, rank_extremes, render_pages, tail_bands
+
+
+class TestYieldRanking(unittest.TestCase):
+    """Unit tests for top-k ranking, tail bands and paginated rendering"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Synthetic ward-level yields"""
+        rng = np.random.default_rng(2)
+        n = 5000
+        cls.df = pd.DataFrame({'Boroughs': [f'Ward {i}' for i in range(n)],
+                               YIELD_COL: rng.normal(4, 0.6, size=n)})
+
+    def test_rank_extremes_matches_full_sort(self):
+        """Test the partial sort against a full descending sort"""
+        top, bottom, rest = rank_extremes(self.df, 20)
+        ranked = self.df.sort_values(YIELD_COL, ascending=False)
+        self.assertEqual(top['Boroughs'].tolist(), ranked['Boroughs'].head(20).tolist())
+        self.assertEqual(bottom['Boroughs'].tolist(), ranked['Boroughs'].tail(20).tolist())
+        self.assertEqual(len(rest), len(self.df) - 40)
+
+    def test_tail_bands_cover_middle(self):
+        """Test that bands account for every unranked area, highest first"""
+        _, _, rest = rank_extremes(self.df, 20)
+        bands = tail_bands(rest, 5)
+        self.assertEqual(bands['count'].sum(), len(rest))
+        self.assertTrue((np.diff(bands['mean']) < 0).all())
+
+    def test_tail_bands_match_full_sort(self):
+        """Test the partitioned band edges against equal-count chunks of a full sort"""
+        values = self.df[YIELD_COL].head(103)
+        bands = tail_bands(self.df.head(103), 4)
+        chunks = np.array_split(np.sort(values.to_numpy())[::-1], 4)
+        self.assertEqual(bands['count'].tolist(), [len(chunk) for chunk in chunks])
+        np.testing.assert_allclose(bands['max'], [chunk[0] for chunk in chunks])
+        np.testing.assert_allclose(bands['min'], [chunk[-1] for chunk in chunks])
+        np.testing.assert_allclose(bands['mean'], [chunk.mean() for chunk in chunks])
+        self.assertEqual(len(tail_bands(self.df.head(3), 5)), 3)
+
+    def test_top_bottom_figure_size_independent_of_total(self):
+        """Test that the top-k chart has 2k bars plus bands"""
+        fig = plot_top_bottom(self.df, k=10, n_bands=4)
+        self.assertEqual(len(fig.axes[0].patches), 24)
+        self.assertEqual(fig.axes[0].get_ylabel(), 'Area')
+        plt.close(fig)
+
+    @mock.patch.dict(os.environ, {DISABLE_ENV: '1'})
+    def test_render_pages(self):
+        """Test that paginated rendering writes one file per page"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pattern = os.path.join(tmpdir, 'rank_{page:03d}.png')
+            paths = render_pages(self.df.head(120), per_page=50, output_pattern=pattern, dpi=40, workers=1)
+            self.assertEqual(len(paths), 3)
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)